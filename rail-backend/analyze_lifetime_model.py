@@ -1,14 +1,18 @@
-import pickle
 import json
 import numpy as np
 
+import model_registry
+from model_manifest import load_manifest
+
 try:
-    # Load the lifetime model
-    with open('lifetime_model.pkl', 'rb') as f:
-        lifetime_model = pickle.load(f)
+    # Expected input width comes from the manifest (built once per model version)
+    manifest = load_manifest('lifetime_model.pkl')
+    
+    # Load the lifetime model (already loaded if the manifest was just built)
+    lifetime_model = model_registry.load('lifetime_model.pkl')
     
     print("=== LIFETIME MODEL ANALYSIS ===")
-    print(f"Model Type: {type(lifetime_model)}")
+    print(f"Model Type: {manifest['estimator_type']}")
     
     # Check if it's a trained model
     if hasattr(lifetime_model, 'predict'):
@@ -16,28 +20,19 @@ try:
         
         # Test with sample data
         try:
-            # Try different input sizes to understand expected features
-            for n_features in [1, 2, 3, 4, 5, 6, 7, 8]:
-                try:
-                    sample_input = [[1] * n_features]
-                    prediction = lifetime_model.predict(sample_input)
-                    print(f"✓ Model accepts {n_features} features")
-                    print(f"Sample prediction: {prediction[0]}")
-                    
-                    # Check if it's a regression or classification model
-                    if hasattr(lifetime_model, 'predict_proba'):
-                        try:
-                            proba = lifetime_model.predict_proba(sample_input)
-                            print(f"Classification model - classes: {lifetime_model.classes_}")
-                            print(f"Sample probabilities: {proba[0]}")
-                        except:
-                            pass
-                    else:
-                        print("Regression model - predicts continuous values")
-                    
-                    break
-                except Exception as e:
-                    continue
+            n_features = manifest['n_features_in']
+            sample_input = [[1] * n_features]
+            prediction = lifetime_model.predict(sample_input)
+            print(f"✓ Model accepts {n_features} features")
+            print(f"Sample prediction: {prediction[0]}")
+            
+            # Check if it's a regression or classification model
+            if manifest['has_predict_proba']:
+                proba = lifetime_model.predict_proba(sample_input)
+                print(f"Classification model - classes: {manifest['classes']}")
+                print(f"Sample probabilities: {proba[0]}")
+            else:
+                print("Regression model - predicts continuous values")
         except Exception as e:
             print(f"Error testing model: {e}")
     
@@ -0,0 +1,131 @@
+"""
+Cold-start benchmark for the prediction scripts spawned by server.js.
+
+Every entry point is run as the server runs it, `python <script> <arguments>`,
+in a fresh interpreter several times (with the prediction cache off, so each
+run does the whole request). The report holds the best wall-clock time of the
+invocation, the best total import time under -X importtime (deferred imports
+made while answering included) and the heavy libraries the request imported.
+Best-of-N is far less noisy than the mean on shared machines.
+
+    python bench_startup.py                    # compare against startup-baseline.json, exit 1 on regression
+    python bench_startup.py --save-baseline    # record a new baseline on this machine
+    python bench_startup.py --data-dir /srv/rail-backend
+
+The scripts run in --data-dir (default: this directory), which must hold
+part-data.csv and the model pickles.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Entry point -> command-line arguments, as server.js passes them
+ENTRY_POINTS = {
+    'ml_predict': ['ml_predict.py', '101', 'Rail Clips', '3', '1000', 'North', 'Passenger'],
+    'lifetime_predict': ['lifetime_predict.py', '101', 'Rail Clips', '1001', '3', '2', 'North', 'Passenger', '30', '90'],
+    'lifetime_prediction': ['lifetime_prediction.py', '101', 'Rail Clips', '1001', '3', '2', 'North', 'Passenger', '30', '90'],
+    'enhanced_ml_prediction': ['enhanced_ml_prediction.py', '101', 'Rail Clips', '3', '1000', 'North', 'Passenger']
+}
+HEAVY_MODULES = ['numpy', 'pandas', 'scipy', 'sklearn']
+BASELINE_FILE = 'startup-baseline.json'
+RUNS = 7
+
+# A run regresses when it is more than TOLERANCE slower than the baseline and
+# at least SLACK_MS slower in absolute terms (so sub-millisecond noise never fails)
+TOLERANCE = 0.25
+SLACK_MS = 20.0
+
+def measure(name, data_dir, runs=RUNS):
+    """Best-of-N launch and import time (ms) of one CLI invocation, plus the heavy modules it imported"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    script, *args = ENTRY_POINTS[name]
+    env = {**os.environ, 'ML_CACHE': '0'}
+    import_ms, launch_ms, heavy = [], [], set()
+
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', os.path.join(here, script), *args],
+            cwd=data_dir, env=env, capture_output=True, text=True
+        )
+        launch_ms.append((time.perf_counter() - start) * 1000)
+
+        # A fallback answer would time the error path, not a prediction
+        try:
+            output = json.loads(proc.stdout.strip().splitlines()[-1])
+        except (IndexError, ValueError):
+            output = {'error': proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'no output'}
+        if proc.returncode != 0 or 'error' in output:
+            raise RuntimeError(f"{script} failed: {output.get('error')}")
+
+        # "import time: self | cumulative | name"; top-level imports have a single leading space
+        total = 0
+        for line in proc.stderr.splitlines():
+            fields = line.split('|')
+            if len(fields) != 3 or not fields[1].strip().isdigit():
+                continue
+            module = fields[2].strip()
+            if fields[2][1:2] != ' ':
+                total += int(fields[1])
+            if module in HEAVY_MODULES:
+                heavy.add(module)
+        import_ms.append(total / 1000)
+
+    return {
+        'import_ms': round(min(import_ms), 2),
+        'launch_ms': round(min(launch_ms), 2),
+        'heavy_imports': sorted(heavy)
+    }
+
+def regressions(results, baseline):
+    """List of human-readable regressions against the baseline"""
+    found = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for metric in ('import_ms', 'launch_ms'):
+            before, after = previous[metric], current[metric]
+            if after > before * (1 + TOLERANCE) and after - before > SLACK_MS:
+                found.append(f"{name} {metric}: {before:.1f} -> {after:.1f} ms")
+        added = sorted(set(current['heavy_imports']) - set(previous.get('heavy_imports', [])))
+        if added:
+            found.append(f"{name} now imports {', '.join(added)}")
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description='Cold-start benchmark of the spawned prediction scripts')
+    parser.add_argument('--save-baseline', action='store_true', help=f'record the results as {BASELINE_FILE}')
+    parser.add_argument('--data-dir', default=os.path.dirname(os.path.abspath(__file__)), help='directory with part-data.csv and the model pickles')
+    parser.add_argument('--runs', type=int, default=RUNS, help='runs per entry point (best is kept)')
+    args = parser.parse_args()
+
+    results = {name: measure(name, args.data_dir, args.runs) for name in ENTRY_POINTS}
+    report = {'python': sys.version.split()[0], 'results': results}
+
+    baseline_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), BASELINE_FILE)
+    if args.save_baseline:
+        with open(baseline_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        report['baseline'] = 'saved'
+        print(json.dumps(report, indent=2))
+        return
+
+    if not os.path.exists(baseline_path):
+        report['error'] = f'No {BASELINE_FILE}; record one with --save-baseline'
+        print(json.dumps(report, indent=2))
+        sys.exit(1)
+
+    with open(baseline_path) as f:
+        baseline = json.load(f)['results']
+
+    report['regressions'] = regressions(results, baseline)
+    print(json.dumps(report, indent=2))
+    if report['regressions']:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Latency and throughput benchmark for the prediction scripts at growing data sizes.
+
+For every size it generates a synthetic part-data.csv (generate_part_data.py)
+in its own work directory, next to links to the model pickles, and measures:
+
+  cli        spawned per request exactly like server.js: first (cold) run plus
+             p50/p95 latency over the following runs
+  inprocess  single-call latency and batch throughput of the Python APIs
+  index      time to build the columnar cache and aggregate index from scratch
+
+Results are written as JSON so runs can be compared across releases:
+
+    python bench_suite.py --rows 10000,1000000 --out bench-results.json
+    python bench_suite.py --rows 10000000 --requests 5
+    python bench_suite.py --compare bench-results.json   # adds new/old ratios
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import generate_part_data
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MODEL_FILES = ['model_rf_data.pkl', 'lifetime_model.pkl']
+
+# CLI invocations with the same arguments server.js passes
+CLI_RUNS = {
+    'ml_predict': ['ml_predict.py', '101', 'Rail Clips', '2', '1000', 'North', 'Passenger'],
+    'lifetime_predict': ['lifetime_predict.py', '101', 'Rail Clips', '1001', '2', '2', 'North', 'Passenger', '30', '90'],
+    'lifetime_prediction': ['lifetime_prediction.py', '101', 'Rail Clips', '1001', '2', '2', 'North', 'Passenger', '30', '90'],
+    'enhanced_ml_prediction': ['enhanced_ml_prediction.py', '101', 'Rail Clips', '2', '1000', 'North', 'Passenger'],
+    'failure_analysis': ['failure_analysis.py']
+}
+
+PART_NAMES = ['Rail Clips', 'Rubber Pad', 'Sleeper', 'Liner']
+REGION_NAMES = ['North', 'South', 'East', 'West', 'Central']
+ROUTE_NAMES = ['High Speed', 'Passenger', 'Freight']
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def latency_summary(samples_ms):
+    return {
+        'runs': len(samples_ms),
+        'p50_ms': round(percentile(samples_ms, 0.5), 2),
+        'p95_ms': round(percentile(samples_ms, 0.95), 2),
+        'requests_per_s': round(1000 * len(samples_ms) / sum(samples_ms), 2)
+    }
+
+def sample_queries(count, seed=0):
+    """/ml/predict style queries spread over the generator's value ranges"""
+    import random
+
+    rng = random.Random(seed)
+    return [
+        {
+            'vendor_id': str(rng.choice(generate_part_data.VENDORS)),
+            'part_type': rng.choice(PART_NAMES),
+            'material': str(rng.choice(generate_part_data.MATERIALS)),
+            'lifetime': str(rng.randint(100, 4000)),
+            'region': rng.choice(REGION_NAMES),
+            'route_type': rng.choice(ROUTE_NAMES)
+        }
+        for _ in range(count)
+    ]
+
+def lifetime_requests(queries):
+    """predict_lifetime keyword arguments for the same components"""
+    return [
+        {
+            'vendor_id': query['vendor_id'], 'part_type': query['part_type'], 'lot_number': '1001',
+            'material': query['material'], 'warranty_years': '2', 'region': query['region'],
+            'route_type': query['route_type'], 'days_manuf_to_install': '30', 'days_install_to_inspect': '90'
+        }
+        for query in queries
+    ]
+
+def prepare_workdir(workdir, rows, seed):
+    """Work directory with a generated CSV of `rows` rows and links to the model pickles"""
+    os.makedirs(workdir, exist_ok=True)
+    csv_path = os.path.join(workdir, 'part-data.csv')
+    marker = os.path.join(workdir, 'generated.json')
+
+    generated = None
+    if os.path.exists(marker) and os.path.exists(csv_path):
+        with open(marker) as f:
+            generated = json.load(f)
+    if generated is None or generated['rows'] != rows or generated['seed'] != seed:
+        seconds = generate_part_data.generate(csv_path, rows, seed)
+        generated = {'rows': rows, 'seed': seed, 'seconds': round(seconds, 2)}
+        with open(marker, 'w') as f:
+            json.dump(generated, f)
+
+    for name in MODEL_FILES:
+        link = os.path.join(workdir, name)
+        if os.path.exists(os.path.join(HERE, name)) and not os.path.lexists(link):
+            os.symlink(os.path.join(HERE, name), link)
+
+    return generated['seconds']
+
+def bench_cli(workdir, requests):
+    """Spawn each script like server.js does; the first run pays cache builds"""
+    # Repeated identical requests would only measure the prediction cache
+    env = dict(os.environ, PYTHONPATH=HERE + os.pathsep + os.environ.get('PYTHONPATH', ''), ML_CACHE='0')
+    results = {}
+    for name, argv in CLI_RUNS.items():
+        samples, error = [], None
+        for _ in range(requests + 1):
+            start = time.perf_counter()
+            proc = subprocess.run(
+                [sys.executable, os.path.join(HERE, argv[0]), *argv[1:]],
+                cwd=workdir, env=env, capture_output=True, text=True
+            )
+            samples.append((time.perf_counter() - start) * 1000)
+            try:
+                output = json.loads(proc.stdout)
+                error = output.get('error') if isinstance(output, dict) else None
+            except ValueError:
+                error = (proc.stderr.strip().splitlines() or ['no output'])[-1]
+
+        results[name] = {'first_ms': round(samples[0], 2), **latency_summary(samples[1:])}
+        if error:
+            results[name]['error'] = error
+    return results
+
+def timed(function, *args, repeat=1):
+    """Mean wall time (ms) of function(*args) over `repeat` calls, and the last result"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function(*args)
+    return (time.perf_counter() - start) * 1000 / repeat, result
+
+def bench_inprocess(workdir, batch_size, requests):
+    """Per-call latency and batch throughput of the Python APIs, run inside workdir"""
+    import failure_analysis
+    import lifetime_predict
+    import ml_predict
+    import part_columns
+    import part_stats
+
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        results = {}
+
+        # Index build from scratch: columnar cache, then the aggregate index
+        for sidecar in (part_columns.columns_path('part-data.csv'), part_stats.stats_path('part-data.csv')):
+            if os.path.exists(sidecar):
+                os.remove(sidecar)
+        part_stats.forget()
+        columns_ms, _ = timed(part_columns.open_columns)
+        stats_ms, stats = timed(part_stats.load_stats)
+        part_stats.forget()
+        reload_ms, stats = timed(part_stats.load_stats)
+        results['index'] = {
+            'columns_build_ms': round(columns_ms, 2),
+            'stats_build_ms': round(stats_ms, 2),
+            'stats_reload_ms': round(reload_ms, 2)
+        }
+
+        queries = sample_queries(batch_size)
+        single = queries[0]
+        lifetime_single = lifetime_requests([single])[0]
+
+        def throughput(name, batch_ms, rows, single_ms=None):
+            entry = {'batch_rows': rows, 'batch_ms': round(batch_ms, 2), 'rows_per_s': round(rows * 1000 / batch_ms, 1)}
+            if single_ms is not None:
+                entry['single_ms'] = round(single_ms, 3)
+            results[name] = entry
+
+        single_ms, _ = timed(lambda: ml_predict.predict(stats, **single), repeat=requests)
+        batch_ms, _ = timed(ml_predict.score_batch, stats, queries)
+        throughput('ml_predict', batch_ms, len(queries), single_ms)
+
+        requests_kwargs = lifetime_requests(queries)
+        single_ms, _ = timed(lambda: lifetime_predict.predict_lifetime(stats, **lifetime_single), repeat=requests)
+        batch_ms, _ = timed(lambda: [lifetime_predict.predict_lifetime(stats, **r) for r in requests_kwargs])
+        throughput('lifetime_predict', batch_ms, len(queries), single_ms)
+
+        analysis_ms, _ = timed(failure_analysis.failure_analysis, stats, repeat=requests)
+        rankings_ms, _ = timed(failure_analysis.vendor_rankings, stats, repeat=requests)
+        results['failure_analysis'] = {'analysis_ms': round(analysis_ms, 3), 'vendor_rankings_ms': round(rankings_ms, 3)}
+
+        # Model-backed scripts need the pickles; record the error instead when they are missing
+        try:
+            import enhanced_ml_prediction
+            import model_registry
+            from flat_forest import load_model
+
+            model = model_registry.load('model_rf_data.pkl', load_model)
+            tables_ms, tables = timed(enhanced_ml_prediction.load_history_tables)
+            X = [enhanced_ml_prediction.build_features(**query) for query in queries]
+            single_ms, _ = timed(enhanced_ml_prediction.predict_batch, model, tables, X[:1], repeat=requests)
+            batch_ms, _ = timed(enhanced_ml_prediction.predict_batch, model, tables, X)
+            throughput('enhanced_ml_prediction', batch_ms, len(X), single_ms)
+            results['enhanced_ml_prediction']['history_tables_ms'] = round(tables_ms, 2)
+        except Exception as e:
+            results['enhanced_ml_prediction'] = {'error': str(e)}
+
+        try:
+            import lifetime_prediction
+
+            single_ms, _ = timed(lifetime_prediction.predict_lifetime_batch, requests_kwargs[:1], repeat=requests)
+            batch_ms, _ = timed(lifetime_prediction.predict_lifetime_batch, requests_kwargs)
+            throughput('lifetime_prediction', batch_ms, len(requests_kwargs), single_ms)
+        except Exception as e:
+            results['lifetime_prediction'] = {'error': str(e)}
+
+        return results
+    finally:
+        os.chdir(cwd)
+
+def compare(results, baseline):
+    """new/old ratio for every numeric metric present in both runs (>1 means slower or bigger)"""
+    ratios = {}
+
+    def walk(new, old, path):
+        for key, value in new.items():
+            if key not in old:
+                continue
+            if isinstance(value, dict) and isinstance(old[key], dict):
+                walk(value, old[key], path + [key])
+            elif isinstance(value, (int, float)) and isinstance(old[key], (int, float)) and old[key]:
+                ratios['.'.join(path + [key])] = round(value / old[key], 3)
+
+    walk(results, baseline, [])
+    return ratios
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the prediction scripts at several data sizes')
+    parser.add_argument('--rows', default='10000,1000000', help='comma-separated CSV sizes')
+    parser.add_argument('--requests', type=int, default=10, help='CLI runs and single-call repeats per script')
+    parser.add_argument('--batch', type=int, default=1000, help='rows per batch for throughput')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workdir', default=os.path.join(HERE, 'bench-data'))
+    parser.add_argument('--out', default='bench-results.json')
+    parser.add_argument('--compare', help='previous results file to compute ratios against')
+    args = parser.parse_args()
+
+    import numpy as np
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': sys.version.split()[0],
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'commit': subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=HERE, capture_output=True, text=True).stdout.strip(),
+            'requests': args.requests,
+            'batch': args.batch
+        },
+        'sizes': {}
+    }
+
+    for rows in [int(value) for value in args.rows.split(',')]:
+        workdir = os.path.join(args.workdir, str(rows))
+        generate_seconds = prepare_workdir(workdir, rows, args.seed)
+        report['sizes'][str(rows)] = {
+            'generate_s': generate_seconds,
+            'inprocess': bench_inprocess(workdir, args.batch, args.requests),
+            'cli': bench_cli(workdir, args.requests)
+        }
+        print(json.dumps({'rows': rows, 'done': True}), file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            report['comparison'] = compare(report['sizes'], json.load(f)['sizes'])
+
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Shared categorical vocabulary for the prediction scripts.
+
+part-data.csv stores part type, region and route type as integer codes. Every
+script (rule-based or model-backed) maps request strings onto those codes
+through the vocabularies below, so they all agree. Labels are coded 1..N in
+list order; integers pass through unchanged and anything unknown (including
+numeric strings) gets the vocabulary's default. A script whose requests never
+included the later labels uses subset(), which keeps the same codes for the
+labels it knows, so its outputs did not change when labels were added.
+
+    PART_TYPE.code('Liner')                       # -> 4, one value
+    ROUTE_TYPE.encode(['Freight', 'Mixed', None]) # -> array([3, 4, 2], dtype=int16)
+
+VOCAB_VERSION changes whenever a code changes meaning, so anything cached
+against encoded values (see prediction_cache.py) is invalidated.
+"""
+
+VOCAB_VERSION = 2
+
+class Vocabulary:
+    """Labels of one categorical column, coded 1..N, with the code used for unknown values"""
+
+    def __init__(self, name, labels, default):
+        self.name = name
+        self.labels = list(labels)
+        self.default = default
+        self.codes = {label: code for code, label in enumerate(self.labels, 1)}
+
+    def subset(self, count, default=None):
+        """The first `count` labels with the same codes; the others become unknown"""
+        return Vocabulary(self.name, self.labels[:count], self.default if default is None else default)
+
+    def code(self, value):
+        """Code of a single value"""
+        if isinstance(value, str):
+            return self.codes.get(value, self.default)
+        if value is None or value != value:
+            return self.default
+        return int(value)
+
+    def label(self, code):
+        """Label for a code, or None when the code has no name"""
+        return self.labels[code - 1] if 1 <= code <= len(self.labels) else None
+
+    def names(self):
+        """{code: label} for every labelled code"""
+        return dict(enumerate(self.labels, 1))
+
+    def encode(self, values):
+        """
+        Codes for a whole column as an int16 array.
+
+        The column is factorized first (pandas' hash table, or np.unique
+        without pandas), so each distinct value is looked up once and the
+        codes come from a single array gather.
+        """
+        import numpy as np
+
+        values = np.asarray(values, dtype=object)
+        try:
+            import pandas as pd
+            inverse, uniques = pd.factorize(values)
+        except ImportError:
+            uniques, inverse = np.unique(values.astype(str), return_inverse=True)
+
+        # Missing values factorize to -1, which selects the trailing default
+        lookup = np.array([self.code(value) for value in uniques] + [self.default], dtype=np.int16)
+        return lookup[inverse.reshape(-1)]
+
+PART_TYPE = Vocabulary('part_type', ['Rail Clips', 'Rubber Pad', 'Sleeper', 'Liner'], default=1)
+REGION = Vocabulary('region', ['North', 'South', 'East', 'West', 'Central', 'Northeast', 'Northwest', 'Southeast'], default=1)
+ROUTE_TYPE = Vocabulary('route_type', ['High Speed', 'Passenger', 'Freight', 'Mixed'], default=2)
@@ -1,55 +1,158 @@
-import pickle
-import pandas as pd
-import numpy as np
 import json
 import sys
-from datetime import datetime, timedelta
+
+import model_manifest
+import model_registry
+import timing
+from encoding import PART_TYPE, REGION, ROUTE_TYPE
+from flat_forest import load_model
+from part_columns import CHUNK_ROWS, open_columns
+
+# Width of the feature rows built by build_features()
+N_FEATURES = 6
+
+# The codes this model has always been given: five regions, and High Speed for an unknown route
+REGIONS = REGION.subset(5)
+ROUTES = ROUTE_TYPE.subset(4, default=1)
+
+def load_rf_model():
+    """The Random Forest (cached per file version), checked against its manifest before loading"""
+    model_manifest.check_features('model_rf_data.pkl', N_FEATURES)
+    return model_registry.load('model_rf_data.pkl', load_model)
 
 def load_model_and_data():
-    """Load the trained model and historical data"""
+    """Load the trained model and historical data (cached per file version)"""
     try:
         # Load the trained Random Forest model
-        with open('model_rf_data.pkl', 'rb') as f:
-            model = pickle.load(f)
+        model = load_rf_model()
         
         # Load historical data for analysis
-        df = pd.read_csv('part-data.csv')
+        df = model_registry.load('part-data.csv', read_part_data)
         
         return model, df
     except Exception as e:
         raise Exception(f"Error loading model or data: {str(e)}")
 
+def read_part_data(csv_path):
+    """Registry loader: the part history as a DataFrame, via the memory-mapped columnar cache"""
+    return open_columns(csv_path).frame()
 
+def _read_history_tables(csv_path):
+    """Registry loader: build the history tables from the columnar cache, chunk by chunk"""
+    return build_history_tables_chunked(open_columns(csv_path))
 
-def get_historical_performance(df, vendor_id, part_type):
-    """Get historical performance data for the vendor and part type"""
-    try:
-        # Map part type to numeric
-        part_type_map = {'Rail Clips': 1, 'Rubber Pad': 2, 'Sleeper': 3, 'Liner': 4}
-        part_type_num = part_type_map.get(part_type, 1)
-        
-        # Filter data for specific vendor and part type
-        filtered_data = df[
-            (df['Vendor ID'] == int(vendor_id)) & 
-            (df['Part type'] == part_type_num)
-        ]
-        
-        if len(filtered_data) > 0:
-            defect_rate = (filtered_data['Defect'].sum() / len(filtered_data)) * 100
-            total_parts = len(filtered_data)
-            avg_lifetime = filtered_data['Lifetime'].mean()
-            
-            return {
+def load_history_tables(csv_path='part-data.csv'):
+    """History tables for the current CSV, rebuilt only when the file changes"""
+    return model_registry.load(csv_path, _read_history_tables)
+
+def build_history_tables(df):
+    """Precompute the vendor/part and part/material groupbys used by the risk analysis"""
+    import pandas as pd
+    
+    # Vendor history is read from the 'Lifetime' column; without it every lookup reports no history
+    if 'Lifetime' in df.columns:
+        vendor_part = df.groupby(['Vendor ID', 'Part type']).agg(
+            total=('Defect', 'size'),
+            defects=('Defect', 'sum'),
+            avg_lifetime=('Lifetime', 'mean')
+        )
+    else:
+        vendor_part = pd.DataFrame(
+            {'total': [], 'defects': [], 'avg_lifetime': []},
+            index=pd.MultiIndex.from_arrays([[], []], names=['Vendor ID', 'Part type'])
+        )
+    part_material = df.groupby(['Part type', 'material']).agg(
+        total=('Defect', 'size'),
+        defects=('Defect', 'sum')
+    )
+    
+    return {'vendor_part': vendor_part, 'part_material': part_material, 'total': len(df)}
+
+def build_history_tables_chunked(columns, chunk_rows=CHUNK_ROWS):
+    """
+    Same tables as build_history_tables, aggregated chunk_rows rows at a time.
+
+    Only per-chunk group sums are kept, so memory stays flat however large
+    the part history is.
+    """
+    import pandas as pd
+    
+    arrays = columns.arrays()
+    names = ['Vendor ID', 'Part type', 'material', 'Defect'] + (['Lifetime'] if 'Lifetime' in arrays else [])
+    vendor_parts, part_materials = [], []
+    for start in range(0, columns.rows, chunk_rows):
+        chunk = pd.DataFrame({name: arrays[name][start:start + chunk_rows] for name in names})
+        if 'Lifetime' in chunk.columns:
+            vendor_parts.append(chunk.groupby(['Vendor ID', 'Part type']).agg(
+                total=('Defect', 'size'),
+                defects=('Defect', 'sum'),
+                lifetime_sum=('Lifetime', 'sum')
+            ))
+        part_materials.append(chunk.groupby(['Part type', 'material']).agg(
+            total=('Defect', 'size'),
+            defects=('Defect', 'sum')
+        ))
+    
+    if vendor_parts:
+        vendor_part = pd.concat(vendor_parts).groupby(level=[0, 1]).sum()
+        vendor_part['avg_lifetime'] = vendor_part.pop('lifetime_sum') / vendor_part['total']
+    else:
+        vendor_part = pd.DataFrame(
+            {'total': [], 'defects': [], 'avg_lifetime': []},
+            index=pd.MultiIndex.from_arrays([[], []], names=['Vendor ID', 'Part type'])
+        )
+    if part_materials:
+        part_material = pd.concat(part_materials).groupby(level=[0, 1]).sum()
+    else:
+        part_material = pd.DataFrame(
+            {'total': [], 'defects': []},
+            index=pd.MultiIndex.from_arrays([[], []], names=['Part type', 'material'])
+        )
+    
+    return {'vendor_part': vendor_part, 'part_material': part_material, 'total': columns.rows}
+
+def _lookup(table, *keys):
+    """Align a grouped table to per-row keys (NaN where a key has no history)"""
+    import numpy as np
+    import pandas as pd
+    
+    index = pd.MultiIndex.from_arrays([np.asarray(key) for key in keys], names=table.index.names)
+    return table.reindex(index)
+
+def historical_performance_batch(tables, vendor_ids, part_type_nums):
+    """Historical performance for many (vendor, part type) pairs in one lookup"""
+    rows = _lookup(tables['vendor_part'], vendor_ids, part_type_nums)
+    totals = rows['total'].fillna(0).astype(int).tolist()
+    defect_rates = (rows['defects'] / rows['total'] * 100).tolist()
+    avg_lifetimes = rows['avg_lifetime'].tolist()
+    
+    history = []
+    for total, defect_rate, avg_lifetime in zip(totals, defect_rates, avg_lifetimes):
+        if total > 0:
+            history.append({
                 'historical_defect_rate': round(defect_rate, 2),
-                'total_parts_supplied': total_parts,
+                'total_parts_supplied': total,
                 'avg_lifetime': round(avg_lifetime, 1)
-            }
+            })
         else:
-            return {
+            history.append({
                 'historical_defect_rate': 0,
                 'total_parts_supplied': 0,
                 'avg_lifetime': 0
-            }
+            })
+    return history
+
+def material_defect_rate_batch(tables, part_type_nums, materials):
+    """Part type + material defect rate per row (None where there is no history)"""
+    rows = _lookup(tables['part_material'], part_type_nums, materials)
+    rates = (rows['defects'] / rows['total'] * 100).tolist()
+    return [None if rate != rate else rate for rate in rates]
+
+def get_historical_performance(tables, vendor_id, part_type):
+    """Get historical performance data for the vendor and part type"""
+    try:
+        part_type_num = PART_TYPE.code(part_type)
+        return historical_performance_batch(tables, [int(vendor_id)], [part_type_num])[0]
     except:
         return {
             'historical_defect_rate': 0,
@@ -57,7 +160,7 @@ def get_historical_performance(df, vendor_id, part_type):
             'avg_lifetime': 0
         }
 
-def calculate_risk_factors(input_data, historical_data, df):
+def calculate_risk_factors(input_data, historical_data, material_defect_rate):
     """Calculate additional risk factors based on data analysis"""
     vendor_id, part_type_num, material, lifetime, region, route_type = input_data
     
@@ -88,17 +191,10 @@ def calculate_risk_factors(input_data, historical_data, df):
         risk_factors.append("Heavy freight loads increase wear")
         risk_score += 15
     
-    # Material and part type combination risk
-    part_material_risk = df[
-        (df['Part type'] == part_type_num) & 
-        (df['material'] == material)
-    ]
-    
-    if len(part_material_risk) > 0:
-        material_defect_rate = (part_material_risk['Defect'].sum() / len(part_material_risk)) * 100
-        if material_defect_rate > 8:
-            risk_factors.append(f"Material shows high defect rate: {material_defect_rate:.1f}%")
-            risk_score += 20
+    # Material and part type combination risk (precomputed part/material defect rate)
+    if material_defect_rate is not None and material_defect_rate > 8:
+        risk_factors.append(f"Material shows high defect rate: {material_defect_rate:.1f}%")
+        risk_score += 20
     
     return risk_factors, min(risk_score, 100)
 
@@ -131,8 +227,159 @@ def generate_recommendations(prediction, confidence, risk_factors, historical_da
     
     return recommendations
 
+def build_features(vendor_id, part_type, material, lifetime, region, route_type):
+    """Input row matching the model format: [vendor_id, part_type, material, lifetime, region, route_type]"""
+    return [
+        int(vendor_id),
+        PART_TYPE.code(part_type),
+        int(material),
+        int(lifetime),
+        REGIONS.code(region),
+        ROUTES.code(route_type)
+    ]
+
+def fallback_result(error):
+    """Neutral answer returned when the model cannot be used"""
+    return {
+        'prediction': 'PASS',
+        'probability': 75.0,
+        'status': 'pass',
+        'error': str(error),
+        'recommendations': [
+            "Model analysis unavailable",
+            "Manual inspection recommended"
+        ]
+    }
+
+def predict_batch(model, tables, X):
+    """
+    Score an N x 6 feature matrix [vendor_id, part_type, material, lifetime, region, route_type].
+
+    The forest runs once (predict_proba, labels from its argmax) and the
+    historical lookups come from the precomputed tables, so cost per extra
+    row is small. Returns one result dict per row.
+    """
+    import numpy as np
+    
+    X = np.asarray(X)
+    
+    with timing.stage('model_predict'):
+        try:
+            probabilities = model.predict_proba(X)
+            predictions = model.classes_[probabilities.argmax(axis=1)]
+            confidences = probabilities.max(axis=1) * 100
+        except:
+            predictions = model.predict(X)
+            confidences = np.full(len(X), 85.0)
+    
+    with timing.stage('history_lookup'):
+        history = historical_performance_batch(tables, X[:, 0], X[:, 1])
+        material_rates = material_defect_rate_batch(tables, X[:, 1], X[:, 2])
+    
+    results = []
+    for row, pred, confidence, historical_data, material_rate in zip(
+            X.tolist(), predictions.tolist(), confidences.tolist(), history, material_rates):
+        risk_factors, risk_score = calculate_risk_factors(row, historical_data, material_rate)
+        recommendations = generate_recommendations(pred, confidence, risk_factors, historical_data)
+        
+        results.append({
+            'prediction': 'PASS' if pred == 1 else 'BROKE',
+            'probability': round(confidence, 1),
+            'status': 'pass' if pred == 1 else 'fail',
+            'risk_score': risk_score,
+            'risk_factors': risk_factors,
+            'historical_performance': historical_data,
+            'recommendations': recommendations,
+            'model_info': {
+                'model_type': 'Random Forest',
+                'features_used': 6,
+                'training_data_size': tables['total']
+            }
+        })
+    
+    return results
+
+# Query fields in build_features() order, with the command-line defaults
+QUERY_DEFAULTS = {'vendor_id': 100, 'part_type': 'Rail Clips', 'material': 1, 'lifetime': 1000, 'region': 'North', 'route_type': 'Passenger'}
+
+def int_column(values, errors):
+    """
+    int64 array of one query column. Rows whose value int() rejects are set
+    to 0 and get an error message in `errors` (row position -> message).
+    """
+    import numpy as np
+    
+    try:
+        return values.astype(np.int64).to_numpy()
+    except (TypeError, ValueError, OverflowError):
+        pass
+    
+    # Some value is bad: parse row by row to find which
+    column = np.zeros(len(values), dtype=np.int64)
+    for i, value in enumerate(values.tolist()):
+        try:
+            column[i] = int(value)
+        except (TypeError, ValueError, OverflowError) as e:
+            errors.setdefault(i, str(e))
+    return column
+
+def encode_queries(queries):
+    """
+    Turn a DataFrame of /ml/predict style queries into the feature matrix of
+    its valid rows. Returns (X, errors): X holds the rows that parse, in
+    order, and errors maps the position of every other row to its message.
+    """
+    import numpy as np
+    
+    queries = queries.reindex(columns=list(QUERY_DEFAULTS)).fillna(QUERY_DEFAULTS)
+    
+    errors = {}
+    X = np.column_stack([
+        int_column(queries['vendor_id'], errors),
+        PART_TYPE.encode(queries['part_type']),
+        int_column(queries['material'], errors),
+        int_column(queries['lifetime'], errors),
+        REGIONS.encode(queries['region']),
+        ROUTES.encode(queries['route_type'])
+    ])
+    if errors:
+        X = np.delete(X, list(errors), axis=0)
+    return X, errors
+
+def merge_errors(results, errors, ids=None):
+    """
+    Results of the valid rows and {"error"} records of the rows in `errors`,
+    back in input order (the same shape as ml_predict --batch), with ids
+    when given.
+    """
+    scored = iter(results)
+    for i in range(len(results) + len(errors)):
+        result = {'error': errors[i]} if i in errors else next(scored)
+        yield {'id': ids[i], **result} if ids is not None else result
+
+def batch(path):
+    """Score every query in a CSV/JSONL file and print one JSON result per line"""
+    import pandas as pd
+    
+    if path.endswith('.jsonl') or path.endswith('.json'):
+        queries = pd.read_json(path, lines=True, dtype=False)
+    else:
+        queries = pd.read_csv(path, dtype=str)
+    
+    X, errors = encode_queries(queries)
+    model = load_rf_model()
+    results = predict_batch(model, load_history_tables(), X) if len(X) else []
+    
+    ids = queries['id'].tolist() if 'id' in queries.columns else None
+    for result in merge_errors(results, errors, ids):
+        print(json.dumps(result))
+
 def main():
     try:
+        if len(sys.argv) > 2 and sys.argv[1] == '--batch':
+            batch(sys.argv[2])
+            return
+        
         # Get input parameters
         vendor_id = int(sys.argv[1]) if len(sys.argv) > 1 else 100
         part_type = sys.argv[2] if len(sys.argv) > 2 else "Rail Clips"
@@ -142,65 +389,20 @@ def main():
         route_type = sys.argv[6] if len(sys.argv) > 6 else "Passenger"
         
         # Load model and data
-        model, df = load_model_and_data()
-        
-        # Create input array matching your format: [vendor_id, part_type, material, lifetime, region, route_type]
-        part_type_num = {'Rail Clips': 1, 'Rubber Pad': 2, 'Sleeper': 3, 'Liner': 4}.get(part_type, 1)
-        region_num = {'North': 1, 'South': 2, 'East': 3, 'West': 4, 'Central': 5}.get(region, 1)
-        route_type_num = {'High Speed': 1, 'Passenger': 2, 'Freight': 3, 'Mixed': 4}.get(route_type, 1)
+        with timing.stage('model_load'):
+            model = load_rf_model()
+        with timing.stage('history_tables'):
+            tables = load_history_tables()
         
-        x = [[vendor_id, part_type_num, material, lifetime, region_num, route_type_num]]
+        x = [build_features(vendor_id, part_type, material, lifetime, region, route_type)]
         
-        # Make prediction using your exact logic
-        pred = model.predict(x)
-        prediction_text = "pass" if pred[0] == 1 else "broke"
-        
-        # Get confidence
-        try:
-            probabilities = model.predict_proba(x)[0]
-            confidence = max(probabilities) * 100
-        except:
-            confidence = 85.0
-        
-        # Get historical performance
-        historical_data = get_historical_performance(df, vendor_id, part_type)
-        
-        # Calculate risk factors
-        risk_factors, risk_score = calculate_risk_factors(x[0], historical_data, df)
-        
-        # Generate recommendations
-        recommendations = generate_recommendations(pred[0], confidence, risk_factors, historical_data)
-        
-        # Result matching your format
-        result = {
-            'prediction': prediction_text.upper(),
-            'probability': round(confidence, 1),
-            'status': 'pass' if pred[0] == 1 else 'fail',
-            'risk_score': risk_score,
-            'risk_factors': risk_factors,
-            'historical_performance': historical_data,
-            'recommendations': recommendations,
-            'model_info': {
-                'model_type': 'Random Forest',
-                'features_used': 6,
-                'training_data_size': len(df)
-            }
-        }
+        result = predict_batch(model, tables, x)[0]
         
-        print(json.dumps(result))
+        print(timing.dumps(result))
         
     except Exception as e:
-        fallback_result = {
-            'prediction': 'PASS',
-            'probability': 75.0,
-            'status': 'pass',
-            'error': str(e),
-            'recommendations': [
-                "Model analysis unavailable",
-                "Manual inspection recommended"
-            ]
-        }
-        print(json.dumps(fallback_result))
+        print(timing.dumps(fallback_result(e)))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    timing.configure(sys.argv)
+    timing.run(main)
@@ -0,0 +1,152 @@
+"""
+Failure analysis and vendor ranking for the dashboard.
+
+Every figure comes from the PartStats index, which is built in one pass over
+part-data.csv and reused until the data changes, so a dashboard refresh is a
+handful of dict reads instead of one DataFrame filter per part type and vendor.
+
+    python failure_analysis.py             # /ml/failure-analysis payload
+    python failure_analysis.py --vendors   # /vendor/all payload
+"""
+import json
+import sys
+
+from encoding import PART_TYPE, REGION, ROUTE_TYPE
+from part_stats import load_stats
+from vendor_leaderboard import defect_rate, leaderboard_for
+
+PART_NAMES = PART_TYPE.names()
+REGION_NAMES = REGION.names()
+ROUTE_NAMES = ROUTE_TYPE.subset(3).names()
+
+# (Vendor, Part type) combinations above this defect rate (%) are flagged
+HIGH_RISK_RATE = 15
+TOP_VENDORS = 5
+TOP_HIGH_RISK = 10
+
+def group_summary(stats, dims, names, label):
+    """Per-key totals for a single-column group, in the order of `names`"""
+    table = stats.groups[dims]
+    summary = []
+    for key, name in names.items():
+        entry = table.get((key,))
+        if entry:
+            count, defects, _ = entry
+            summary.append({
+                label: name,
+                'total_parts': count,
+                'defects': defects,
+                'defect_rate': round(defect_rate(count, defects), 2)
+            })
+    return summary
+
+def failure_analysis(stats):
+    """Overall, part type, region, route, top-vendor and high-risk breakdowns"""
+    total_defects = sum(entry[1] for entry in stats.groups[('Part type',)].values())
+
+    # Top vendors by volume
+    vendors = sorted(stats.groups[('Vendor ID',)].items(), key=lambda item: (-item[1][0], item[0]))
+    vendor_analysis = [
+        {
+            'vendor_id': vendor_id,
+            'total_parts': count,
+            'defects': defects,
+            'defect_rate': round(defect_rate(count, defects), 2)
+        }
+        for (vendor_id,), (count, defects, _) in vendors[:TOP_VENDORS]
+    ]
+
+    # High-risk vendor/part combinations
+    combinations = [
+        (defect_rate(count, defects), vendor_id, part_type, count)
+        for (vendor_id, part_type), (count, defects, _) in stats.groups[('Vendor ID', 'Part type')].items()
+    ]
+    high_risk = sorted(
+        (combination for combination in combinations if combination[0] > HIGH_RISK_RATE),
+        key=lambda combination: (-combination[0], combination[1], combination[2])
+    )
+
+    return {
+        'overall_stats': {
+            'total_parts': stats.total,
+            'total_defects': total_defects,
+            'overall_defect_rate': round(defect_rate(stats.total, total_defects), 2) if stats.total else 0
+        },
+        'part_type_analysis': group_summary(stats, ('Part type',), PART_NAMES, 'part_type'),
+        'vendor_analysis': vendor_analysis,
+        'region_analysis': group_summary(stats, ('Region',), REGION_NAMES, 'region'),
+        'route_analysis': group_summary(stats, ('Route Type',), ROUTE_NAMES, 'route_type'),
+        'high_risk_combinations': [
+            {
+                'vendor_id': vendor_id,
+                'part_type': part_type,
+                'defect_rate': round(rate, 2),
+                'total_parts': count
+            }
+            for rate, vendor_id, part_type, count in high_risk[:TOP_HIGH_RISK]
+        ]
+    }
+
+def vendor_rankings(stats):
+    """Lowest-defect vendors for the chart plus the best vendor for each part type"""
+    board = leaderboard_for(stats)
+    vendors = [
+        (rate, vendor_id, stats.lookup(('Vendor ID',), vendor_id)[0])
+        for rate, vendor_id in board.best(k=TOP_VENDORS)
+    ]
+    total_inspections = sum(count for _, _, count in vendors)
+
+    chart_data = [
+        {
+            'vendor_id': str(vendor_id),
+            'percentage': (count / total_inspections) * 100,
+            'defect_rate': round(rate, 2)
+        }
+        for rate, vendor_id, count in vendors
+    ]
+
+    # Best vendor per part type from the leaderboard of each part type
+    best = {part_type: board.best('part_type', part_type, 1) for part_type in PART_NAMES}
+
+    recommendations = []
+    for part_type, part_name in PART_NAMES.items():
+        if best[part_type]:
+            rate, vendor_id = best[part_type][0]
+            recommendations.append({
+                'part_type': part_name,
+                'best_vendor': str(vendor_id),
+                'defect_rate': round(rate, 2),
+                'quality_score': round(10 - (rate / 10), 1)
+            })
+
+    return {
+        'chart_data': chart_data,
+        'recommendations': recommendations
+    }
+
+# Results are reused until the index changes (new CSV version or ingested records)
+_cache = {}
+
+def cached(report, csv_path='part-data.csv'):
+    """Run a report against the current index, reusing the last result while the data is unchanged"""
+    stats = load_stats(csv_path)
+    key = (report.__name__, csv_path)
+    hit = _cache.get(key)
+    if hit and hit[0] is stats and hit[1] == stats.total:
+        return hit[2]
+
+    result = report(stats)
+    _cache[key] = (stats, stats.total, result)
+    return result
+
+def main():
+    try:
+        report = vendor_rankings if '--vendors' in sys.argv[1:] else failure_analysis
+        result = cached(report)
+    except Exception as e:
+        result = {'error': str(e)}
+
+    print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+Flat-array inference for the Random Forest in model_rf_data.pkl.
+
+The fitted trees are exported once into contiguous NumPy arrays (feature,
+threshold, left, right, value and the traversal tables) in a memory-mapped
+store next to the pickle (see model_store.py), and a batch is
+scored by walking every tree for every row in vectorized steps. Results match
+sklearn's predict/predict_proba, but scoring skips sklearn's per-call input
+validation and per-estimator dispatch and does not need sklearn installed once
+the sidecar exists.
+
+    python flat_forest.py                 # export model_rf_data.pkl
+    python flat_forest.py --verify 5000   # compare against sklearn on random rows
+"""
+import json
+import os
+import sys
+import time
+
+from model_registry import file_signature, unpickle
+from model_store import open_current, save_store
+
+FOREST_VERSION = 2
+
+# sklearn marks leaves with child index -1
+TREE_LEAF = -1
+
+# Tree levels walked between drops of the (tree, row) pairs that reached a leaf
+COMPACT_EVERY = 8
+
+def forest_path(model_path):
+    """Store directory holding the exported forest for a model pickle"""
+    return os.path.splitext(model_path)[0] + '.forest'
+
+def flatten_trees(trees, n_classes=None):
+    """
+    Concatenate fitted sklearn trees (Tree objects) into one set of node arrays,
+    plus the traversal tables FlatForest walks.
+
+    With n_classes, leaf values become class probabilities, normalized the way
+    DecisionTreeClassifier.predict_proba does. Without it they stay the
+    regression outputs.
+    """
+    import numpy as np
+
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    for tree in trees:
+        if tree.n_outputs != 1:
+            raise ValueError("Multi-output trees are not supported")
+
+        if n_classes is None:
+            value = tree.value[:, 0, :1].astype(np.float64)
+        else:
+            value = tree.value[:, 0, :n_classes].astype(np.float64)
+            normalizer = value.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            value = value / normalizer
+
+        # Child indices become offsets into the concatenated node arrays
+        left = tree.children_left.astype(np.int32)
+        right = tree.children_right.astype(np.int32)
+        leaf = left == TREE_LEAF
+        left[~leaf] += offset
+        right[~leaf] += offset
+
+        features.append(np.where(leaf, 0, tree.feature).astype(np.int32))
+        thresholds.append(tree.threshold.astype(np.float64))
+        lefts.append(left)
+        rights.append(right)
+        values.append(value)
+        roots.append(offset)
+        offset += tree.node_count
+
+    arrays = {
+        'feature': np.concatenate(features),
+        'threshold': np.concatenate(thresholds),
+        'left': np.concatenate(lefts),
+        'right': np.concatenate(rights),
+        'value': np.concatenate(values),
+        'roots': np.asarray(roots, dtype=np.int32),
+        'max_depth': np.int32(max(tree.max_depth for tree in trees))
+    }
+    arrays.update(traversal_tables(arrays))
+    return arrays
+
+def traversal_tables(arrays):
+    """
+    Leaves loop back to themselves, and children[2 * node + went_left] is the
+    next node, so every step is the same few gathers for every (tree, row) pair.
+    """
+    import numpy as np
+
+    leaf = arrays['left'] == TREE_LEAF
+    nodes = np.arange(len(arrays['left']))
+    return {
+        'children': np.stack([
+            np.where(leaf, nodes, arrays['right']), np.where(leaf, nodes, arrays['left'])
+        ], axis=1).astype(np.intp).ravel(),
+        'split_feature': arrays['feature'].astype(np.intp),
+        'split_threshold': np.where(leaf, np.inf, arrays['threshold'])
+    }
+
+def export_forest(model):
+    """Flatten a fitted tree classifier (forest or single tree) into one set of node arrays"""
+    import numpy as np
+
+    estimators = getattr(model, 'estimators_', None)
+    if estimators is None and hasattr(model, 'tree_'):
+        estimators = [model]
+    if not estimators or not all(hasattr(e, 'tree_') for e in estimators) or not hasattr(model, 'classes_'):
+        raise ValueError(f"{type(model).__name__} is not a tree classifier")
+
+    return {
+        **flatten_trees([e.tree_ for e in estimators], len(model.classes_)),
+        'classes': np.asarray(model.classes_),
+        'n_features': np.int32(model.n_features_in_)
+    }
+
+class FlatForest:
+    """Vectorized forest scorer with the predict/predict_proba/classes_ interface the scripts use"""
+
+    def __init__(self, arrays):
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.left = arrays['left']
+        self.right = arrays['right']
+        self.value = arrays['value']
+        self.roots = arrays['roots']
+        self.classes_ = arrays.get('classes')
+        self.n_features_in_ = int(arrays['n_features'])
+        self.max_depth = int(arrays['max_depth'])
+
+        # Stores carry the traversal tables; compute them for arrays from elsewhere
+        tables = arrays if 'children' in arrays else traversal_tables(arrays)
+        self.children = tables['children']
+        self.split_feature = tables['split_feature']
+        self.split_threshold = tables['split_threshold']
+
+    def apply(self, X):
+        """Leaf node index reached by every row in every tree, shape (n_trees, n_rows)"""
+        import numpy as np
+
+        # sklearn compares float32 features against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected {self.n_features_in_} features per row, got shape {X.shape}")
+
+        n_rows, n_features = X.shape
+        values = X.ravel()
+        offsets = np.tile(np.arange(n_rows, dtype=np.intp) * n_features, len(self.roots))
+        nodes = np.repeat(self.roots.astype(np.intp), n_rows)
+
+        # Every COMPACT_EVERY levels, pairs already sitting on a leaf are dropped
+        active = np.arange(len(nodes))
+        current = nodes.copy()
+        for depth in range(1, self.max_depth + 1):
+            went_left = values[offsets + self.split_feature[current]] <= self.split_threshold[current]
+            current = self.children[2 * current + went_left]
+            if depth % COMPACT_EVERY == 0 and depth < self.max_depth:
+                nodes[active] = current
+                moving = self.children[2 * current] != current
+                active, current, offsets = active[moving], current[moving], offsets[moving]
+        nodes[active] = current
+        return nodes.reshape(len(self.roots), n_rows)
+
+    def accumulate(self, X, out=None, scale=None, leaves=None):
+        """
+        Sum of the leaf values reached in every tree (each times scale, if given),
+        added into out (zeros by default) tree by tree in estimator order so the
+        sums match sklearn bit for bit. Pass leaves (from apply) to reuse a walk.
+        """
+        import numpy as np
+
+        if leaves is None:
+            leaves = self.apply(X)
+        if out is None:
+            out = np.zeros((leaves.shape[1], self.value.shape[1]))
+        for tree_leaves in leaves:
+            out += self.value[tree_leaves] if scale is None else scale * self.value[tree_leaves]
+        return out
+
+    def predict_proba(self, X):
+        proba = self.accumulate(X)
+        proba /= len(self.roots)
+        return proba
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+def build_forest(model_path='model_rf_data.pkl'):
+    """Unpickle the model (needs sklearn), export it and write its memory-mappable store"""
+    arrays = export_forest(unpickle(model_path))
+    save_store(forest_path(model_path), arrays, {
+        'version': FOREST_VERSION, 'signature': list(file_signature(model_path))
+    })
+    return arrays
+
+def open_forest(model_path='model_rf_data.pkl'):
+    """
+    FlatForest over the memory-mapped store of a model pickle, exporting it
+    again when the pickle changed.
+
+    The store is trusted while the pickle's mtime and size match the ones
+    recorded at export time.
+    """
+    _, arrays = open_current(forest_path(model_path), model_path, build_forest, FOREST_VERSION)
+    return FlatForest(arrays)
+
+def load_model(model_path):
+    """Registry loader: the flat forest, or the unpickled model when it cannot be flattened or stored"""
+    try:
+        return open_forest(model_path)
+    except (OSError, ValueError):
+        return unpickle(model_path)
+
+def verify(model_path='model_rf_data.pkl', rows=2000, seed=0):
+    """Compare flat and sklearn predictions on random rows spanning the training ranges"""
+    import numpy as np
+
+    model = unpickle(model_path)
+    forest = open_forest(model_path)
+
+    # Sample each feature between the smallest and largest split threshold, with margin
+    rng = np.random.default_rng(seed)
+    low = np.zeros(forest.n_features_in_)
+    high = np.ones(forest.n_features_in_)
+    inner = forest.left != TREE_LEAF
+    for feature in range(forest.n_features_in_):
+        splits = forest.threshold[inner & (forest.feature == feature)]
+        if len(splits):
+            low[feature], high[feature] = splits.min() - 1, splits.max() + 1
+    X = np.round(rng.uniform(low, high, (rows, forest.n_features_in_)))
+
+    start = time.perf_counter()
+    expected = model.predict_proba(X)
+    sklearn_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    actual = forest.predict_proba(X)
+    flat_ms = (time.perf_counter() - start) * 1000
+
+    # Single-row latency, the per-request case
+    single = X[:1]
+    start = time.perf_counter()
+    for _ in range(20):
+        model.predict_proba(single)
+    sklearn_row_ms = (time.perf_counter() - start) * 1000 / 20
+    start = time.perf_counter()
+    for _ in range(20):
+        forest.predict_proba(single)
+    flat_row_ms = (time.perf_counter() - start) * 1000 / 20
+
+    return {
+        'rows': rows,
+        'trees': len(forest.roots),
+        'max_abs_diff': float(np.abs(expected - actual).max()),
+        'label_mismatches': int((model.predict(X) != forest.predict(X)).sum()),
+        'batch_ms': {'sklearn': round(sklearn_ms, 2), 'flat': round(flat_ms, 2)},
+        'single_row_ms': {'sklearn': round(sklearn_row_ms, 3), 'flat': round(flat_row_ms, 3)}
+    }
+
+def main():
+    args = sys.argv[1:]
+    try:
+        if args and args[0] == '--verify':
+            result = verify(rows=int(args[1]) if len(args) > 1 else 2000)
+            print(json.dumps(result))
+            if result['max_abs_diff'] or result['label_mismatches']:
+                sys.exit(1)
+            return
+        arrays = build_forest(args[0] if args else 'model_rf_data.pkl')
+        result = {
+            'trees': len(arrays['roots']),
+            'nodes': len(arrays['feature']),
+            'max_depth': int(arrays['max_depth']),
+            'classes': arrays['classes'].tolist()
+        }
+    except Exception as e:
+        result = {'error': str(e)}
+
+    print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
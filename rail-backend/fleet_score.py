@@ -0,0 +1,120 @@
+"""
+Parallel failure scoring of a whole inventory with enhanced_ml_prediction.py.
+
+The inventory (CSV or JSON lines, same columns as `enhanced_ml_prediction.py
+--batch`) is read in shards. Each shard is scored on a process pool, and the
+results are written in input order, one JSON line per component.
+
+The model and the historical tables are loaded once, in the parent, before the
+pool starts. With the fork start method (Linux) workers inherit them
+copy-on-write, so nothing is unpickled or loaded again per worker. Elsewhere each
+worker loads them once through its initializer.
+
+    python fleet_score.py inventory.csv --out scores.jsonl --workers 32
+"""
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import sys
+from collections import deque
+
+import enhanced_ml_prediction
+
+SHARD_ROWS = 20_000
+
+# Set in the parent before forking (or by _init_worker); read by score_shard in workers
+_model = None
+_tables = None
+
+def load_scoring_state():
+    """Model and historical tables, as used by enhanced_ml_prediction.py"""
+    global _model, _tables
+    _model = enhanced_ml_prediction.load_rf_model()
+    _tables = enhanced_ml_prediction.load_history_tables()
+
+def _init_worker():
+    if _model is None:
+        load_scoring_state()
+
+def read_shards(path, shard_rows=SHARD_ROWS):
+    """
+    Stream the inventory as (ids or None, feature matrix, errors) shards. The
+    matrix holds the rows that parse; errors maps the position in the shard of
+    every other row to its message.
+    """
+    import pandas as pd
+
+    if path.endswith('.jsonl') or path.endswith('.json'):
+        frames = pd.read_json(path, lines=True, dtype=False, chunksize=shard_rows)
+    else:
+        frames = pd.read_csv(path, dtype=str, chunksize=shard_rows)
+
+    for queries in frames:
+        ids = queries['id'].tolist() if 'id' in queries.columns else None
+        X, errors = enhanced_ml_prediction.encode_queries(queries)
+        yield ids, X, errors
+
+def score_shard(ids, X, errors):
+    """Score one shard and return its output lines as one string; rows in `errors` get an error record"""
+    results = enhanced_ml_prediction.predict_batch(_model, _tables, X) if len(X) else []
+    return ''.join(json.dumps(result) + '\n' for result in enhanced_ml_prediction.merge_errors(results, errors, ids))
+
+def score_fleet(path, out, workers=None, shard_rows=SHARD_ROWS):
+    """
+    Score every component in the inventory and write the results to `out` in
+    order; returns (rows scored, rows written as errors).
+    """
+    load_scoring_state()
+    workers = workers or os.cpu_count() or 1
+    shards = read_shards(path, shard_rows)
+    rows = failed = 0
+
+    if workers == 1:
+        for ids, X, errors in shards:
+            out.write(score_shard(ids, X, errors))
+            rows += len(X)
+            failed += len(errors)
+        return rows, failed
+
+    method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else None
+    if method == 'fork':
+        # Keep the loaded state out of the collector so workers do not copy its pages
+        gc.freeze()
+
+    with multiprocessing.get_context(method).Pool(workers, initializer=_init_worker) as pool:
+        # Bounded window of shards in flight: output stays ordered and memory stays flat
+        pending = deque()
+        for ids, X, errors in shards:
+            if len(pending) >= 2 * workers:
+                out.write(pending.popleft().get())
+            pending.append(pool.apply_async(score_shard, (ids, X, errors)))
+            rows += len(X)
+            failed += len(errors)
+        while pending:
+            out.write(pending.popleft().get())
+
+    return rows, failed
+
+def main():
+    parser = argparse.ArgumentParser(description='Score a whole inventory on a process pool')
+    parser.add_argument('inventory', help='CSV or JSON lines file of /ml/predict style queries')
+    parser.add_argument('--out', help='output JSON lines file (default: stdout)')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--shard-rows', type=int, default=SHARD_ROWS, help='rows scored per task')
+    args = parser.parse_args()
+
+    try:
+        if args.out:
+            with open(args.out, 'w') as out:
+                rows, failed = score_fleet(args.inventory, out, args.workers, args.shard_rows)
+            print(json.dumps({'scored': rows, 'errors': failed, 'out': args.out}))
+        else:
+            score_fleet(args.inventory, sys.stdout, args.workers, args.shard_rows)
+    except Exception as e:
+        print(json.dumps({'error': str(e)}))
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
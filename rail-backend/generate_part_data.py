@@ -0,0 +1,105 @@
+"""
+Synthetic part-data.csv generator for benchmarks.
+
+Writes rows with the same integer-encoded columns as part-data.csv (see
+part_stats.COLUMNS). Each vendor gets a fixed quality level, and the defect
+probability rises with vendor quality, material, route type and service life,
+so the aggregates and the risk cascades behave like real data rather than noise.
+Rows are generated and written in chunks, so 10M+ rows need little memory.
+
+    python generate_part_data.py --rows 1000000 --out bench/part-data.csv
+"""
+import argparse
+import json
+import time
+
+from part_stats import COLUMNS
+
+VENDORS = range(100, 150)
+MATERIALS = range(1, 10)
+REGIONS = range(1, 6)
+
+# Part mix follows the inventory ratios in database.sql (Rail Clips dominate)
+PART_WEIGHTS = {1: 0.70, 2: 0.12, 3: 0.10, 4: 0.08}
+ROUTE_WEIGHTS = {1: 0.15, 2: 0.55, 3: 0.30}
+
+# Typical service life in days per part type, and the extra defect odds per route type
+PART_LIFETIME = {1: 1500, 2: 900, 3: 3600, 4: 1200}
+ROUTE_RISK = {1: 0.08, 2: 0.0, 3: 0.05}
+
+CHUNK_ROWS = 250_000
+
+def generate_chunk(rng, rows, vendor_quality):
+    """One chunk of rows as an (rows x len(COLUMNS)) int array in COLUMNS order"""
+    import numpy as np
+
+    vendor = rng.integers(VENDORS.start, VENDORS.stop, rows)
+    part = rng.choice(list(PART_WEIGHTS), rows, p=list(PART_WEIGHTS.values()))
+    material = rng.integers(MATERIALS.start, MATERIALS.stop, rows)
+    region = rng.integers(REGIONS.start, REGIONS.stop, rows)
+    route = rng.choice(list(ROUTE_WEIGHTS), rows, p=list(ROUTE_WEIGHTS.values()))
+    warranty = rng.integers(1, 6, rows)
+
+    typical_life = np.array([0] + [PART_LIFETIME[p] for p in sorted(PART_LIFETIME)])[part]
+    lifetime = np.maximum(30, rng.normal(typical_life, typical_life * 0.35)).astype(np.int64)
+
+    route_risk = np.array([0.0] + [ROUTE_RISK[r] for r in sorted(ROUTE_RISK)])[route]
+    probability = (
+        vendor_quality[vendor - VENDORS.start]
+        + (material - 1) * 0.01
+        + route_risk
+        + np.clip(lifetime / typical_life - 1, 0, None) * 0.10
+    )
+    defect = (rng.random(rows) < np.clip(probability, 0.01, 0.9)).astype(np.int64)
+
+    columns = {
+        'Vendor ID': vendor, 'Part type': part, 'material': material, 'Defect': defect,
+        'Lifetime (Days)': lifetime, 'Region': region, 'Route Type': route, 'Warranty (Years)': warranty
+    }
+    return np.column_stack([columns[name] for name in COLUMNS])
+
+def format_chunk(chunk):
+    """
+    CSV text for an integer chunk.
+
+    Every column has a small value range, so each distinct value is formatted
+    once and rows are joined from those strings (several times faster than
+    np.savetxt's per-row formatting).
+    """
+    import numpy as np
+
+    columns = []
+    for values in chunk.T:
+        low = int(values.min())
+        strings = np.array([str(value) for value in range(low, int(values.max()) + 1)], dtype=object)
+        columns.append(strings[values - low])
+    return '\n'.join(map(','.join, zip(*columns))) + '\n'
+
+def generate(path, rows, seed=0, chunk_rows=CHUNK_ROWS):
+    """Write `rows` synthetic records to a CSV; returns the elapsed seconds"""
+    import numpy as np
+
+    start = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    vendor_quality = rng.beta(2, 14, len(VENDORS))
+
+    with open(path, 'w', newline='') as f:
+        f.write(','.join(COLUMNS) + '\n')
+        for first in range(0, rows, chunk_rows):
+            chunk = generate_chunk(rng, min(chunk_rows, rows - first), vendor_quality)
+            f.write(format_chunk(chunk))
+
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic part-data.csv rows')
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='synthetic-part-data.csv')
+    args = parser.parse_args()
+
+    seconds = generate(args.out, args.rows, args.seed)
+    print(json.dumps({'path': args.out, 'rows': args.rows, 'seconds': round(seconds, 2)}))
+
+if __name__ == "__main__":
+    main()
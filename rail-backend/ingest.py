@@ -0,0 +1,201 @@
+"""
+Incremental ingestion of new inspection records.
+
+Records are appended to part-data.delta.jsonl and folded into the aggregate
+index (part_stats) in place, so ml_predict.py and lifetime_predict.py see them
+on their next call without a rebuild. Once the log grows past COMPACT_BYTES it
+is compacted: part-data.csv is rewritten with the pending records and the
+updated counters are saved as the snapshot for the new CSV version.
+
+    python ingest.py '{"vendor_id": 101, "part_type": 2, "material": 3, "defect": 1, "lifetime": 640, "region": 1, "route_type": 3, "warranty": 2}'
+    python ingest.py --file new_records.jsonl
+    python ingest.py --compact
+"""
+import csv
+import json
+import os
+import shutil
+import sys
+from contextlib import contextmanager
+
+import part_stats
+from part_stats import COLUMNS
+
+# Compact once the delta log passes this size
+COMPACT_BYTES = 1 << 20
+
+# Request-style field names accepted alongside the CSV column names
+ALIASES = {
+    'vendor_id': 'Vendor ID',
+    'part_type': 'Part type',
+    'material': 'material',
+    'defect': 'Defect',
+    'lifetime': 'Lifetime (Days)',
+    'region': 'Region',
+    'route_type': 'Route Type',
+    'warranty': 'Warranty (Years)'
+}
+
+@contextmanager
+def ingest_lock(csv_path):
+    """Serialize appends and compaction across processes (no-op where fcntl is unavailable)"""
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+
+    with open(os.path.splitext(csv_path)[0] + '.lock', 'w') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+def normalize_record(record):
+    """Map a record to the integer CSV columns, raising ValueError on missing or bad fields"""
+    values = {}
+    for key, value in record.items():
+        column = ALIASES.get(key, key)
+        if column in COLUMNS:
+            values[column] = value
+
+    missing = [column for column in COLUMNS if column not in values]
+    if missing:
+        raise ValueError(f"Record is missing {', '.join(missing)}")
+
+    try:
+        return [int(values[column]) for column in COLUMNS]
+    except (TypeError, ValueError):
+        raise ValueError(f"Record values must be integers: {record}")
+
+def append_records(records, csv_path='part-data.csv', compact_bytes=COMPACT_BYTES):
+    """
+    Append records to the delta log and return a summary.
+
+    All records are validated before anything is written, so a bad record
+    rejects the whole call.
+    """
+    rows = [normalize_record(record) for record in records]
+    data = ''.join(json.dumps(row, separators=(',', ':')) + '\n' for row in rows)
+
+    with ingest_lock(csv_path):
+        with open(part_stats.delta_path(csv_path), 'a') as f:
+            f.write(data)
+        pending = os.path.getsize(part_stats.delta_path(csv_path))
+
+    compacted = 0
+    if compact_bytes and pending >= compact_bytes:
+        compacted = compact(csv_path)
+
+    # Fold the new lines into this process' index right away
+    part_stats.load_stats(csv_path)
+
+    return {'appended': len(rows), 'compacted': compacted}
+
+def write_watermark(csv_path, csv_signature, delta_bytes):
+    """Record that the first delta_bytes of the log are in the CSV with this signature"""
+    path = part_stats.watermark_path(csv_path)
+    with open(path + '.tmp', 'w') as f:
+        json.dump({'csv_signature': list(csv_signature), 'delta_bytes': delta_bytes}, f)
+    os.replace(path + '.tmp', path)
+
+def recover(csv_path='part-data.csv'):
+    """
+    Finish a compaction that stopped part way (call with ingest_lock held).
+
+    If the CSV was already replaced, the records it took from the delta log
+    are dropped from the log; either way the watermark and temp CSV go.
+    """
+    path = part_stats.watermark_path(csv_path)
+    if not os.path.exists(path):
+        return
+
+    done = part_stats.compacted_bytes(csv_path)
+    if done:
+        delta = part_stats.delta_path(csv_path)
+        with open(delta, 'rb') as f:
+            f.seek(done)
+            rest = f.read()
+        with open(delta + '.tmp', 'wb') as f:
+            f.write(rest)
+        os.replace(delta + '.tmp', delta)
+    for leftover in (path, csv_path + '.tmp'):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+    part_stats.forget(csv_path)
+
+def compact(csv_path='part-data.csv'):
+    """
+    Move delta log records into the CSV and return how many were moved.
+
+    The CSV plus the records is written to a temporary file and swapped in
+    with os.replace. A watermark written just before the swap tells
+    load_stats() which delta lines the new CSV already holds, so a crash
+    before the log is truncated never counts a record twice.
+
+    The counters already include every delta record, so the index is saved
+    as the snapshot for the new CSV version instead of being rebuilt.
+    """
+    with ingest_lock(csv_path):
+        recover(csv_path)
+        records, delta_bytes = part_stats.read_delta(csv_path)
+        if not records:
+            return 0
+
+        stats = part_stats.load_stats(csv_path)
+
+        with open(csv_path, 'rb') as f:
+            header = next(csv.reader([f.readline().decode()]))
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b'\n'
+
+        tmp = csv_path + '.tmp'
+        shutil.copyfile(csv_path, tmp)
+        with open(tmp, 'a', newline='') as f:
+            if needs_newline:
+                f.write('\n')
+            writer = csv.writer(f)
+            for record in records:
+                writer.writerow([record.get(column, '') for column in header])
+
+        signature = part_stats.data_signature(tmp)
+        write_watermark(csv_path, signature, delta_bytes)
+        os.replace(tmp, csv_path)
+
+        part_stats.save_stats(csv_path, stats, signature)
+        open(part_stats.delta_path(csv_path), 'w').close()
+        os.remove(part_stats.watermark_path(csv_path))
+        part_stats.forget(csv_path)
+
+    return len(records)
+
+def main():
+    args = sys.argv[1:]
+    try:
+        if args and args[0] == '--compact':
+            result = {'compacted': compact()}
+        else:
+            if args and args[0] == '--file':
+                with open(args[1]) as f:
+                    lines = f.read().splitlines()
+            elif args:
+                lines = args
+            else:
+                lines = sys.stdin.read().splitlines()
+
+            records = []
+            for line in lines:
+                if line.strip():
+                    parsed = json.loads(line)
+                    records.extend(parsed if isinstance(parsed, list) else [parsed])
+            result = append_records(records)
+
+        result['total_records'] = part_stats.load_stats().total
+    except Exception as e:
+        result = {'error': str(e)}
+
+    print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
@@ -1,89 +1,190 @@
-import pickle
-import pandas as pd
-import numpy as np
 import json
 import sys
-from datetime import datetime, timedelta
+
+import model_manifest
+import model_registry
+import model_store
+import prediction_cache
+import timing
+from encoding import PART_TYPE, REGION, ROUTE_TYPE, VOCAB_VERSION
+
+# Width of the feature rows built by build_features()
+N_FEATURES = 10
 
 def load_lifetime_model():
-    """Load the trained lifetime prediction model"""
+    """Load the trained lifetime prediction model (memory-mapped flat store, opened once per file version)"""
     try:
-        with open('lifetime_model.pkl', 'rb') as f:
-            model = pickle.load(f)
-        return model
+        model_manifest.check_features('lifetime_model.pkl', N_FEATURES)
+        return model_registry.load('lifetime_model.pkl', model_store.load_model)
     except Exception as e:
         raise Exception(f"Error loading lifetime model: {str(e)}")
 
-def predict_lifetime(vendor_id, part_type, lot_number, material, warranty_years, region, route_type, days_manuf_to_install=30, days_install_to_inspect=90):
+def build_features(vendor_id, part_type, lot_number, material, warranty_years, region, route_type, days_manuf_to_install=30, days_install_to_inspect=90):
     """
-    Predict component lifetime using the trained model
-    
-    Features expected by model:
+    Feature row in the order the model was trained on:
     ['Index', 'Vendor ID', 'Part type', 'lot', 'material', 'Warrenty', 'Region', 'Route Type', 'days_manuf_to_install', 'days_install_to_inspect']
     """
-    try:
+    return [
+        0,  # Index (placeholder)
+        int(vendor_id),
+        PART_TYPE.code(part_type),
+        int(lot_number),
+        int(material),
+        int(warranty_years),
+        REGION.code(region),
+        ROUTE_TYPE.code(route_type),
+        int(days_manuf_to_install),
+        int(days_install_to_inspect)
+    ]
+
+def encode_requests(requests):
+    """
+    Feature matrix for predict_lifetime() keyword-argument dicts, the same
+    rows build_features() gives, with the categorical columns encoded once
+    per distinct value. Returns (features, errors): the rows of the requests
+    that parse, in order, and the error message of every other request by
+    position.
+    """
+    import numpy as np
+
+    errors = {}
+
+    def numeric(name, default=None):
+        try:
+            return np.fromiter((int(request.get(name, default)) for request in requests), dtype=np.int64, count=len(requests))
+        except (TypeError, ValueError, OverflowError):
+            pass
+        # Some value is bad: parse request by request to find which
+        column = np.zeros(len(requests), dtype=np.int64)
+        for i, request in enumerate(requests):
+            try:
+                column[i] = int(request.get(name, default))
+            except (TypeError, ValueError, OverflowError) as e:
+                errors.setdefault(i, str(e))
+        return column
+
+    def categorical(vocabulary, name):
+        return vocabulary.encode([request[name] for request in requests]).astype(np.int64)
+
+    features = np.column_stack([
+        np.zeros(len(requests), dtype=np.int64),  # Index (placeholder)
+        numeric('vendor_id'),
+        categorical(PART_TYPE, 'part_type'),
+        numeric('lot_number'),
+        numeric('material'),
+        numeric('warranty_years'),
+        categorical(REGION, 'region'),
+        categorical(ROUTE_TYPE, 'route_type'),
+        numeric('days_manuf_to_install', 30),
+        numeric('days_install_to_inspect', 90)
+    ]).reshape(len(requests), N_FEATURES)
+    if errors:
+        features = np.delete(features, list(errors), axis=0)
+    return features, errors
+
+def lifetime_result(predicted_lifetime_hours, vendor_id, part_type, region, route_type, interval=None):
+    """Response for one predicted lifetime (model output is in hours), with its prediction interval if given"""
+    # Convert hours to days and years
+    predicted_lifetime_days = predicted_lifetime_hours / 24
+    predicted_lifetime_years = predicted_lifetime_days / 365.25
+    
+    # Calculate confidence
+    confidence = min(95.0, max(60.0, 100 - abs(predicted_lifetime_hours - 8760) / 500))
+    
+    # Generate insights
+    insights = generate_lifetime_insights(predicted_lifetime_hours, vendor_id, part_type, region, route_type)
+    
+    result = {
+        'predicted_lifetime_hours': round(predicted_lifetime_hours, 1),
+        'predicted_lifetime_days': round(predicted_lifetime_days, 1),
+        'predicted_lifetime_years': round(predicted_lifetime_years, 2),
+        'confidence': round(confidence, 1),
+        'model_type': 'VotingRegressor (Ensemble)',
+        'insights': insights,
+        'risk_assessment': assess_lifetime_risk(predicted_lifetime_hours),
+        'maintenance_schedule': generate_maintenance_schedule(predicted_lifetime_hours)
+    }
+    if interval is not None:
+        result['prediction_interval'] = interval
+    return result
+
+def fallback_result(error):
+    """Default estimate returned when the model cannot be used"""
+    return {
+        'error': str(error),
+        'predicted_lifetime_hours': 24000,
+        'predicted_lifetime_days': 1000,
+        'predicted_lifetime_years': 2.7,
+        'confidence': 50.0,
+        'model_type': 'Fallback',
+        'insights': ['Lifetime prediction model unavailable'],
+        'risk_assessment': 'Medium',
+        'maintenance_schedule': []
+    }
+
+def predict_lifetime_batch(requests, intervals=False):
+    """
+    Predict many components with a single model.predict call.
+
+    Each request is a dict of predict_lifetime() keyword arguments; returns
+    one response per request, in order. With intervals, every response also
+    gets a prediction_interval (standard deviation and percentiles in hours)
+    from the spread of the ensemble's trees, computed in the same pass.
+    A request whose numbers do not parse gets fallback_result() instead.
+    """
+    with timing.stage('model_load'):
         model = load_lifetime_model()
-        
-        # Map string inputs to numeric values
-        part_type_map = {'Rail Clips': 1, 'Rubber Pad': 2, 'Sleeper': 3, 'Liner': 4}
-        region_map = {'North': 1, 'South': 2, 'East': 3, 'West': 4, 'Central': 5, 'Northeast': 6, 'Northwest': 7, 'Southeast': 8}
-        route_type_map = {'High Speed': 1, 'Passenger': 2, 'Freight': 3, 'Mixed': 4}
-        
-        # Convert inputs to numeric
-        part_type_num = part_type_map.get(part_type, 1) if isinstance(part_type, str) else part_type
-        region_num = region_map.get(region, 1) if isinstance(region, str) else region
-        route_type_num = route_type_map.get(route_type, 2) if isinstance(route_type, str) else route_type
-        
-        # Create feature array matching model expectations
-        features = np.array([[
-            0,  # Index (placeholder)
-            int(vendor_id),
-            int(part_type_num),
-            int(lot_number),
-            int(material),
-            int(warranty_years),
-            int(region_num),
-            int(route_type_num),
-            int(days_manuf_to_install),
-            int(days_install_to_inspect)
-        ]])
-        
-        # Make prediction (result is in hours)
-        predicted_lifetime_hours = model.predict(features)[0]
-        
-        # Convert hours to days and years
-        predicted_lifetime_days = predicted_lifetime_hours / 24
-        predicted_lifetime_years = predicted_lifetime_days / 365.25
-        
-        # Calculate confidence
-        confidence = min(95.0, max(60.0, 100 - abs(predicted_lifetime_hours - 8760) / 500))
-        
-        # Generate insights
-        insights = generate_lifetime_insights(predicted_lifetime_hours, vendor_id, part_type, region, route_type)
-        
-        return {
-            'predicted_lifetime_hours': round(predicted_lifetime_hours, 1),
-            'predicted_lifetime_days': round(predicted_lifetime_days, 1),
-            'predicted_lifetime_years': round(predicted_lifetime_years, 2),
-            'confidence': round(confidence, 1),
-            'model_type': 'VotingRegressor (Ensemble)',
-            'insights': insights,
-            'risk_assessment': assess_lifetime_risk(predicted_lifetime_hours),
-            'maintenance_schedule': generate_maintenance_schedule(predicted_lifetime_hours)
-        }
+    features, errors = encode_requests(requests)
+    
+    # Make prediction (result is in hours)
+    with timing.stage('model_predict'):
+        if not len(features):
+            predicted_hours, spreads = [], []
+        elif intervals:
+            distribution = model_store.predict_distribution(model, features)
+            predicted_hours = distribution['mean'].tolist()
+            spreads = interval_rows(distribution)
+        else:
+            predicted_hours = model.predict(features).tolist()
+            spreads = [None] * len(features)
+    
+    scored = zip(predicted_hours, spreads)
+    results = []
+    for i, request in enumerate(requests):
+        if i in errors:
+            results.append(fallback_result(errors[i]))
+            continue
+        hours, interval = next(scored)
+        results.append(lifetime_result(hours, request['vendor_id'], request['part_type'], request['region'], request['route_type'], interval))
+    return results
+
+def interval_rows(distribution):
+    """Per-row prediction_interval blocks from a model_store.predict_distribution() result"""
+    columns = {'std_hours': distribution['std'].tolist()}
+    for q, values in distribution['percentiles'].items():
+        columns[f'p{q}_hours'] = values.tolist()
+    return [
+        {name: round(value, 1) for name, value in zip(columns, row)}
+        for row in zip(*columns.values())
+    ]
+
+def predict_lifetime(vendor_id, part_type, lot_number, material, warranty_years, region, route_type, days_manuf_to_install=30, days_install_to_inspect=90, intervals=False):
+    """Predict component lifetime using the trained model (with its prediction interval if intervals)"""
+    try:
+        return predict_lifetime_batch([{
+            'vendor_id': vendor_id,
+            'part_type': part_type,
+            'lot_number': lot_number,
+            'material': material,
+            'warranty_years': warranty_years,
+            'region': region,
+            'route_type': route_type,
+            'days_manuf_to_install': days_manuf_to_install,
+            'days_install_to_inspect': days_install_to_inspect
+        }], intervals)[0]
         
     except Exception as e:
-        return {
-            'error': str(e),
-            'predicted_lifetime_hours': 24000,
-            'predicted_lifetime_days': 1000,
-            'predicted_lifetime_years': 2.7,
-            'confidence': 50.0,
-            'model_type': 'Fallback',
-            'insights': ['Lifetime prediction model unavailable'],
-            'risk_assessment': 'Medium',
-            'maintenance_schedule': []
-        }
+        return fallback_result(e)
 
 def generate_lifetime_insights(lifetime_hours, vendor_id, part_type, region, route_type):
     """Generate insights based on predicted lifetime in hours"""
@@ -168,8 +269,39 @@ def generate_maintenance_schedule(lifetime_hours):
     
     return schedule
 
+# Request fields and defaults for --batch files (same defaults as the command line)
+BATCH_DEFAULTS = {
+    'vendor_id': 100, 'part_type': 'Rail Clips', 'lot_number': 1001, 'material': 1, 'warranty_years': 2,
+    'region': 'North', 'route_type': 'Passenger', 'days_manuf_to_install': 30, 'days_install_to_inspect': 90
+}
+
+def batch(path, intervals=False):
+    """Predict every component in a CSV/JSONL file and print one JSON result per line"""
+    import pandas as pd
+    
+    if path.endswith('.jsonl') or path.endswith('.json'):
+        queries = pd.read_json(path, lines=True, dtype=False)
+    else:
+        queries = pd.read_csv(path, dtype=str)
+    
+    requests = queries.reindex(columns=list(BATCH_DEFAULTS)).fillna(BATCH_DEFAULTS).to_dict('records')
+    results = predict_lifetime_batch(requests, intervals)
+    
+    ids = queries['id'].tolist() if 'id' in queries.columns else None
+    for i, result in enumerate(results):
+        if ids is not None:
+            result = {'id': ids[i], **result}
+        print(json.dumps(result))
+
 def main():
     try:
+        intervals = '--intervals' in sys.argv
+        if intervals:
+            sys.argv.remove('--intervals')
+        if len(sys.argv) > 2 and sys.argv[1] == '--batch':
+            batch(sys.argv[2], intervals)
+            return
+        
         # Get input parameters from command line
         vendor_id = int(sys.argv[1]) if len(sys.argv) > 1 else 100
         part_type = sys.argv[2] if len(sys.argv) > 2 else "Rail Clips"
@@ -181,13 +313,19 @@ def main():
         days_manuf_to_install = int(sys.argv[8]) if len(sys.argv) > 8 else 30
         days_install_to_inspect = int(sys.argv[9]) if len(sys.argv) > 9 else 90
         
-        # Make prediction
-        result = predict_lifetime(
+        # Make prediction (served from the shared cache while the model file is unchanged)
+        args = (
             vendor_id, part_type, lot_number, material, warranty_years,
             region, route_type, days_manuf_to_install, days_install_to_inspect
         )
+        try:
+            version = model_registry.file_signature('lifetime_model.pkl') + (VOCAB_VERSION,)
+        except OSError:
+            version = None
+        key = args + ('--intervals',) if intervals else args
+        result = prediction_cache.memoize('lifetime_prediction', key, version, lambda: predict_lifetime(*args, intervals=intervals))
         
-        print(json.dumps(result))
+        print(timing.dumps(result))
         
     except Exception as e:
         fallback_result = {
@@ -201,7 +339,8 @@ def main():
             'risk_assessment': 'Unknown',
             'maintenance_schedule': []
         }
-        print(json.dumps(fallback_result))
+        print(timing.dumps(fallback_result))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    timing.configure(sys.argv)
+    timing.run(main)
\ No newline at end of file
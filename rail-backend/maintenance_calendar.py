@@ -0,0 +1,190 @@
+"""
+Fleet-wide maintenance calendar from lifetime predictions.
+
+Takes an inventory CSV with one row per installed component:
+
+    install_date,region,predicted_lifetime_days
+    2024-03-01,North,1460
+    2024-03-04,Central,912
+
+It expands every component into the inspection and replacement events that
+lifetime_predict.py / lifetime_prediction.py would schedule for it. Events
+are computed as arrays, a chunk of components at a time, and counted per
+(day or week, region, event type) inside the requested horizon. Only the
+non-empty buckets are written, row by row, so neither the events nor the
+output are ever held as dicts in memory.
+
+    python maintenance_calendar.py inventory.csv --start 2026-01-01 --days 365 --bucket week
+    python maintenance_calendar.py inventory.csv --schedule model --format jsonl
+
+`predicted_lifetime_hours` may be given instead of `predicted_lifetime_days`.
+"""
+import argparse
+import csv
+import datetime
+import json
+import sys
+
+from part_columns import CHUNK_ROWS
+
+# lifetime_predict.py: fixed initial inspection, then fractions of the predicted lifetime
+RULE_EVENTS = [
+    ('Initial Inspection', None), ('First Maintenance', 0.15), ('Quarter-life Check', 0.25),
+    ('Mid-life Inspection', 0.5), ('Three-quarter Check', 0.75), ('Pre-replacement Inspection', 0.9),
+    ('Replacement Due', 1.0)
+]
+
+# lifetime_prediction.py: inspection intervals by lifetime tier (years), pre-replacement
+# inspection at 90% of lifetimes over a year; replacement added for planning
+MODEL_INTERVALS = [(2, [90, 180, 270, 360]), (5, [180, 365, 545, 730]), (None, [365, 730, 1095, 1460])]
+MODEL_EVENTS = (
+    ['Initial Inspection'] + [f'Scheduled Inspection #{i + 1}' for i in range(4)]
+    + ['Pre-Replacement Inspection', 'Replacement Due']
+)
+
+INITIAL_INSPECTION_DAYS = 30
+
+SCHEDULES = {'rule': [name for name, _ in RULE_EVENTS], 'model': MODEL_EVENTS}
+
+def schedule_offsets(lifetime_days, schedule='rule'):
+    """
+    Days from installation of every event, as an (components x events) int
+    array in SCHEDULES[schedule] order, plus a mask of the events that apply.
+    """
+    import numpy as np
+
+    lifetime_days = np.asarray(lifetime_days, dtype=np.float64)
+    offsets = np.empty((len(lifetime_days), len(SCHEDULES[schedule])), dtype=np.int64)
+    valid = np.ones(offsets.shape, dtype=bool)
+    offsets[:, 0] = INITIAL_INSPECTION_DAYS
+
+    if schedule == 'rule':
+        for i, (_, fraction) in enumerate(RULE_EVENTS[1:], 1):
+            offsets[:, i] = (lifetime_days * fraction).astype(np.int64)
+        return offsets, valid
+
+    lifetime_years = lifetime_days / 365.25
+    intervals = np.empty((len(lifetime_days), 4), dtype=np.int64)
+    assigned = np.zeros(len(lifetime_days), dtype=bool)
+    for limit, tier in MODEL_INTERVALS:
+        rows = ~assigned if limit is None else ~assigned & (lifetime_years < limit)
+        intervals[rows] = tier
+        assigned |= rows
+    offsets[:, 1:5] = intervals
+    valid[:, 1:5] = intervals < lifetime_days[:, None]
+    offsets[:, 5] = (lifetime_days * 0.9).astype(np.int64)
+    valid[:, 5] = lifetime_days > 365
+    offsets[:, 6] = lifetime_days.astype(np.int64)
+    return offsets, valid
+
+def read_inventory(csv_path, chunk_rows=CHUNK_ROWS):
+    """
+    Stream the inventory as (install_day, region_codes, region_labels, lifetime_days)
+    chunks; days count from 1970-01-01 and region_labels[code] is a code's region.
+    """
+    import numpy as np
+    import pandas as pd
+
+    header = pd.read_csv(csv_path, nrows=0).columns
+    lifetime_column = 'predicted_lifetime_days' if 'predicted_lifetime_days' in header else 'predicted_lifetime_hours'
+    for column in ('install_date', 'region', lifetime_column):
+        if column not in header:
+            raise ValueError(f'Inventory is missing the {column} column')
+
+    for frame in pd.read_csv(
+        csv_path, usecols=['install_date', 'region', lifetime_column],
+        dtype={'install_date': str, 'region': 'category'}, chunksize=chunk_rows
+    ):
+        frame = frame.dropna()
+        install_day = pd.to_datetime(frame['install_date'], format='%Y-%m-%d').to_numpy().astype('datetime64[D]').astype(np.int64)
+        lifetime_days = frame[lifetime_column].to_numpy(np.float64)
+        if lifetime_column == 'predicted_lifetime_hours':
+            lifetime_days = lifetime_days / 24
+        region = frame['region'].cat
+        yield install_day, region.codes.to_numpy(np.int64), list(region.categories), lifetime_days
+
+def bucket_index(days, start_day, bucket):
+    """Bucket number of each day counted from start_day (weeks start on Monday)"""
+    if bucket == 'day':
+        return days - start_day
+    # 1970-01-01 was a Thursday; shift by 3 so that week boundaries fall on Mondays
+    return (days + 3) // 7 - (start_day + 3) // 7
+
+def build_calendar(chunks, start_day, days, schedule='rule', bucket='day'):
+    """
+    Count events per (bucket, region, event type) for events in [start_day, start_day + days).
+
+    Returns (regions, counts) where counts is a (buckets x regions x events)
+    int array and regions lists the region labels in first-seen order.
+    """
+    import numpy as np
+
+    events = len(SCHEDULES[schedule])
+    buckets = int(bucket_index(np.int64(start_day + days - 1), start_day, bucket)) + 1
+    regions = {}
+    counts = np.zeros((buckets, 0, events), dtype=np.int64)
+
+    for install_day, region_codes, region_labels, lifetime_days in chunks:
+        region_index = np.array([regions.setdefault(label, len(regions)) for label in region_labels], dtype=np.int64)
+        if len(regions) > counts.shape[1]:
+            counts = np.concatenate([counts, np.zeros((buckets, len(regions) - counts.shape[1], events), np.int64)], axis=1)
+
+        offsets, valid = schedule_offsets(lifetime_days, schedule)
+        event_days = install_day[:, None] + offsets
+        valid &= (event_days >= start_day) & (event_days < start_day + days)
+        component, event = np.nonzero(valid)
+
+        flat = np.ravel_multi_index(
+            (bucket_index(event_days[component, event], start_day, bucket), region_index[region_codes[component]], event),
+            counts.shape
+        )
+        counts += np.bincount(flat, minlength=counts.size).reshape(counts.shape)
+
+    return list(regions), counts
+
+def iter_rows(regions, counts, start_day, schedule='rule', bucket='day'):
+    """Yield (date, region, event, count) for every non-empty bucket, in date order"""
+    import numpy as np
+
+    names = SCHEDULES[schedule]
+    first = start_day if bucket == 'day' else start_day - (start_day + 3) % 7
+    step = 1 if bucket == 'day' else 7
+    order = sorted(range(len(regions)), key=lambda i: regions[i])
+    for b, r, e in zip(*np.nonzero(counts[:, order, :])):
+        date = datetime.date(1970, 1, 1) + datetime.timedelta(days=int(first + b * step))
+        yield date.isoformat(), regions[order[r]], names[e], int(counts[b, order[r], e])
+
+def write_rows(rows, out, fmt='csv'):
+    """Stream calendar rows as CSV or JSON lines"""
+    if fmt == 'jsonl':
+        for date, region, event, count in rows:
+            out.write(json.dumps({'date': date, 'region': region, 'event': event, 'count': count}) + '\n')
+        return
+
+    writer = csv.writer(out, lineterminator='\n')
+    writer.writerow(['date', 'region', 'event', 'count'])
+    writer.writerows(rows)
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-day/week, per-region maintenance workload calendar')
+    parser.add_argument('inventory', help='CSV with install_date, region and predicted_lifetime_days')
+    parser.add_argument('--start', default=datetime.date.today().isoformat(), help='first day (YYYY-MM-DD)')
+    parser.add_argument('--days', type=int, default=365, help='horizon length in days')
+    parser.add_argument('--bucket', choices=['day', 'week'], default='day')
+    parser.add_argument('--schedule', choices=list(SCHEDULES), default='rule',
+                        help='rule: lifetime_predict.py events, model: lifetime_prediction.py events')
+    parser.add_argument('--format', choices=['csv', 'jsonl'], default='csv')
+    args = parser.parse_args()
+
+    try:
+        start_day = (datetime.date.fromisoformat(args.start) - datetime.date(1970, 1, 1)).days
+        regions, counts = build_calendar(
+            read_inventory(args.inventory), start_day, args.days, args.schedule, args.bucket
+        )
+        write_rows(iter_rows(regions, counts, start_day, args.schedule, args.bucket), sys.stdout, args.format)
+    except Exception as e:
+        print(json.dumps({'error': str(e)}))
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
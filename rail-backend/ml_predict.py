@@ -1,246 +1,580 @@
+import csv
 import json
 import sys
-import csv
 
-try:
-    # Get command line arguments
-    vendor_id = sys.argv[1] if len(sys.argv) > 1 else '100'
-    part_type = sys.argv[2] if len(sys.argv) > 2 else 'Rail Clips'
-    material = sys.argv[3] if len(sys.argv) > 3 else '1'
-    lifetime = sys.argv[4] if len(sys.argv) > 4 else '1000'
-    region = sys.argv[5] if len(sys.argv) > 5 else 'North'
-    route_type = sys.argv[6] if len(sys.argv) > 6 else 'Passenger'
-    
-    # Load CSV data
-    data = []
-    with open('part-data.csv', 'r') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            data.append({
-                'Vendor ID': int(row['Vendor ID']),
-                'Part type': int(row['Part type']),
-                'material': int(row['material']),
-                'Defect': int(row['Defect']),
-                'Lifetime (Days)': int(row['Lifetime (Days)']),
-                'Region': int(row['Region']),
-                'Route Type': int(row['Route Type']),
-                'Warranty (Years)': int(row['Warranty (Years)'])
-            })
-    
-    # Map inputs
-    part_map = {'Rail Clips': 1, 'Rubber Pad': 2, 'Sleeper': 3, 'Liner': 4}
-    region_map = {'1': 1, '2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7, '8': 8, '9': 9}
-    route_map = {'High Speed': 1, 'Passenger': 2, 'Freight': 3}
-    
-    vendor_id_num = int(vendor_id)
-    part_type_num = part_map.get(part_type, 1)
-    material_num = int(material)
-    lifetime_num = int(lifetime)
-    region_num = region_map.get(region, 1)
-    route_num = route_map.get(route_type, 2)
-    
-    # REAL DATA ANALYSIS FROM CSV
-    
-    # 1. Analyze vendor performance
-    vendor_data = [row for row in data if row['Vendor ID'] == vendor_id_num]
-    if vendor_data:
-        vendor_defects = sum(row['Defect'] for row in vendor_data)
-        vendor_defect_rate = (vendor_defects / len(vendor_data)) * 100
-        vendor_avg_lifetime = sum(row['Lifetime (Days)'] for row in vendor_data) / len(vendor_data)
-    else:
-        vendor_defect_rate = 20.0  # Unknown vendor = higher risk
-        vendor_avg_lifetime = 1000
-    
-    # 2. Analyze part type performance from actual data
-    part_data = [row for row in data if row['Part type'] == part_type_num]
-    part_defect_rate = (sum(row['Defect'] for row in part_data) / len(part_data)) * 100 if part_data else 15.0
-    part_avg_lifetime = sum(row['Lifetime (Days)'] for row in part_data) / len(part_data) if part_data else 1200
-    
-    # 3. Analyze material performance
-    material_data = [row for row in data if row['material'] == material_num]
-    material_defect_rate = (sum(row['Defect'] for row in material_data) / len(material_data)) * 100 if material_data else 15.0
-    
-    # 4. Analyze route type impact
-    route_data = [row for row in data if row['Route Type'] == route_num]
-    route_defect_rate = (sum(row['Defect'] for row in route_data) / len(route_data)) * 100 if route_data else 15.0
-    
-    # 5. Find exact or similar matches
-    exact_matches = [row for row in data if 
-                    row['Vendor ID'] == vendor_id_num and 
-                    row['Part type'] == part_type_num and 
-                    row['material'] == material_num]
-    
-    similar_matches = [row for row in data if 
-                      row['Part type'] == part_type_num and 
-                      row['material'] == material_num]
-    
-    # RISK CALCULATION BASED ON REAL PATTERNS
-    risk_score = 0
-    risk_factors = []
-    
-    # Vendor risk (based on actual data)
-    if vendor_defect_rate > 30:
-        risk_score += 40
-        risk_factors.append(f'Vendor {vendor_id} has high defect rate: {vendor_defect_rate:.1f}%')
-    elif vendor_defect_rate > 15:
-        risk_score += 25
-        risk_factors.append(f'Vendor {vendor_id} shows elevated defect rate: {vendor_defect_rate:.1f}%')
-    elif vendor_defect_rate > 0:
-        risk_score += 10
-        risk_factors.append(f'Vendor {vendor_id} has some defects: {vendor_defect_rate:.1f}%')
-    else:
-        risk_score -= 5
-        risk_factors.append(f'Vendor {vendor_id} has perfect record (0% defects)')
-    
-    # Part type risk (from actual CSV data)
-    if part_defect_rate > 25:
-        risk_score += 30
-        risk_factors.append(f'{part_type} components show high failure rate: {part_defect_rate:.1f}%')
-    elif part_defect_rate > 10:
-        risk_score += 15
-        risk_factors.append(f'{part_type} components have moderate failure rate: {part_defect_rate:.1f}%')
-    elif part_defect_rate == 0:
-        risk_score -= 10
-        risk_factors.append(f'{part_type} components have perfect record in data')
-    
-    # Material risk (from actual data)
-    if material_defect_rate > 30:
-        risk_score += 25
-        risk_factors.append(f'Material {material_num} shows high failure rate: {material_defect_rate:.1f}%')
-    elif material_defect_rate > 15:
-        risk_score += 15
-        risk_factors.append(f'Material {material_num} has elevated failure rate: {material_defect_rate:.1f}%')
-    elif material_defect_rate == 0:
-        risk_score -= 5
-        risk_factors.append(f'Material {material_num} has excellent record')
-    
-    # Route type risk (from actual data)
-    if route_defect_rate > 25:
-        risk_score += 20
-        risk_factors.append(f'{route_type} routes show higher failure rates: {route_defect_rate:.1f}%')
-    elif route_defect_rate > 10:
-        risk_score += 10
-        risk_factors.append(f'{route_type} routes have moderate failure rates: {route_defect_rate:.1f}%')
-    
-    # Lifetime expectation vs reality
-    expected_lifetime = part_avg_lifetime if part_data else 1200
-    lifetime_ratio = lifetime_num / expected_lifetime
-    
-    if lifetime_ratio > 2.0:  # Expecting much more than typical
-        risk_score += 35
-        risk_factors.append(f'Expected lifetime ({lifetime_num} days) far exceeds typical {part_type} performance ({expected_lifetime:.0f} days)')
-    elif lifetime_ratio > 1.5:
-        risk_score += 25
-        risk_factors.append(f'Expected lifetime significantly above average for {part_type}')
-    elif lifetime_ratio > 1.2:
-        risk_score += 10
-        risk_factors.append(f'Expected lifetime above average for {part_type}')
-    elif lifetime_ratio < 0.5:
-        risk_score += 20
-        risk_factors.append(f'Very short expected lifetime may indicate quality issues')
-    elif lifetime_ratio < 0.8:
-        risk_score += 10
-        risk_factors.append(f'Below-average expected lifetime')
-    
-    # Exact match analysis
-    if exact_matches:
-        exact_defect_rate = (sum(row['Defect'] for row in exact_matches) / len(exact_matches)) * 100
-        if exact_defect_rate > 50:
+import prediction_cache
+import timing
+from encoding import PART_TYPE, REGION, ROUTE_TYPE, VOCAB_VERSION
+from part_stats import data_version, load_stats
+
+# Mixed has never been a route here: it scores with Passenger's rates, like any unknown route
+ROUTES = ROUTE_TYPE.subset(3)
+
+DEFAULTS = {
+    'vendor_id': '100',
+    'part_type': 'Rail Clips',
+    'material': '1',
+    'lifetime': '1000',
+    'region': 'North',
+    'route_type': 'Passenger'
+}
+
+def with_defaults(request, defaults=DEFAULTS):
+    """
+    Request fields as CLI argument strings. Only missing, empty, null or NaN
+    fields take the default, so 0 stays 0 as it does on the command line.
+    """
+    args = {}
+    for key, default in defaults.items():
+        value = request.get(key)
+        missing = value is None or value == '' or value != value
+        args[key] = default if missing else str(value)
+    return args
+
+def predict(stats, vendor_id='100', part_type='Rail Clips', material='1', lifetime='1000', region='North', route_type='Passenger'):
+    """Score one component against the aggregate index of the historical data"""
+    try:
+        # Map inputs
+        vendor_id_num = int(vendor_id)
+        part_type_num = PART_TYPE.code(part_type)
+        material_num = int(material)
+        lifetime_num = int(lifetime)
+        region_num = REGION.code(region)
+        route_num = ROUTES.code(route_type)
+    
+        # REAL DATA ANALYSIS FROM CSV (precomputed aggregate index)
+    
+        # 1. Analyze vendor performance
+        vendor_count, vendor_defects, vendor_lifetime = stats.lookup(('Vendor ID',), vendor_id_num)
+        if vendor_count:
+            vendor_defect_rate = (vendor_defects / vendor_count) * 100
+            vendor_avg_lifetime = vendor_lifetime / vendor_count
+        else:
+            vendor_defect_rate = 20.0  # Unknown vendor = higher risk
+            vendor_avg_lifetime = 1000
+    
+        # 2. Analyze part type performance from actual data
+        part_count, part_defects, part_lifetime = stats.lookup(('Part type',), part_type_num)
+        part_defect_rate = (part_defects / part_count) * 100 if part_count else 15.0
+        part_avg_lifetime = part_lifetime / part_count if part_count else 1200
+    
+        # 3. Analyze material performance
+        material_count, material_defects, _ = stats.lookup(('material',), material_num)
+        material_defect_rate = (material_defects / material_count) * 100 if material_count else 15.0
+    
+        # 4. Analyze route type impact
+        route_count, route_defects, _ = stats.lookup(('Route Type',), route_num)
+        route_defect_rate = (route_defects / route_count) * 100 if route_count else 15.0
+    
+        # 5. Find exact or similar matches
+        exact_count, exact_defects, _ = stats.lookup(('Vendor ID', 'Part type', 'material'), vendor_id_num, part_type_num, material_num)
+        similar_count, similar_defects, _ = stats.lookup(('Part type', 'material'), part_type_num, material_num)
+    
+        # RISK CALCULATION BASED ON REAL PATTERNS
+        risk_score = 0
+        risk_factors = []
+    
+        # Vendor risk (based on actual data)
+        if vendor_defect_rate > 30:
             risk_score += 40
-            risk_factors.append(f'Identical components in data show {exact_defect_rate:.1f}% failure rate')
-        elif exact_defect_rate > 0:
-            risk_score += 20
-            risk_factors.append(f'Identical components show {exact_defect_rate:.1f}% defect rate')
+            risk_factors.append(f'Vendor {vendor_id} has high defect rate: {vendor_defect_rate:.1f}%')
+        elif vendor_defect_rate > 15:
+            risk_score += 25
+            risk_factors.append(f'Vendor {vendor_id} shows elevated defect rate: {vendor_defect_rate:.1f}%')
+        elif vendor_defect_rate > 0:
+            risk_score += 10
+            risk_factors.append(f'Vendor {vendor_id} has some defects: {vendor_defect_rate:.1f}%')
         else:
-            risk_score -= 15
-            risk_factors.append(f'Identical components have perfect record ({len(exact_matches)} samples)')
+            risk_score -= 5
+            risk_factors.append(f'Vendor {vendor_id} has perfect record (0% defects)')
     
-    # Similar match analysis
-    elif similar_matches:
-        similar_defect_rate = (sum(row['Defect'] for row in similar_matches) / len(similar_matches)) * 100
-        if similar_defect_rate > 30:
+        # Part type risk (from actual CSV data)
+        if part_defect_rate > 25:
+            risk_score += 30
+            risk_factors.append(f'{part_type} components show high failure rate: {part_defect_rate:.1f}%')
+        elif part_defect_rate > 10:
+            risk_score += 15
+            risk_factors.append(f'{part_type} components have moderate failure rate: {part_defect_rate:.1f}%')
+        elif part_defect_rate == 0:
+            risk_score -= 10
+            risk_factors.append(f'{part_type} components have perfect record in data')
+    
+        # Material risk (from actual data)
+        if material_defect_rate > 30:
             risk_score += 25
-            risk_factors.append(f'Similar components show {similar_defect_rate:.1f}% failure rate')
-        elif similar_defect_rate > 10:
+            risk_factors.append(f'Material {material_num} shows high failure rate: {material_defect_rate:.1f}%')
+        elif material_defect_rate > 15:
             risk_score += 15
-            risk_factors.append(f'Similar components have {similar_defect_rate:.1f}% defect rate')
-    
-    # Final prediction based on comprehensive risk score
-    risk_score = max(0, min(100, risk_score))  # Clamp between 0-100
-    
-    if risk_score >= 70:
-        prediction = 'HIGH RISK'
-        status = 'fail'
-        confidence = min(95, 70 + (risk_score - 70) * 0.8)
-    elif risk_score >= 40:
-        prediction = 'MODERATE RISK'
-        status = 'warning'
-        confidence = 50 + (risk_score - 40) * 0.6
-    elif risk_score >= 15:
-        prediction = 'LOW RISK'
-        status = 'pass'
-        confidence = 75 + (15 - risk_score) * 0.8
-    else:
-        prediction = 'APPROVED'
-        status = 'pass'
-        confidence = min(95, 85 + (15 - risk_score) * 0.5)
-    
-    # Generate data-driven recommendations
-    recommendations = []
-    if status == 'fail':
-        recommendations = [
-            f'HIGH FAILURE RISK: {confidence:.1f}% confidence',
-            'Strongly recommend alternative vendor/specification',
-            'Mandatory enhanced quality testing required',
-            'Consider different material grade or part type',
-            'Immediate inspection required if installed'
-        ]
-        if exact_matches:
-            recommendations.append(f'Historical data shows {len(exact_matches)} identical components with issues')
-    elif status == 'warning':
-        recommendations = [
-            f'MODERATE RISK: {confidence:.1f}% confidence',
-            'Enhanced monitoring recommended',
-            'Increase inspection frequency by 100%',
-            'Consider backup components',
-            'Document performance closely'
-        ]
-    else:
-        recommendations = [
-            f'COMPONENT APPROVED: {confidence:.1f}% confidence',
-            'Follow standard maintenance procedures',
-            'Regular monitoring as scheduled',
-            f'Expected service life: {expected_lifetime/365:.1f} years'
-        ]
-        if vendor_defect_rate == 0:
-            recommendations.append('Vendor has excellent quality track record')
-    
-    result = {
-        'prediction': prediction,
-        'probability': round(confidence, 1),
-        'status': status,
-        'risk_score': round(risk_score, 1),
-        'risk_factors': risk_factors,
-        'historical_performance': {
-            'historical_defect_rate': round(vendor_defect_rate, 2),
-            'total_parts_supplied': len(vendor_data),
-            'avg_lifetime': round(vendor_avg_lifetime / 365, 1),
-            'part_type_defect_rate': round(part_defect_rate, 2),
-            'material_defect_rate': round(material_defect_rate, 2),
-            'route_defect_rate': round(route_defect_rate, 2),
-            'exact_matches': len(exact_matches),
-            'similar_matches': len(similar_matches)
-        },
-        'recommendations': recommendations,
-        'model_info': {
-            'model_type': 'Real Data Analysis Model',
-            'features_used': 7,
-            'training_data_size': len(data),
-            'data_patterns': f'Analyzed {len(data)} real components'
-        }
-    }
+            risk_factors.append(f'Material {material_num} has elevated failure rate: {material_defect_rate:.1f}%')
+        elif material_defect_rate == 0:
+            risk_score -= 5
+            risk_factors.append(f'Material {material_num} has excellent record')
     
-except Exception as e:
-    result = {'error': str(e)}
+        # Route type risk (from actual data)
+        if route_defect_rate > 25:
+            risk_score += 20
+            risk_factors.append(f'{route_type} routes show higher failure rates: {route_defect_rate:.1f}%')
+        elif route_defect_rate > 10:
+            risk_score += 10
+            risk_factors.append(f'{route_type} routes have moderate failure rates: {route_defect_rate:.1f}%')
+    
+        # Lifetime expectation vs reality
+        expected_lifetime = part_avg_lifetime if part_count else 1200
+        lifetime_ratio = lifetime_num / expected_lifetime
+    
+        if lifetime_ratio > 2.0:  # Expecting much more than typical
+            risk_score += 35
+            risk_factors.append(f'Expected lifetime ({lifetime_num} days) far exceeds typical {part_type} performance ({expected_lifetime:.0f} days)')
+        elif lifetime_ratio > 1.5:
+            risk_score += 25
+            risk_factors.append(f'Expected lifetime significantly above average for {part_type}')
+        elif lifetime_ratio > 1.2:
+            risk_score += 10
+            risk_factors.append(f'Expected lifetime above average for {part_type}')
+        elif lifetime_ratio < 0.5:
+            risk_score += 20
+            risk_factors.append(f'Very short expected lifetime may indicate quality issues')
+        elif lifetime_ratio < 0.8:
+            risk_score += 10
+            risk_factors.append(f'Below-average expected lifetime')
+    
+        # Exact match analysis
+        if exact_count:
+            exact_defect_rate = (exact_defects / exact_count) * 100
+            if exact_defect_rate > 50:
+                risk_score += 40
+                risk_factors.append(f'Identical components in data show {exact_defect_rate:.1f}% failure rate')
+            elif exact_defect_rate > 0:
+                risk_score += 20
+                risk_factors.append(f'Identical components show {exact_defect_rate:.1f}% defect rate')
+            else:
+                risk_score -= 15
+                risk_factors.append(f'Identical components have perfect record ({exact_count} samples)')
+    
+        # Similar match analysis
+        elif similar_count:
+            similar_defect_rate = (similar_defects / similar_count) * 100
+            if similar_defect_rate > 30:
+                risk_score += 25
+                risk_factors.append(f'Similar components show {similar_defect_rate:.1f}% failure rate')
+            elif similar_defect_rate > 10:
+                risk_score += 15
+                risk_factors.append(f'Similar components have {similar_defect_rate:.1f}% defect rate')
+    
+        # Final prediction based on comprehensive risk score
+        risk_score = max(0, min(100, risk_score))  # Clamp between 0-100
+    
+        if risk_score >= 70:
+            prediction = 'HIGH RISK'
+            status = 'fail'
+            confidence = min(95, 70 + (risk_score - 70) * 0.8)
+        elif risk_score >= 40:
+            prediction = 'MODERATE RISK'
+            status = 'warning'
+            confidence = 50 + (risk_score - 40) * 0.6
+        elif risk_score >= 15:
+            prediction = 'LOW RISK'
+            status = 'pass'
+            confidence = 75 + (15 - risk_score) * 0.8
+        else:
+            prediction = 'APPROVED'
+            status = 'pass'
+            confidence = min(95, 85 + (15 - risk_score) * 0.5)
+    
+        # Generate data-driven recommendations
+        recommendations = []
+        if status == 'fail':
+            recommendations = [
+                f'HIGH FAILURE RISK: {confidence:.1f}% confidence',
+                'Strongly recommend alternative vendor/specification',
+                'Mandatory enhanced quality testing required',
+                'Consider different material grade or part type',
+                'Immediate inspection required if installed'
+            ]
+            if exact_count:
+                recommendations.append(f'Historical data shows {exact_count} identical components with issues')
+        elif status == 'warning':
+            recommendations = [
+                f'MODERATE RISK: {confidence:.1f}% confidence',
+                'Enhanced monitoring recommended',
+                'Increase inspection frequency by 100%',
+                'Consider backup components',
+                'Document performance closely'
+            ]
+        else:
+            recommendations = [
+                f'COMPONENT APPROVED: {confidence:.1f}% confidence',
+                'Follow standard maintenance procedures',
+                'Regular monitoring as scheduled',
+                f'Expected service life: {expected_lifetime/365:.1f} years'
+            ]
+            if vendor_defect_rate == 0:
+                recommendations.append('Vendor has excellent quality track record')
+    
+        result = {
+            'prediction': prediction,
+            'probability': round(confidence, 1),
+            'status': status,
+            'risk_score': round(risk_score, 1),
+            'risk_factors': risk_factors,
+            'historical_performance': {
+                'historical_defect_rate': round(vendor_defect_rate, 2),
+                'total_parts_supplied': vendor_count,
+                'avg_lifetime': round(vendor_avg_lifetime / 365, 1),
+                'part_type_defect_rate': round(part_defect_rate, 2),
+                'material_defect_rate': round(material_defect_rate, 2),
+                'route_defect_rate': round(route_defect_rate, 2),
+                'exact_matches': exact_count,
+                'similar_matches': similar_count
+            },
+            'recommendations': recommendations,
+            'model_info': {
+                'model_type': 'Real Data Analysis Model',
+                'features_used': 7,
+                'training_data_size': stats.total,
+                'data_patterns': f'Analyzed {stats.total} real components'
+            }
+        }
+        return result
+
+    except Exception as e:
+        return {'error': str(e)}
+
+def read_queries(path):
+    """Read component queries from a CSV (header row) or JSONL file"""
+    with open(path, 'r') as f:
+        if path.endswith('.jsonl') or path.endswith('.json'):
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(f)
+
+def _lookup_rows(np, stats, dims, *columns):
+    """Gather (count, defect_sum, lifetime_sum) arrays, one index lookup per distinct key"""
+    # Distinct key tuples (rows of the stacked columns), whatever the value range
+    distinct, inverse = np.unique(np.column_stack(columns), axis=0, return_inverse=True)
+    keys = map(tuple, distinct.tolist())
+    table = np.array([stats.lookup(dims, *key) for key in keys], dtype=np.int64).reshape(-1, 3)
+    rows = table[inverse.reshape(-1)]
+    return rows[:, 0], rows[:, 1], rows[:, 2]
+
+def _rate(np, defects, count, default):
+    """Defect rate in percent, or the default where there is no history"""
+    return np.where(count > 0, defects / np.maximum(count, 1) * 100, default)
+
+def score_batch(stats, queries):
+    """
+    Score many components in one pass.
+
+    Inputs are parsed and looked up once, then the same threshold cascade as
+    predict() is applied as array operations over all rows. Returns one
+    result dict per query, in input order.
+    """
+    import numpy as np
+
+    queries = [with_defaults(query) for query in queries]
+    results = [None] * len(queries)
+
+    # Parse inputs; rows that do not parse get the same error shape as predict()
+    valid, parsed = [], []
+    int64 = np.iinfo(np.int64)
+    for i, query in enumerate(queries):
+        try:
+            values = (int(query['vendor_id']), int(query['material']), int(query['lifetime']))
+        except Exception as e:
+            results[i] = {'error': str(e)}
+            continue
+        if all(int64.min <= value <= int64.max for value in values):
+            parsed.append(values)
+            valid.append(i)
+        else:
+            # Beyond the array dtype: score this row on its own
+            results[i] = predict(stats, **query)
+
+    if not valid:
+        return results
+
+    vendor, material, lifetime = np.array(parsed, dtype=np.int64).reshape(-1, 3).T
+    part = PART_TYPE.encode([queries[i]['part_type'] for i in valid]).astype(np.int64)
+    route = ROUTES.encode([queries[i]['route_type'] for i in valid]).astype(np.int64)
+
+    # Group statistics for every row
+    vendor_count, vendor_defects, vendor_lifetime = _lookup_rows(np, stats, ('Vendor ID',), vendor)
+    part_count, part_defects, part_lifetime = _lookup_rows(np, stats, ('Part type',), part)
+    material_count, material_defects, _ = _lookup_rows(np, stats, ('material',), material)
+    route_count, route_defects, _ = _lookup_rows(np, stats, ('Route Type',), route)
+    exact_count, exact_defects, _ = _lookup_rows(np, stats, ('Vendor ID', 'Part type', 'material'), vendor, part, material)
+    similar_count, similar_defects, _ = _lookup_rows(np, stats, ('Part type', 'material'), part, material)
+
+    vendor_rate = _rate(np, vendor_defects, vendor_count, 20.0)
+    vendor_avg_lifetime = np.where(vendor_count > 0, vendor_lifetime / np.maximum(vendor_count, 1), 1000)
+    part_rate = _rate(np, part_defects, part_count, 15.0)
+    expected_lifetime = np.where(part_count > 0, part_lifetime / np.maximum(part_count, 1), 1200)
+    material_rate = _rate(np, material_defects, material_count, 15.0)
+    route_rate = _rate(np, route_defects, route_count, 15.0)
+    exact_rate = _rate(np, exact_defects, exact_count, 0.0)
+    similar_rate = _rate(np, similar_defects, similar_count, 0.0)
+    lifetime_ratio = lifetime / expected_lifetime
+
+    # Threshold cascade: each tier array indexes the matching message below, -1 = no factor
+    vendor_tier = np.select([vendor_rate > 30, vendor_rate > 15, vendor_rate > 0], [0, 1, 2], 3)
+    part_tier = np.select([part_rate > 25, part_rate > 10, part_rate == 0], [0, 1, 2], -1)
+    material_tier = np.select([material_rate > 30, material_rate > 15, material_rate == 0], [0, 1, 2], -1)
+    route_tier = np.select([route_rate > 25, route_rate > 10], [0, 1], -1)
+    lifetime_tier = np.select(
+        [lifetime_ratio > 2.0, lifetime_ratio > 1.5, lifetime_ratio > 1.2, lifetime_ratio < 0.5, lifetime_ratio < 0.8],
+        [0, 1, 2, 3, 4], -1
+    )
+    exact_tier = np.select(
+        [exact_count > 0, similar_count == 0],
+        [np.select([exact_rate > 50, exact_rate > 0], [0, 1], 2), -1],
+        np.select([similar_rate > 30, similar_rate > 10], [3, 4], -1)
+    )
+
+    def points(tier, values):
+        # Tier -1 picks the trailing 0 (no score change)
+        return np.array(values + [0])[tier]
+
+    risk_score = (
+        points(vendor_tier, [40, 25, 10, -5])
+        + points(part_tier, [30, 15, -10])
+        + points(material_tier, [25, 15, -5])
+        + points(route_tier, [20, 10])
+        + points(lifetime_tier, [35, 25, 10, 20, 10])
+        + points(exact_tier, [40, 20, -15, 25, 15])
+    )
+    risk_score = np.clip(risk_score, 0, 100)
+
+    band = np.select([risk_score >= 70, risk_score >= 40, risk_score >= 15], [0, 1, 2], 3)
+    confidence = np.select(
+        [band == 0, band == 1, band == 2],
+        [np.minimum(95, 70 + (risk_score - 70) * 0.8), 50 + (risk_score - 40) * 0.6, 75 + (15 - risk_score) * 0.8],
+        np.minimum(95, 85 + (15 - risk_score) * 0.5)
+    )
+
+    # Render the per-row JSON results
+    vendor_tier, part_tier, material_tier, route_tier, lifetime_tier, exact_tier, band = (
+        tier.tolist() for tier in (vendor_tier, part_tier, material_tier, route_tier, lifetime_tier, exact_tier, band)
+    )
+    vendor_rate, part_rate, material_rate, route_rate, exact_rate, similar_rate = (
+        rate.tolist() for rate in (vendor_rate, part_rate, material_rate, route_rate, exact_rate, similar_rate)
+    )
+    material, lifetime, risk_score, confidence = material.tolist(), lifetime.tolist(), risk_score.tolist(), confidence.tolist()
+    vendor_count, exact_count, similar_count = vendor_count.tolist(), exact_count.tolist(), similar_count.tolist()
+    vendor_avg_lifetime, expected_lifetime = vendor_avg_lifetime.tolist(), expected_lifetime.tolist()
+
+    for j, i in enumerate(valid):
+        query = queries[i]
+        vendor_id, part_type, route_type = query['vendor_id'], query['part_type'], query['route_type']
+        vr, pr, mr, rr = vendor_rate[j], part_rate[j], material_rate[j], route_rate[j]
+        expected = expected_lifetime[j]
+        conf = confidence[j]
+        exact_n = exact_count[j]
+
+        risk_factors = []
+        tier = vendor_tier[j]
+        if tier == 0:
+            risk_factors.append(f'Vendor {vendor_id} has high defect rate: {vr:.1f}%')
+        elif tier == 1:
+            risk_factors.append(f'Vendor {vendor_id} shows elevated defect rate: {vr:.1f}%')
+        elif tier == 2:
+            risk_factors.append(f'Vendor {vendor_id} has some defects: {vr:.1f}%')
+        else:
+            risk_factors.append(f'Vendor {vendor_id} has perfect record (0% defects)')
+
+        tier = part_tier[j]
+        if tier == 0:
+            risk_factors.append(f'{part_type} components show high failure rate: {pr:.1f}%')
+        elif tier == 1:
+            risk_factors.append(f'{part_type} components have moderate failure rate: {pr:.1f}%')
+        elif tier == 2:
+            risk_factors.append(f'{part_type} components have perfect record in data')
+
+        tier = material_tier[j]
+        if tier == 0:
+            risk_factors.append(f'Material {material[j]} shows high failure rate: {mr:.1f}%')
+        elif tier == 1:
+            risk_factors.append(f'Material {material[j]} has elevated failure rate: {mr:.1f}%')
+        elif tier == 2:
+            risk_factors.append(f'Material {material[j]} has excellent record')
+
+        tier = route_tier[j]
+        if tier == 0:
+            risk_factors.append(f'{route_type} routes show higher failure rates: {rr:.1f}%')
+        elif tier == 1:
+            risk_factors.append(f'{route_type} routes have moderate failure rates: {rr:.1f}%')
+
+        tier = lifetime_tier[j]
+        if tier == 0:
+            risk_factors.append(f'Expected lifetime ({lifetime[j]} days) far exceeds typical {part_type} performance ({expected:.0f} days)')
+        elif tier == 1:
+            risk_factors.append(f'Expected lifetime significantly above average for {part_type}')
+        elif tier == 2:
+            risk_factors.append(f'Expected lifetime above average for {part_type}')
+        elif tier == 3:
+            risk_factors.append('Very short expected lifetime may indicate quality issues')
+        elif tier == 4:
+            risk_factors.append('Below-average expected lifetime')
+
+        tier = exact_tier[j]
+        if tier == 0:
+            risk_factors.append(f'Identical components in data show {exact_rate[j]:.1f}% failure rate')
+        elif tier == 1:
+            risk_factors.append(f'Identical components show {exact_rate[j]:.1f}% defect rate')
+        elif tier == 2:
+            risk_factors.append(f'Identical components have perfect record ({exact_n} samples)')
+        elif tier == 3:
+            risk_factors.append(f'Similar components show {similar_rate[j]:.1f}% failure rate')
+        elif tier == 4:
+            risk_factors.append(f'Similar components have {similar_rate[j]:.1f}% defect rate')
+
+        if band[j] == 0:
+            prediction, status = 'HIGH RISK', 'fail'
+            recommendations = [
+                f'HIGH FAILURE RISK: {conf:.1f}% confidence',
+                'Strongly recommend alternative vendor/specification',
+                'Mandatory enhanced quality testing required',
+                'Consider different material grade or part type',
+                'Immediate inspection required if installed'
+            ]
+            if exact_n:
+                recommendations.append(f'Historical data shows {exact_n} identical components with issues')
+        elif band[j] == 1:
+            prediction, status = 'MODERATE RISK', 'warning'
+            recommendations = [
+                f'MODERATE RISK: {conf:.1f}% confidence',
+                'Enhanced monitoring recommended',
+                'Increase inspection frequency by 100%',
+                'Consider backup components',
+                'Document performance closely'
+            ]
+        else:
+            prediction, status = ('LOW RISK' if band[j] == 2 else 'APPROVED'), 'pass'
+            recommendations = [
+                f'COMPONENT APPROVED: {conf:.1f}% confidence',
+                'Follow standard maintenance procedures',
+                'Regular monitoring as scheduled',
+                f'Expected service life: {expected/365:.1f} years'
+            ]
+            if vr == 0:
+                recommendations.append('Vendor has excellent quality track record')
+
+        results[i] = {
+            'prediction': prediction,
+            'probability': round(conf, 1),
+            'status': status,
+            'risk_score': risk_score[j],
+            'risk_factors': risk_factors,
+            'historical_performance': {
+                'historical_defect_rate': round(vr, 2),
+                'total_parts_supplied': vendor_count[j],
+                'avg_lifetime': round(vendor_avg_lifetime[j] / 365, 1),
+                'part_type_defect_rate': round(pr, 2),
+                'material_defect_rate': round(mr, 2),
+                'route_defect_rate': round(rr, 2),
+                'exact_matches': exact_n,
+                'similar_matches': similar_count[j]
+            },
+            'recommendations': recommendations,
+            'model_info': {
+                'model_type': 'Real Data Analysis Model',
+                'features_used': 7,
+                'training_data_size': stats.total,
+                'data_patterns': f'Analyzed {stats.total} real components'
+            }
+        }
+
+    return results
+
+def batch(path, stdout=sys.stdout):
+    """Score every query in a CSV/JSONL file and write one JSON result per line"""
+    queries = list(read_queries(path))
+    results = score_batch(load_stats(), queries)
+    for query, result in zip(queries, results):
+        if 'id' in query:
+            result = {'id': query['id'], **result}
+        stdout.write(json.dumps(result) + '\n')
+
+def serve(csv_path='part-data.csv', stdin=sys.stdin, stdout=sys.stdout):
+    """
+    Long-lived JSON-lines mode: load the CSV once, then answer one request per line.
+
+    Request:  {"id": 7, "vendor_id": "100", "part_type": "Rail Clips", ...}
+    Response: {"id": 7, "prediction": ..., ...}  (same shape as the CLI output)
+
+    The aggregate index is rebuilt only when the CSV changes.
+    """
+    stats = load_stats(csv_path)
+
+    for line in stdin:
+        line = line.strip()
+        if not line:
+            continue
+
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get('id')
+            timing.reset()
+
+            with timing.stage('load_stats'):
+                stats = load_stats(csv_path)
+            args = with_defaults(request)
+            with timing.stage('predict'):
+                result = predict(stats, **args)
+        except Exception as e:
+            result = {'error': str(e)}
+
+        stdout.write(timing.dumps({'id': request_id, **result}) + '\n')
+        stdout.flush()
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--serve':
+        try:
+            serve()
+        except Exception as e:
+            print(json.dumps({'id': None, 'error': str(e)}))
+            sys.exit(1)
+        return
+
+    if len(sys.argv) > 2 and sys.argv[1] == '--batch':
+        try:
+            batch(sys.argv[2])
+        except Exception as e:
+            print(json.dumps({'error': str(e)}))
+            sys.exit(1)
+        return
+
+    # Get command line arguments
+    vendor_id = sys.argv[1] if len(sys.argv) > 1 else DEFAULTS['vendor_id']
+    part_type = sys.argv[2] if len(sys.argv) > 2 else DEFAULTS['part_type']
+    material = sys.argv[3] if len(sys.argv) > 3 else DEFAULTS['material']
+    lifetime = sys.argv[4] if len(sys.argv) > 4 else DEFAULTS['lifetime']
+    region = sys.argv[5] if len(sys.argv) > 5 else DEFAULTS['region']
+    route_type = sys.argv[6] if len(sys.argv) > 6 else DEFAULTS['route_type']
+
+    args = (vendor_id, part_type, material, lifetime, region, route_type)
+
+    def compute():
+        try:
+            with timing.stage('load_stats'):
+                stats = load_stats()
+            with timing.stage('predict'):
+                return predict(stats, *args)
+        except Exception as e:
+            return {'error': str(e)}
+
+    # Repeated requests against unchanged data are served from the shared cache
+    try:
+        version = data_version() + (VOCAB_VERSION,)
+    except OSError:
+        version = None
+    result = prediction_cache.memoize('ml_predict', args, version, compute)
+
+    print(timing.dumps(result))
 
-print(json.dumps(result))
\ No newline at end of file
+if __name__ == "__main__":
+    timing.configure(sys.argv)
+    timing.run(main)
@@ -1,32 +1,36 @@
-import pickle
 import json
 
+import model_registry
+from model_manifest import load_manifest
+
 try:
-    # Load and inspect the model file
-    with open('model_rf_data.pkl', 'rb') as f:
-        model_data = pickle.load(f)
+    # Feature information comes from the manifest (built once per model version)
+    manifest = load_manifest('model_rf_data.pkl')
+    
+    # Load and inspect the model file (already loaded if the manifest was just built)
+    model_data = model_registry.load('model_rf_data.pkl')
     
     # Extract model information
     analysis = {
-        'model_type': str(type(model_data)),
+        'model_type': manifest['estimator_type'],
         'has_predict': hasattr(model_data, 'predict'),
-        'has_predict_proba': hasattr(model_data, 'predict_proba'),
+        'has_predict_proba': manifest['has_predict_proba'],
         'attributes': [attr for attr in dir(model_data) if not attr.startswith('_')]
     }
     
-    # Try to get feature information
-    if hasattr(model_data, 'n_features_in_'):
-        analysis['n_features'] = model_data.n_features_in_
+    if manifest['n_features_in'] is not None:
+        analysis['n_features'] = manifest['n_features_in']
     
-    if hasattr(model_data, 'feature_names_in_'):
-        analysis['feature_names'] = list(model_data.feature_names_in_)
+    if manifest['feature_names_in'] is not None:
+        analysis['feature_names'] = manifest['feature_names_in']
     
-    if hasattr(model_data, 'classes_'):
-        analysis['classes'] = list(model_data.classes_)
+    if manifest['classes'] is not None:
+        analysis['classes'] = manifest['classes']
     
     # Test with sample data to understand input/output
     try:
-        sample_input = [[1, 1, 1, 5, 1, 1]]  # 6 features as per training code
+        n_features = analysis.get('n_features', 6)
+        sample_input = [([1, 1, 1, 5, 1, 1] + [1] * n_features)[:n_features]]
         prediction = model_data.predict(sample_input)
         analysis['sample_prediction'] = int(prediction[0])
         analysis['prediction_type'] = str(type(prediction[0]))
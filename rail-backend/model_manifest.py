@@ -0,0 +1,141 @@
+"""
+Model manifests: what a .pkl expects, recorded once in a sidecar JSON file.
+
+Building a manifest unpickles the model a single time and stores its estimator
+type, n_features_in_, feature_names_in_, classes_, the estimators of
+an ensemble and a sha256 of the file next to it (model_rf_data.manifest.json).
+Reading one is a small JSON load, so prediction scripts and health checks
+can validate inputs without loading the model.
+
+    python model_manifest.py                   # build/refresh manifests for both models
+    python model_manifest.py --check           # read only; exit 1 if missing or stale
+    python model_manifest.py --verify          # also re-hash the model files
+"""
+import json
+import os
+import sys
+
+from model_registry import file_signature
+
+MANIFEST_VERSION = 1
+MODEL_FILES = ['model_rf_data.pkl', 'lifetime_model.pkl']
+
+def manifest_path(model_path):
+    """Sidecar file holding the manifest for a model"""
+    return os.path.splitext(model_path)[0] + '.manifest.json'
+
+def _type_name(value):
+    return f'{type(value).__module__}.{type(value).__name__}'
+
+def _listed(value):
+    return value.tolist() if hasattr(value, 'tolist') else list(value)
+
+def _kind(model):
+    """'classifier', 'regressor' or None (newer sklearn keeps this in estimator tags)"""
+    try:
+        from sklearn.base import is_classifier, is_regressor
+    except ImportError:
+        return getattr(model, '_estimator_type', None)
+    return 'classifier' if is_classifier(model) else 'regressor' if is_regressor(model) else None
+
+def inspect_model(model):
+    """Manifest fields for a loaded model"""
+    info = {
+        'estimator_type': _type_name(model),
+        'kind': _kind(model),
+        'n_features_in': int(model.n_features_in_) if hasattr(model, 'n_features_in_') else None,
+        'feature_names_in': _listed(model.feature_names_in_) if hasattr(model, 'feature_names_in_') else None,
+        'classes': _listed(model.classes_) if hasattr(model, 'classes_') else None,
+        'has_predict_proba': hasattr(model, 'predict_proba')
+    }
+    if hasattr(model, 'named_estimators_'):
+        info['estimators'] = {name: _type_name(estimator) for name, estimator in model.named_estimators_.items()}
+    elif hasattr(model, 'estimators_'):
+        info['n_estimators'] = len(model.estimators_)
+    return info
+
+def build_manifest(model_path):
+    """Load the model (through the registry, so callers reuse it) and write its manifest; returns the manifest"""
+    import model_registry
+
+    signature = file_signature(model_path, content_hash=True)
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'model': os.path.basename(model_path),
+        'signature': list(signature[:2]),
+        'sha256': signature[2],
+        **inspect_model(model_registry.load(model_path))
+    }
+
+    temp_path = manifest_path(model_path) + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(temp_path, manifest_path(model_path))
+    return manifest
+
+def read_manifest(model_path):
+    """
+    The model's manifest without loading the model, or None when it is missing,
+    from an older format or stale (the model file changed since it was built).
+    """
+    try:
+        with open(manifest_path(model_path)) as f:
+            manifest = json.load(f)
+        signature = list(file_signature(model_path))
+    except (OSError, ValueError):
+        return None
+    if manifest.get('version') != MANIFEST_VERSION or manifest.get('signature') != signature:
+        return None
+    return manifest
+
+def load_manifest(model_path):
+    """The model's manifest, building it first when missing or stale"""
+    return read_manifest(model_path) or build_manifest(model_path)
+
+def check_features(model_path, n_features):
+    """
+    Raise ValueError when the model's manifest expects a different feature
+    count. Without an up-to-date manifest there is nothing to check against.
+    """
+    manifest = read_manifest(model_path)
+    expected = manifest and manifest['n_features_in']
+    if expected and expected != n_features:
+        raise ValueError(f"{manifest['model']} expects {expected} features, got {n_features}")
+
+def verify(model_path):
+    """Re-hash the model file and compare it with its manifest"""
+    manifest = read_manifest(model_path)
+    if manifest is None:
+        return {'model': model_path, 'ok': False, 'error': 'manifest missing or stale'}
+    sha256 = file_signature(model_path, content_hash=True)[2]
+    return {'model': model_path, 'ok': sha256 == manifest['sha256'], 'sha256': sha256}
+
+def main():
+    args = sys.argv[1:]
+    mode = None
+    for flag in ('--check', '--verify'):
+        if flag in args:
+            args.remove(flag)
+            mode = flag
+    paths = args or [path for path in MODEL_FILES if os.path.exists(path)]
+
+    results = {}
+    ok = True
+    for path in paths:
+        try:
+            if mode == '--check':
+                results[path] = read_manifest(path) or {'error': 'manifest missing or stale'}
+            elif mode == '--verify':
+                results[path] = verify(path)
+            else:
+                results[path] = load_manifest(path)
+        except Exception as e:
+            results[path] = {'error': str(e)}
+        ok = ok and 'error' not in results[path] and results[path].get('ok', True)
+
+    print(json.dumps(results, indent=2))
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
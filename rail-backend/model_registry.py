@@ -0,0 +1,74 @@
+import hashlib
+import os
+import pickle
+import time
+
+# Loaded artifacts keyed on (absolute path, loader)
+_entries = {}
+
+_stats = {
+    'hits': 0,
+    'loads': 0,
+    'reloads': 0,
+    'load_seconds': 0.0,
+    'saved_seconds': 0.0
+}
+
+def unpickle(path):
+    """Default loader: unpickle the file"""
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+def file_signature(path, content_hash=False):
+    """
+    Version marker for an artifact: (mtime, size), plus a sha256 of the
+    contents when content_hash is set (for filesystems with coarse mtimes).
+    """
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    if content_hash:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        signature += (digest.hexdigest(),)
+    return signature
+
+def load(path, loader=unpickle, content_hash=False):
+    """
+    Return the object stored at path, loading it at most once per file version.
+
+    The loader (unpickle by default) only runs again when the file's signature
+    changes; every other call is a dict lookup and is counted as saved load time.
+    """
+    path = os.path.abspath(path)
+    key = (path, loader)
+    signature = file_signature(path, content_hash)
+
+    entry = _entries.get(key)
+    if entry and entry['signature'] == signature:
+        _stats['hits'] += 1
+        _stats['saved_seconds'] += entry['load_seconds']
+        return entry['value']
+
+    start = time.perf_counter()
+    value = loader(path)
+    elapsed = time.perf_counter() - start
+
+    _stats['reloads' if entry else 'loads'] += 1
+    _stats['load_seconds'] += elapsed
+    _entries[key] = {'signature': signature, 'value': value, 'load_seconds': elapsed}
+    return value
+
+def cache_stats():
+    """Hit/load counters and the total load time avoided so far"""
+    return {
+        **_stats,
+        'load_seconds': round(_stats['load_seconds'], 4),
+        'saved_seconds': round(_stats['saved_seconds'], 4),
+        'cached': [path for path, _ in _entries]
+    }
+
+def clear():
+    """Drop every cached artifact"""
+    _entries.clear()
@@ -0,0 +1,362 @@
+"""
+Memory-mappable model stores.
+
+A store is a directory next to a model pickle. Each build writes a new
+version subdirectory (one .npy file per array and a meta.json), and the
+CURRENT file inside the store names the version in use. CURRENT is switched
+with os.replace, so readers always see one complete version, and rebuilds
+are serialized with a lock file so concurrent processes build only once. Versions are opened with
+np.load(mmap_mode='r'), so loading one is near-instant. Every process using a
+model shares the same read-only page-cache pages instead of unpickling a
+private copy of every tree.
+
+Two stores are built from the existing pickles and rebuilt whenever a pickle
+changes (its mtime and size are recorded in meta.json):
+
+  model_rf_data.forest/   the Random Forest, exported by flat_forest.py
+  lifetime_model.store/   the lifetime VotingRegressor, scored by FlatVoting
+
+    python model_store.py            # build both stores
+    python model_store.py --verify   # compare against the unpickled models
+"""
+import json
+import os
+import shutil
+import sys
+from contextlib import contextmanager
+
+from model_registry import file_signature, unpickle
+
+STORE_VERSION = 2
+
+# File in a store directory naming its current version
+POINTER = 'CURRENT'
+
+def save_store(directory, arrays, meta):
+    """
+    Write arrays (name -> ndarray) and meta as a new version of a store and
+    make it current. 0-d arrays are kept in meta.json.
+
+    The version is filled under a unique name, then the CURRENT pointer is
+    replaced atomically, so readers always see a complete version. Callers
+    rebuilding a shared store hold build_lock (see open_current).
+    """
+    import numpy as np
+
+    os.makedirs(directory, exist_ok=True)
+    scalars = {name: value.item() for name, value in arrays.items() if np.ndim(value) == 0}
+    version = f'v-{os.getpid()}-{os.urandom(4).hex()}'
+    temp_dir = os.path.join(directory, 'tmp-' + version)
+    os.makedirs(temp_dir)
+    for name, value in arrays.items():
+        if name not in scalars:
+            np.save(os.path.join(temp_dir, name + '.npy'), np.ascontiguousarray(value), allow_pickle=False)
+    with open(os.path.join(temp_dir, 'meta.json'), 'w') as f:
+        json.dump({'store_version': STORE_VERSION, **meta, 'scalars': scalars}, f)
+    os.rename(temp_dir, os.path.join(directory, version))
+
+    pointer_temp = os.path.join(directory, f'{POINTER}.tmp-{version}')
+    with open(pointer_temp, 'w') as f:
+        f.write(version)
+    os.replace(pointer_temp, os.path.join(directory, POINTER))
+    _remove_stale(directory)
+
+def _current_version(directory):
+    with open(os.path.join(directory, POINTER)) as f:
+        return f.read().strip()
+
+def _remove_stale(directory):
+    """
+    Best effort: drop versions other than the current one (and files of the
+    older flat layout). Processes that mapped them keep their pages on POSIX;
+    where the files are still open, removal fails and is retried next build.
+    """
+    try:
+        current = _current_version(directory)
+    except OSError:
+        return
+    for entry in os.listdir(directory):
+        if entry == current or entry.startswith(POINTER) or entry.startswith('tmp-'):
+            continue
+        path = os.path.join(directory, entry)
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+def open_store(directory):
+    """(meta, arrays) of a store's current version; arrays are read-only memory maps, scalars come back as numbers"""
+    import numpy as np
+
+    # A version removed by a concurrent rebuild between reading CURRENT and opening it: read CURRENT again
+    for attempt in range(2):
+        path = os.path.join(directory, _current_version(directory))
+        try:
+            with open(os.path.join(path, 'meta.json')) as f:
+                meta = json.load(f)
+            if meta.get('store_version') != STORE_VERSION:
+                raise ValueError(f'{directory} has store version {meta.get("store_version")}')
+
+            arrays = dict(meta.pop('scalars'))
+            for entry in os.listdir(path):
+                if entry.endswith('.npy'):
+                    arrays[entry[:-4]] = np.load(os.path.join(path, entry), mmap_mode='r').view(np.ndarray)
+            return meta, arrays
+        except FileNotFoundError:
+            if attempt:
+                raise
+
+@contextmanager
+def build_lock(directory):
+    """Serialize store rebuilds across processes (no-op where fcntl is unavailable)"""
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+
+    with open(directory + '.lock', 'w') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+def _open_if_current(directory, model_path, version):
+    """(meta, arrays) when the store exists and matches this format version and pickle, else None"""
+    try:
+        meta, arrays = open_store(directory)
+    except (OSError, KeyError, ValueError):
+        return None
+    if meta.get('version') == version and meta.get('signature') == list(file_signature(model_path)):
+        return meta, arrays
+    return None
+
+def open_current(directory, model_path, build, version):
+    """
+    Open the store for a model pickle, rebuilding it with build(model_path)
+    when it is missing, from another format version or older than the pickle.
+
+    Rebuilds hold build_lock, and processes that waited for it open the
+    store the first one wrote instead of building again. If the lock or the
+    rebuild fails on the file system (e.g. a read-only directory), the
+    OSError is raised: the store on disk is stale, so callers fall back to
+    unpickling the model.
+    """
+    store = _open_if_current(directory, model_path, version)
+    if store:
+        return store
+
+    with build_lock(directory):
+        store = _open_if_current(directory, model_path, version)
+        if store:
+            return store
+        build(model_path)
+    return open_store(directory)
+
+# --- Lifetime VotingRegressor ---
+
+VOTING_VERSION = 1
+
+def store_path(model_path):
+    """Store directory for the lifetime model pickle"""
+    return os.path.splitext(model_path)[0] + '.store'
+
+def export_voting(model):
+    """
+    Flatten a VotingRegressor whose members are random forests, gradient
+    boosting and linear models into (arrays, meta). Raises ValueError for
+    anything else.
+    """
+    import numpy as np
+    from flat_forest import flatten_trees
+
+    estimators = getattr(model, 'estimators_', None)
+    if type(model).__name__ != 'VotingRegressor' or not estimators:
+        raise ValueError(f'{type(model).__name__} is not a fitted VotingRegressor')
+
+    arrays, members = {}, []
+    for i, estimator in enumerate(estimators):
+        name = type(estimator).__name__
+        prefix = f'{i}.'
+        if name in ('RandomForestRegressor', 'ExtraTreesRegressor'):
+            trees = [tree.tree_ for tree in estimator.estimators_]
+            member = {'kind': 'forest'}
+        elif name == 'GradientBoostingRegressor':
+            if estimator.init_ == 'zero':
+                init = 0.0
+            elif type(estimator.init_).__name__ == 'DummyRegressor':
+                init = float(np.ravel(estimator.init_.constant_)[0])
+            else:
+                raise ValueError(f'Unsupported boosting init estimator {type(estimator.init_).__name__}')
+            trees = [tree.tree_ for tree in estimator.estimators_[:, 0]]
+            member = {'kind': 'boosting', 'init': init, 'learning_rate': float(estimator.learning_rate)}
+        elif hasattr(estimator, 'coef_') and hasattr(estimator, 'intercept_') and np.ndim(estimator.coef_) == 1:
+            arrays[prefix + 'coef'] = np.asarray(estimator.coef_)
+            arrays[prefix + 'intercept'] = np.asarray(estimator.intercept_)
+            members.append({'kind': 'linear'})
+            continue
+        else:
+            raise ValueError(f'Unsupported VotingRegressor member {name}')
+
+        for key, value in flatten_trees(trees).items():
+            arrays[prefix + key] = value
+        members.append(member)
+
+    weights = model._weights_not_none
+    return arrays, {
+        'members': members,
+        'weights': None if weights is None else [float(w) for w in weights],
+        'n_features': int(model.n_features_in_)
+    }
+
+class FlatVoting:
+    """VotingRegressor.predict over memory-mapped member arrays, matching sklearn's arithmetic"""
+
+    def __init__(self, meta, arrays):
+        from flat_forest import FlatForest
+
+        self.weights = meta['weights']
+        self.n_features_in_ = meta['n_features']
+        self.members = []
+        for i, member in enumerate(meta['members']):
+            prefix = f'{i}.'
+            own = {key[len(prefix):]: value for key, value in arrays.items() if key.startswith(prefix)}
+            if member['kind'] == 'linear':
+                self.members.append((member, own))
+            else:
+                self.members.append((member, FlatForest({**own, 'n_features': self.n_features_in_})))
+
+    def member_predictions(self, X, trees=False):
+        """
+        (predictions, draws): every member's prediction for each row and, with
+        trees, its draws, i.e. the per-tree predictions of a forest (n_trees x
+        n_rows) or the member's prediction as a single draw. Each forest is
+        walked once either way.
+        """
+        import numpy as np
+
+        X = np.asarray(X, dtype=np.float64)
+        predictions, draws = [], []
+        for member, scorer in self.members:
+            if member['kind'] == 'linear':
+                prediction = X @ scorer['coef'] + scorer['intercept']
+            elif member['kind'] == 'forest':
+                leaves = scorer.apply(X)
+                prediction = (scorer.accumulate(X, leaves=leaves) / len(scorer.roots)).ravel()
+                if trees:
+                    predictions.append(prediction)
+                    draws.append(scorer.value[leaves, 0])
+                    continue
+            else:
+                raw = np.full((len(X), 1), member['init'])
+                prediction = scorer.accumulate(X, out=raw, scale=member['learning_rate']).ravel()
+            predictions.append(prediction)
+            if trees:
+                draws.append(prediction[np.newaxis])
+        return predictions, draws
+
+    def predict(self, X):
+        import numpy as np
+
+        predictions, _ = self.member_predictions(X)
+        return np.average(np.asarray(predictions).T, axis=1, weights=self.weights)
+
+# Percentiles reported by predict_distribution()
+PERCENTILES = (5, 50, 95)
+
+def predict_distribution(model, X, percentiles=PERCENTILES):
+    """
+    Mean, standard deviation and percentiles of a VotingRegressor's prediction
+    for every row, from one pass over its members.
+
+    Forest members contribute one draw per tree; boosting and linear members
+    contribute their prediction. Draw t of the ensemble is the weighted
+    average of draw t of every member (members with fewer draws are cycled),
+    so the spread reflects the disagreement between trees. The mean is the
+    ensemble's own prediction. Works on FlatVoting and on an unpickled
+    sklearn VotingRegressor.
+    """
+    import numpy as np
+
+    if isinstance(model, FlatVoting):
+        predictions, draws = model.member_predictions(X, trees=True)
+        weights = model.weights
+    else:
+        predictions, draws = [], []
+        for estimator in model.estimators_:
+            prediction = estimator.predict(X)
+            predictions.append(prediction)
+            if type(estimator).__name__ in ('RandomForestRegressor', 'ExtraTreesRegressor'):
+                draws.append(np.stack([tree.predict(np.asarray(X, dtype=np.float32)) for tree in estimator.estimators_]))
+            else:
+                draws.append(prediction[np.newaxis])
+        weights = model._weights_not_none
+
+    n_draws = max(len(member) for member in draws)
+    member_weights = np.ones(len(draws)) if weights is None else np.asarray(weights, dtype=np.float64)
+    samples = np.zeros((n_draws, len(predictions[0])))
+    for weight, member in zip(member_weights, draws):
+        samples += weight * member[np.arange(n_draws) % len(member)]
+    samples /= member_weights.sum()
+
+    return {
+        'mean': np.average(np.asarray(predictions).T, axis=1, weights=weights),
+        'std': samples.std(axis=0),
+        'percentiles': dict(zip(percentiles, np.percentile(samples, percentiles, axis=0)))
+    }
+
+def build_voting(model_path='lifetime_model.pkl'):
+    """Unpickle the lifetime model (needs sklearn), export it and write its store"""
+    arrays, meta = export_voting(unpickle(model_path))
+    save_store(store_path(model_path), arrays, {
+        **meta, 'version': VOTING_VERSION, 'signature': list(file_signature(model_path))
+    })
+
+def load_model(model_path):
+    """Registry loader: the memory-mapped flat regressor, or the unpickled model when it cannot be flattened or stored"""
+    try:
+        return FlatVoting(*open_current(store_path(model_path), model_path, build_voting, VOTING_VERSION))
+    except (OSError, ValueError):
+        return unpickle(model_path)
+
+def verify(model_path='lifetime_model.pkl', rows=2000, seed=0):
+    """Compare the flat regressor with the unpickled model on random feature rows"""
+    import numpy as np
+
+    model = unpickle(model_path)
+    flat = load_model(model_path)
+    if not isinstance(flat, FlatVoting):
+        return {'model': model_path, 'error': 'model cannot be flattened'}
+
+    rng = np.random.default_rng(seed)
+    X = rng.integers(0, 2000, (rows, flat.n_features_in_)).astype(np.float64)
+    return {
+        'model': model_path,
+        'rows': rows,
+        'max_abs_diff': float(np.abs(model.predict(X) - flat.predict(X)).max())
+    }
+
+def main():
+    import flat_forest
+
+    try:
+        if '--verify' in sys.argv[1:]:
+            result = {'forest': flat_forest.verify(), 'lifetime': verify()}
+            print(json.dumps(result))
+            if result['forest']['max_abs_diff'] or result['forest']['label_mismatches'] or result['lifetime'].get('max_abs_diff', 1):
+                sys.exit(1)
+            return
+        flat_forest.build_forest('model_rf_data.pkl')
+        build_voting('lifetime_model.pkl')
+        result = {'built': [flat_forest.forest_path('model_rf_data.pkl'), store_path('lifetime_model.pkl')]}
+    except Exception as e:
+        result = {'error': str(e)}
+
+    print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
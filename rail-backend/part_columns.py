@@ -0,0 +1,256 @@
+import array
+import csv
+import json
+import mmap
+import os
+import struct
+import tempfile
+from contextlib import ExitStack
+
+from model_registry import file_signature
+
+MAGIC = b'RAILCOL1'
+COLUMNS_VERSION = 1
+
+# Smallest signed typecode that holds a column's range
+INT_TYPECODES = [('b', -2**7, 2**7 - 1), ('h', -2**15, 2**15 - 1), ('i', -2**31, 2**31 - 1), ('q', -2**63, 2**63 - 1)]
+NUMPY_DTYPES = {'b': 'i1', 'h': 'i2', 'i': 'i4', 'q': 'i8', 'd': 'f8'}
+
+def columns_path(csv_path):
+    """Sidecar file holding the columnar cache for a CSV"""
+    return os.path.splitext(csv_path)[0] + '.columns'
+
+# Rows parsed per chunk while building; bounds memory use regardless of CSV size
+CHUNK_ROWS = 1 << 18
+
+def _chunks_csv(csv_path, chunk_rows):
+    """
+    Stream the CSV as (names, rows, chunk) tuples, where chunk maps each column
+    to an array of its values (typecode 'q' or 'd') or None when it is not numeric.
+    """
+    with open(csv_path, 'r', newline='') as f:
+        reader = csv.reader(f)
+        names = next(reader)
+        while True:
+            values = [array.array('q') for _ in names]
+            rows = 0
+            for row in reader:
+                for i, cell in enumerate(row):
+                    column = values[i]
+                    if column is None:
+                        continue
+                    try:
+                        column.append(int(cell) if column.typecode == 'q' else float(cell))
+                    except (ValueError, OverflowError):
+                        try:
+                            values[i] = array.array('d', column)
+                            values[i].append(float(cell))
+                        except ValueError:
+                            values[i] = None
+                rows += 1
+                if rows == chunk_rows:
+                    break
+            if not rows:
+                return
+            yield names, rows, dict(zip(names, values))
+
+def _chunks_pandas(csv_path, chunk_rows):
+    """Same as _chunks_csv using pandas' C parser; returns None when pandas is unavailable"""
+    try:
+        import numpy as np
+        import pandas as pd
+    except ImportError:
+        return None
+
+    def chunks():
+        for frame in pd.read_csv(csv_path, chunksize=chunk_rows):
+            chunk = {}
+            for name, series in frame.items():
+                if pd.api.types.is_integer_dtype(series.dtype):
+                    chunk[name] = series.to_numpy(np.int64)
+                elif pd.api.types.is_numeric_dtype(series.dtype):
+                    chunk[name] = series.to_numpy(np.float64)
+                else:
+                    chunk[name] = None
+            yield list(frame.columns), len(frame), chunk
+    return chunks()
+
+def _typecode(values):
+    """'q' or 'd' for a chunk column (array.array or numpy array)"""
+    typecode = getattr(values, 'typecode', None)
+    return typecode or ('q' if values.dtype.kind in 'iu' else 'd')
+
+def _value_range(values):
+    """(min, max) of a non-empty integer chunk column"""
+    if hasattr(values, 'min'):
+        return int(values.min()), int(values.max())
+    return min(values), max(values)
+
+def _convert(data, source, target):
+    """Re-encode raw column bytes from one typecode to another"""
+    if source == target:
+        return data
+    try:
+        import numpy as np
+        return np.frombuffer(data, dtype=NUMPY_DTYPES[source]).astype(NUMPY_DTYPES[target]).tobytes()
+    except ImportError:
+        return array.array(target, array.array(source, data)).tobytes()
+
+def build_columns(csv_path='part-data.csv', chunk_rows=CHUNK_ROWS):
+    """
+    Parse the CSV once and write the typed columnar cache next to it.
+
+    Chunks are spooled to one temporary file per column as 64-bit values,
+    then each column is narrowed to its final typecode while being copied
+    into the cache, so memory use stays at about one chunk.
+    """
+    signature = file_signature(csv_path, content_hash=True)
+    chunks = _chunks_pandas(csv_path, chunk_rows)
+    if chunks is None:
+        chunks = _chunks_csv(csv_path, chunk_rows)
+
+    path = columns_path(csv_path)
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(path))) as spool_dir, ExitStack() as stack:
+        names, spools, segments, ranges, rows = [], {}, {}, {}, 0
+        for chunk_names, chunk_rows_read, chunk in chunks:
+            if not names:
+                names = chunk_names
+                for i, name in enumerate(names):
+                    spools[name] = stack.enter_context(open(os.path.join(spool_dir, str(i)), 'w+b'))
+                    segments[name] = []
+            rows += chunk_rows_read
+            for name in names:
+                values = chunk.get(name)
+                if values is None or segments[name] is None:
+                    segments[name] = None
+                    continue
+                typecode = _typecode(values)
+                if typecode == 'q' and len(values):
+                    low, high = _value_range(values)
+                    if name in ranges:
+                        low, high = min(low, ranges[name][0]), max(high, ranges[name][1])
+                    ranges[name] = (low, high)
+                data = values.tobytes()
+                spools[name].write(data)
+                segments[name].append((typecode, len(data)))
+
+        # Final typecode per numeric column: float if any chunk was, else the narrowest int
+        layout, offset = [], 0
+        for name in names:
+            if segments[name] is None:
+                continue
+            if any(typecode == 'd' for typecode, _ in segments[name]):
+                typecode = 'd'
+            else:
+                low, high = ranges.get(name, (0, 0))
+                typecode = next(code for code, type_min, type_max in INT_TYPECODES if type_min <= low and high <= type_max)
+            layout.append({'name': name, 'typecode': typecode, 'offset': offset})
+            offset += -(-rows * struct.calcsize(typecode) // 8) * 8
+
+        # Header lists each column's typecode and byte offset; data blocks are 8-byte aligned
+        header = json.dumps({
+            'version': COLUMNS_VERSION,
+            'signature': list(signature),
+            'rows': rows,
+            'columns': layout
+        }).encode()
+        data_start = -(-(len(MAGIC) + 4 + len(header)) // 8) * 8
+
+        with open(path + '.tmp', 'wb') as f:
+            f.write(MAGIC + struct.pack('<I', len(header)) + header)
+            for entry in layout:
+                spool = spools[entry['name']]
+                spool.seek(0)
+                f.seek(data_start + entry['offset'])
+                for source, size in segments[entry['name']]:
+                    f.write(_convert(spool.read(size), source, entry['typecode']))
+            f.truncate(data_start + offset)
+    os.replace(path + '.tmp', path)
+
+class PartColumns:
+    """Read-only, memory-mapped view of the columnar cache"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a part-data columnar cache")
+
+        (header_size,) = struct.unpack_from('<I', self.mmap, len(MAGIC))
+        header_end = len(MAGIC) + 4 + header_size
+        self.header = json.loads(self.mmap[len(MAGIC) + 4:header_end])
+        self.rows = self.header['rows']
+        self.data_start = -(-header_end // 8) * 8
+
+        view = memoryview(self.mmap)
+        self.columns = {}
+        for entry in self.header['columns']:
+            start = self.data_start + entry['offset']
+            size = struct.calcsize(entry['typecode'])
+            self.columns[entry['name']] = view[start:start + self.rows * size].cast(entry['typecode'])
+
+    def arrays(self):
+        """Zero-copy numpy arrays over the mapped columns"""
+        import numpy as np
+        return {
+            entry['name']: np.frombuffer(
+                self.mmap, dtype=NUMPY_DTYPES[entry['typecode']],
+                count=self.rows, offset=self.data_start + entry['offset']
+            )
+            for entry in self.header['columns']
+        }
+
+    def frame(self):
+        """pandas DataFrame with the same columns as pd.read_csv would give"""
+        import pandas as pd
+        return pd.DataFrame(self.arrays())
+
+    def records(self, names):
+        """Iterate rows as dicts restricted to the given columns"""
+        columns = [self.columns[name] for name in names]
+        for values in zip(*columns):
+            yield dict(zip(names, values))
+
+def refresh_signature(cached, path, signature):
+    """
+    Rewrite the cache with a new CSV signature (same content), so the next
+    open trusts the mtime and size again instead of re-hashing the CSV.
+    """
+    header = json.dumps({**cached.header, 'signature': list(signature)}).encode()
+    data_start = -(-(len(MAGIC) + 4 + len(header)) // 8) * 8
+
+    with open(path + '.tmp', 'wb') as f:
+        f.write(MAGIC + struct.pack('<I', len(header)) + header)
+        f.seek(data_start)
+        for start in range(cached.data_start, len(cached.mmap), 1 << 20):
+            f.write(cached.mmap[start:start + (1 << 20)])
+    os.replace(path + '.tmp', path)
+
+def open_columns(csv_path='part-data.csv'):
+    """
+    Open the columnar cache for a CSV, rebuilding it when the CSV changed.
+
+    The cache is trusted while the CSV mtime and size match; otherwise the
+    CSV is hashed and the cache is rebuilt if the content checksum differs.
+    When only the mtime moved (touch, checkout, copy) the cache keeps its
+    data and records the new mtime and size.
+    """
+    path = columns_path(csv_path)
+    try:
+        cached = PartColumns(path)
+        saved = cached.header['signature']
+        if cached.header['version'] == COLUMNS_VERSION:
+            if tuple(saved[:2]) == file_signature(csv_path):
+                return cached
+            signature = file_signature(csv_path, content_hash=True)
+            if tuple(saved[1:]) == signature[1:]:
+                try:
+                    refresh_signature(cached, path, signature)
+                except OSError:
+                    pass  # read-only directory: still correct, just hashed again next time
+                return cached
+    except (OSError, ValueError, KeyError):
+        pass
+
+    build_columns(csv_path)
+    return PartColumns(path)
@@ -0,0 +1,266 @@
+import csv
+import json
+import math
+import os
+import pickle
+
+from part_columns import CHUNK_ROWS, open_columns
+
+# Columns read from part-data.csv (all integer encoded)
+COLUMNS = [
+    'Vendor ID', 'Part type', 'material', 'Defect',
+    'Lifetime (Days)', 'Region', 'Route Type', 'Warranty (Years)'
+]
+
+# Every key combination the prediction scripts look up
+GROUPS = [
+    ('Vendor ID',),
+    ('Part type',),
+    ('material',),
+    ('Region',),
+    ('Route Type',),
+    ('Vendor ID', 'Part type'),
+    ('Vendor ID', 'Region'),
+    ('Vendor ID', 'Route Type'),
+    ('Part type', 'material'),
+    ('Vendor ID', 'Part type', 'material'),
+]
+
+STATS_VERSION = 2
+
+class PartStats:
+    """
+    Aggregate index over the part history.
+
+    For each group in GROUPS it keeps [count, defect_sum, lifetime_sum] per key,
+    so any rate or average the scripts need is a single dict lookup.
+    Callables in `watchers` are called with every record add() folds in.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.groups = {dims: {} for dims in GROUPS}
+        self.watchers = []
+
+    def add(self, record):
+        """Fold one record (dict keyed by CSV column) into the counters"""
+        defect = record['Defect']
+        lifetime = record['Lifetime (Days)']
+        self.total += 1
+        for dims, table in self.groups.items():
+            key = tuple(record[d] for d in dims)
+            entry = table.get(key)
+            if entry is None:
+                table[key] = [1, defect, lifetime]
+            else:
+                entry[0] += 1
+                entry[1] += defect
+                entry[2] += lifetime
+        for watcher in self.watchers:
+            watcher(record)
+
+    def merge(self, dims, keys, counts, defect_sums, lifetime_sums):
+        """Fold pre-aggregated rows (one per key) into one group's counters"""
+        table = self.groups[dims]
+        for key, count, defects, lifetime in zip(keys, counts, defect_sums, lifetime_sums):
+            entry = table.get(key)
+            if entry is None:
+                table[key] = [count, defects, lifetime]
+            else:
+                entry[0] += count
+                entry[1] += defects
+                entry[2] += lifetime
+
+    def lookup(self, dims, *key):
+        """Return (count, defect_sum, lifetime_sum) for a key, zeros when unseen"""
+        entry = self.groups[dims].get(key)
+        return tuple(entry) if entry else (0, 0, 0)
+
+def read_records(csv_path='part-data.csv'):
+    """Stream integer-encoded records from the CSV"""
+    with open(csv_path, 'r') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            yield {column: int(row[column]) for column in COLUMNS}
+
+def build_stats(records):
+    """Build a PartStats index from an iterable of records"""
+    stats = PartStats()
+    for record in records:
+        stats.add(record)
+    return stats
+
+def build_stats_chunked(columns, chunk_rows=CHUNK_ROWS):
+    """
+    Build a PartStats index from a PartColumns cache, chunk_rows rows at a time.
+
+    Each chunk is aggregated per group with NumPy and folded in with merge(),
+    so memory stays at one chunk plus the distinct keys however large the data
+    is. Falls back to the per-record loop when NumPy is unavailable.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        return build_stats(columns.records(COLUMNS))
+
+    arrays = columns.arrays()
+    stats = PartStats()
+    for start in range(0, columns.rows, chunk_rows):
+        chunk = {name: arrays[name][start:start + chunk_rows].astype(np.int64) for name in COLUMNS}
+        stats.total += len(chunk['Defect'])
+        for dims in GROUPS:
+            keys = [chunk[d] for d in dims]
+            lows = [int(key.min()) for key in keys]
+            shape = [int(key.max()) - low + 1 for key, low in zip(keys, lows)]
+
+            # Dense key spaces (the usual case) are counted directly. Sparse ones, whose
+            # range product may not even fit in int64, are compacted to their distinct keys first
+            dense = math.prod(shape) <= 4 * len(keys[0])
+            if dense:
+                slots = np.ravel_multi_index([key - low for key, low in zip(keys, lows)], shape)
+            else:
+                distinct, slots = np.unique(np.column_stack(keys), axis=0, return_inverse=True)
+                slots = slots.reshape(-1)
+            counts = np.bincount(slots)
+            present = np.flatnonzero(counts)
+            defect_sums = np.bincount(slots, weights=chunk['Defect'])[present].astype(np.int64)
+            lifetime_sums = np.bincount(slots, weights=chunk['Lifetime (Days)'])[present].astype(np.int64)
+
+            if dense:
+                key_columns = [(index + low).tolist() for index, low in zip(np.unravel_index(present, shape), lows)]
+            else:
+                key_columns = distinct[present].T.tolist()
+            stats.merge(
+                dims, zip(*key_columns),
+                counts[present].tolist(), defect_sums.tolist(), lifetime_sums.tolist()
+            )
+    return stats
+
+def data_signature(csv_path='part-data.csv'):
+    """Cheap data version marker for the CSV (mtime + size)"""
+    stat = os.stat(csv_path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+def data_version(csv_path='part-data.csv'):
+    """Data version including ingested records: CSV signature plus delta log size"""
+    try:
+        delta_size = os.path.getsize(delta_path(csv_path))
+    except OSError:
+        delta_size = 0
+    return data_signature(csv_path) + (delta_size,)
+
+def stats_path(csv_path):
+    """Sidecar file holding the persisted index for a CSV"""
+    return os.path.splitext(csv_path)[0] + '.stats.pkl'
+
+def delta_path(csv_path):
+    """Append-only log of records ingested since the CSV was last compacted"""
+    return os.path.splitext(csv_path)[0] + '.delta.jsonl'
+
+def watermark_path(csv_path):
+    """Marker written by compaction before it replaces the CSV"""
+    return os.path.splitext(csv_path)[0] + '.compacted.json'
+
+def compacted_bytes(csv_path):
+    """
+    Bytes at the start of the delta log that are already in the CSV.
+
+    Non-zero only when a compaction stopped after replacing the CSV and
+    before truncating the log: its watermark then matches the CSV signature.
+    """
+    try:
+        with open(watermark_path(csv_path)) as f:
+            mark = json.load(f)
+        if tuple(mark['csv_signature']) == data_signature(csv_path):
+            return mark['delta_bytes']
+    except (OSError, ValueError, KeyError):
+        pass
+    return 0
+
+def read_delta(csv_path, offset=0):
+    """
+    Records appended to the delta log after `offset` bytes, as (records, new_offset).
+
+    Each line is a JSON array of values in COLUMNS order; a trailing partial
+    line (an append in progress) is left for the next read. Returns None when
+    the log is shorter than `offset`, i.e. it was compacted in the meantime.
+    """
+    try:
+        f = open(delta_path(csv_path), 'rb')
+    except FileNotFoundError:
+        return ([], 0) if offset == 0 else None
+
+    with f:
+        if os.fstat(f.fileno()).st_size < offset:
+            return None
+        f.seek(offset)
+        data = f.read()
+
+    end = data.rfind(b'\n') + 1
+    records = [dict(zip(COLUMNS, json.loads(line))) for line in data[:end].splitlines() if line.strip()]
+    return records, offset + end
+
+def save_stats(csv_path, stats, signature):
+    """Persist an index as the snapshot for the given CSV version (best effort)"""
+    sidecar = stats_path(csv_path)
+    try:
+        with open(sidecar + '.tmp', 'wb') as f:
+            pickle.dump({
+                'version': STATS_VERSION,
+                'signature': signature,
+                'total': stats.total,
+                'groups': stats.groups
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(sidecar + '.tmp', sidecar)
+    except OSError:
+        pass
+
+def _load_snapshot(csv_path, signature):
+    """Persisted index for this CSV version, or a fresh build from the columnar cache"""
+    try:
+        with open(stats_path(csv_path), 'rb') as f:
+            saved = pickle.load(f)
+        if saved['version'] == STATS_VERSION and saved['signature'] == signature:
+            stats = PartStats()
+            stats.total = saved['total']
+            stats.groups = saved['groups']
+            return stats
+    except Exception:
+        pass
+
+    stats = build_stats_chunked(open_columns(csv_path))
+    save_stats(csv_path, stats, signature)
+    return stats
+
+_loaded = {}
+
+def load_stats(csv_path='part-data.csv'):
+    """
+    Return the PartStats index for the current version of the CSV plus any
+    records ingested into its delta log.
+
+    The base index is built once per data version: it is kept in memory for
+    long-lived callers and persisted next to the CSV for spawned ones. New
+    delta log lines are folded into the in-memory counters as they appear.
+    """
+    signature = data_signature(csv_path)
+    cached = _loaded.get(csv_path)
+    if cached and cached['signature'] == signature:
+        delta = read_delta(csv_path, cached['delta_offset'])
+        if delta is not None:
+            records, cached['delta_offset'] = delta
+            for record in records:
+                cached['stats'].add(record)
+            return cached['stats']
+
+    stats = _load_snapshot(csv_path, signature)
+    records, offset = read_delta(csv_path, compacted_bytes(csv_path)) or ([], 0)
+    for record in records:
+        stats.add(record)
+
+    _loaded[csv_path] = {'signature': signature, 'delta_offset': offset, 'stats': stats}
+    return stats
+
+def forget(csv_path='part-data.csv'):
+    """Drop the in-memory index so the next load_stats() re-reads the snapshot"""
+    _loaded.pop(csv_path, None)
@@ -1,10 +1,10 @@
-import pickle
-import pandas as pd
 import json
 import sys
 
-# Load model
-rf = pickle.load(open('model_rf_data.pkl','rb'))
+from flat_forest import load_model
+
+# Load model (flat-array export of the Random Forest, no sklearn needed once exported)
+rf = load_model('model_rf_data.pkl')
 
 # Get input from command line
 vendor_id = int(sys.argv[1])
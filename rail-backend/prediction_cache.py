@@ -0,0 +1,151 @@
+"""
+Shared on-disk cache of prediction results.
+
+ml_predict.py and lifetime_prediction.py are pure functions of their
+arguments and the data/model version, so each spawned process first looks the
+request up in a small SQLite file shared by all of them. Keys combine the
+script, the argument tuple (as the script receives it, because the arguments are
+echoed into the response text) and a version marker: CSV + delta log signature
+for ml_predict.py, pickle signature for lifetime_prediction.py. A new
+version therefore never serves an old result.
+
+Entries expire after ML_CACHE_TTL seconds (default 3600). Beyond
+ML_CACHE_MAX_ENTRIES (default 10000) the least recently used are evicted.
+ML_CACHE=0 disables the cache.
+
+    python prediction_cache.py           # hit/miss/eviction counters
+    python prediction_cache.py --clear
+"""
+import json
+import os
+import sqlite3
+import sys
+import time
+
+import timing
+
+CACHE_FILE = os.environ.get('ML_CACHE_PATH', 'prediction-cache.sqlite')
+MAX_ENTRIES = int(os.environ.get('ML_CACHE_MAX_ENTRIES', 10000))
+TTL_SECONDS = float(os.environ.get('ML_CACHE_TTL', 3600))
+
+# Evict in batches so most inserts do not pay for a count
+EVICT_SLACK = 0.1
+
+class PredictionCache:
+    """LRU/TTL result cache in a SQLite file, safe to share between processes"""
+
+    def __init__(self, path=CACHE_FILE, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db = sqlite3.connect(path, timeout=5, isolation_level=None)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.execute(
+            'CREATE TABLE IF NOT EXISTS entries '
+            '(key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)'
+        )
+        self.db.execute('CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)')
+        self.db.execute('CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+
+    @staticmethod
+    def make_key(namespace, args, version):
+        return json.dumps([namespace, [str(arg) for arg in args], list(version)], separators=(',', ':'))
+
+    def _count(self, name, amount=1):
+        self.db.execute(
+            'INSERT INTO counters VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + excluded.value',
+            (name, amount)
+        )
+
+    def get(self, namespace, args, version):
+        """Cached result, or None on a miss (expired entries count as misses)"""
+        key = self.make_key(namespace, args, version)
+        now = time.time()
+        row = self.db.execute('SELECT value, created FROM entries WHERE key = ?', (key,)).fetchone()
+        if row is None or now - row[1] > self.ttl:
+            if row is not None:
+                self.db.execute('DELETE FROM entries WHERE key = ?', (key,))
+            self._count('misses')
+            return None
+
+        self.db.execute('UPDATE entries SET accessed = ? WHERE key = ?', (now, key))
+        self._count('hits')
+        return json.loads(row[0])
+
+    def put(self, namespace, args, version, result):
+        now = time.time()
+        self.db.execute(
+            'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)',
+            (self.make_key(namespace, args, version), json.dumps(result), now, now)
+        )
+        self.evict()
+
+    def evict(self):
+        """Drop the least recently used entries once the cache is over its bound (plus slack)"""
+        (entries,) = self.db.execute('SELECT COUNT(*) FROM entries').fetchone()
+        if entries <= self.max_entries * (1 + EVICT_SLACK):
+            return
+        excess = entries - self.max_entries
+        self.db.execute(
+            'DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed LIMIT ?)', (excess,)
+        )
+        self._count('evictions', excess)
+
+    def stats(self):
+        counters = {'hits': 0, 'misses': 0, 'evictions': 0}
+        counters.update(self.db.execute('SELECT name, value FROM counters').fetchall())
+        (counters['entries'],) = self.db.execute('SELECT COUNT(*) FROM entries').fetchone()
+        return counters
+
+    def clear(self):
+        self.db.execute('DELETE FROM entries')
+        self.db.execute('DELETE FROM counters')
+
+def open_cache():
+    """The shared cache, or None when it is disabled"""
+    if os.environ.get('ML_CACHE', '1') == '0':
+        return None
+    return PredictionCache()
+
+def memoize(namespace, args, version, compute):
+    """
+    Return compute() for these arguments, served from the cache when possible.
+
+    A version of None (data or model file missing) bypasses the cache. Error
+    results are not stored, and cache failures (locked or read-only file)
+    fall back to computing the result.
+    """
+    if version is None:
+        return compute()
+    try:
+        with timing.stage('cache_lookup'):
+            cache = open_cache()
+            result = cache.get(namespace, args, version) if cache is not None else None
+    except sqlite3.Error:
+        return compute()
+    if cache is None:
+        return compute()
+    if result is not None:
+        return result
+
+    result = compute()
+    if not (isinstance(result, dict) and 'error' in result):
+        try:
+            cache.put(namespace, args, version, result)
+        except sqlite3.Error:
+            pass
+    return result
+
+def main():
+    try:
+        cache = PredictionCache()
+        if '--clear' in sys.argv[1:]:
+            cache.clear()
+        result = cache.stats()
+    except Exception as e:
+        result = {'error': str(e)}
+
+    print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Long-lived asyncio HTTP prediction service.
+
+Exposes the same request/response contracts as the Node endpoints
+(see ML_PREDICTION_README.md), served by the same scripts Node spawns:
+
+    POST /ml/predict                  -> ml_predict.py (rule-based, part-data.csv)
+    POST /ml/lifetime-predict         -> lifetime_predict.py (rule-based, part-data.csv)
+
+and the model-backed scripts under their own paths:
+
+    POST /ml/model-predict            -> enhanced_ml_prediction.py (Random Forest, model_rf_data.pkl)
+    POST /ml/model-lifetime-predict   -> lifetime_prediction.py (VotingRegressor, lifetime_model.pkl)
+    GET  /health                      -> batching and model cache counters
+
+Concurrent requests are collected for a few milliseconds and scored with one
+batched call, so the interpreter, model unpickle and CSV load are paid
+once per process instead of once per request.
+
+    python prediction_service.py --port 5001 --window-ms 5 --max-batch 256
+"""
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import enhanced_ml_prediction
+import lifetime_predict
+import lifetime_prediction
+import ml_predict
+import model_registry
+from part_stats import load_stats
+
+PREDICT_DEFAULTS = {
+    'vendor_id': '100',
+    'part_type': 'Rail Clips',
+    'material': '1',
+    'lifetime': '1000',
+    'region': 'North',
+    'route_type': 'Passenger'
+}
+
+LIFETIME_DEFAULTS = {
+    'vendor_id': '100',
+    'part_type': 'Rail Clips',
+    'lot_number': '1001',
+    'material': '1',
+    'warranty_years': '2',
+    'region': 'North',
+    'route_type': 'Passenger',
+    'days_manuf_to_install': '30',
+    'days_install_to_inspect': '90'
+}
+
+class MicroBatcher:
+    """
+    Collects submitted items for up to `window` seconds (or until max_batch
+    items are waiting) and scores them with one call to `score`, which takes a
+    list of items and returns a list of results in the same order.
+    """
+
+    def __init__(self, score, window, max_batch):
+        self.score = score
+        self.window = window
+        self.max_batch = max_batch
+        self.pending = []
+        self.timer = None
+        # One scoring thread per batcher keeps the event loop free and batches serial
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.stats = {'requests': 0, 'batches': 0, 'largest_batch': 0}
+
+    async def submit(self, item):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((item, future))
+        self.stats['requests'] += 1
+
+        if len(self.pending) >= self.max_batch:
+            self.flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.window, self.flush)
+
+        return await future
+
+    def flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if not self.pending:
+            return
+
+        batch, self.pending = self.pending, []
+        self.stats['batches'] += 1
+        self.stats['largest_batch'] = max(self.stats['largest_batch'], len(batch))
+        asyncio.get_running_loop().create_task(self.run(batch))
+
+    async def run(self, batch):
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.executor, self.score, [item for item, _ in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+def score_rules_batch(requests):
+    """Batch scorer for /ml/predict: requests are ml_predict.predict kwargs"""
+    return ml_predict.score_batch(load_stats(), requests)
+
+def score_rules_lifetime_batch(requests):
+    """Batch scorer for /ml/lifetime-predict: requests are lifetime_predict.predict_lifetime kwargs"""
+    stats = load_stats()
+    return [lifetime_predict.predict_lifetime(stats, **request) for request in requests]
+
+def score_failure_batch(rows):
+    """Batch scorer for /ml/model-predict: rows are 6-feature lists"""
+    model = enhanced_ml_prediction.load_rf_model()
+    tables = enhanced_ml_prediction.load_history_tables()
+    return enhanced_ml_prediction.predict_batch(model, tables, rows)
+
+def score_lifetime_batch(requests):
+    """Batch scorer for /ml/model-lifetime-predict: requests are predict_lifetime kwargs"""
+    return lifetime_prediction.predict_lifetime_batch(requests)
+
+class PredictionService:
+    """Routes HTTP requests to the micro-batchers"""
+
+    def __init__(self, window, max_batch):
+        self.rules = MicroBatcher(score_rules_batch, window, max_batch)
+        self.rules_lifetime = MicroBatcher(score_rules_lifetime_batch, window, max_batch)
+        self.failure = MicroBatcher(score_failure_batch, window, max_batch)
+        self.lifetime = MicroBatcher(score_lifetime_batch, window, max_batch)
+        self.routes = {
+            '/ml/predict': self.predict_rules,
+            '/ml/lifetime-predict': self.predict_rules_lifetime,
+            '/ml/model-predict': self.predict,
+            '/ml/model-lifetime-predict': self.predict_lifetime
+        }
+
+    async def predict_rules(self, body):
+        try:
+            return await self.rules.submit(ml_predict.with_defaults(body, PREDICT_DEFAULTS))
+        except Exception as e:
+            return {'error': str(e)}
+
+    async def predict_rules_lifetime(self, body):
+        try:
+            return await self.rules_lifetime.submit(ml_predict.with_defaults(body, LIFETIME_DEFAULTS))
+        except Exception as e:
+            return {'error': str(e)}
+
+    async def predict(self, body):
+        args = ml_predict.with_defaults(body, PREDICT_DEFAULTS)
+        try:
+            row = enhanced_ml_prediction.build_features(**args)
+        except Exception as e:
+            return enhanced_ml_prediction.fallback_result(e)
+        try:
+            return await self.failure.submit(row)
+        except Exception as e:
+            return enhanced_ml_prediction.fallback_result(e)
+
+    async def predict_lifetime(self, body):
+        args = ml_predict.with_defaults(body, LIFETIME_DEFAULTS)
+        try:
+            lifetime_prediction.build_features(**args)
+            return await self.lifetime.submit(args)
+        except Exception as e:
+            return lifetime_prediction.fallback_result(e)
+
+    def health(self):
+        return {
+            'status': 'ok',
+            'rules_batches': self.rules.stats,
+            'rules_lifetime_batches': self.rules_lifetime.stats,
+            'failure_batches': self.failure.stats,
+            'lifetime_batches': self.lifetime.stats,
+            'model_cache': model_registry.cache_stats()
+        }
+
+    async def route(self, method, path, body):
+        """Return (status, payload) for one request"""
+        if method == 'GET' and path == '/health':
+            return 200, self.health()
+        if method == 'POST' and path in self.routes:
+            try:
+                data = json.loads(body or b'{}')
+            except ValueError:
+                return 400, {'error': 'Request body must be JSON'}
+            if not isinstance(data, dict):
+                return 400, {'error': 'Request body must be a JSON object'}
+            return 200, await self.routes[path](data)
+        return 404, {'error': f'No route for {method} {path}'}
+
+    async def handle(self, reader, writer):
+        """Minimal HTTP/1.1 loop with keep-alive (one request at a time per connection)"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get('content-length') or 0)
+                body = await reader.readexactly(length) if length else b''
+
+                status, payload = await self.route(method, target.split('?', 1)[0], body)
+                data = json.dumps(payload).encode()
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found'}[status]
+
+                writer.write(
+                    f'HTTP/1.1 {status} {reason}\r\n'
+                    f'Content-Type: application/json\r\n'
+                    f'Content-Length: {len(data)}\r\n'
+                    f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'.encode() + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+async def serve(host, port, window, max_batch):
+    service = PredictionService(window, max_batch)
+    server = await asyncio.start_server(service.handle, host, port)
+    print(json.dumps({'status': 'listening', 'host': host, 'port': port}), flush=True)
+    async with server:
+        await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description='Batched HTTP prediction service')
+    parser.add_argument('--host', default=os.environ.get('ML_SERVICE_HOST', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('ML_SERVICE_PORT', 5001)))
+    parser.add_argument('--window-ms', type=float, default=5.0, help='how long to collect requests before scoring')
+    parser.add_argument('--max-batch', type=int, default=256, help='score immediately once this many requests wait')
+    args = parser.parse_args()
+
+    asyncio.run(serve(args.host, args.port, args.window_ms / 1000, args.max_batch))
+
+if __name__ == "__main__":
+    main()
@@ -158,12 +158,39 @@ app.get("/inventory/stats", async (req, res) => {
   }
 });
 
+// Optional long-lived Python prediction service (prediction_service.py).
+// When ML_SERVICE_URL is set, ML requests are proxied to it. Its /ml/predict and /ml/lifetime-predict run the same
+// scripts as the spawn path below; if it is unreachable or slower than ML_SERVICE_TIMEOUT_MS we fall back to spawning Python.
+const ML_SERVICE_URL = process.env.ML_SERVICE_URL;
+const ML_SERVICE_TIMEOUT_MS = parseInt(process.env.ML_SERVICE_TIMEOUT_MS || '5000', 10);
+
+async function callMlService(path, body) {
+  const response = await fetch(`${ML_SERVICE_URL}${path}`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(body),
+    signal: AbortSignal.timeout(ML_SERVICE_TIMEOUT_MS)
+  });
+  if (!response.ok) {
+    throw new Error(`ML service returned ${response.status}`);
+  }
+  return response.json();
+}
+
 // ML Prediction endpoint using part-data.csv
-app.post("/ml/predict", (req, res) => {
+app.post("/ml/predict", async (req, res) => {
   const { vendor_id, part_type, material, lifetime, region, route_type } = req.body;
   
   console.log('ML Prediction request:', req.body);
   
+  if (ML_SERVICE_URL) {
+    try {
+      return res.json(await callMlService('/ml/predict', req.body));
+    } catch (error) {
+      console.error('ML service unavailable, spawning Python:', error.message);
+    }
+  }
+  
   const args = [
     'ml_predict.py',
     vendor_id || '100',
@@ -215,12 +242,20 @@ app.post("/ml/predict", (req, res) => {
 });
 
 // Lifetime Prediction endpoint
-app.post("/ml/lifetime-predict", (req, res) => {
+app.post("/ml/lifetime-predict", async (req, res) => {
   const { 
     vendor_id, part_type, lot_number, material, warranty_years, 
     region, route_type, days_manuf_to_install, days_install_to_inspect 
   } = req.body;
   
+  if (ML_SERVICE_URL) {
+    try {
+      return res.json(await callMlService('/ml/lifetime-predict', req.body));
+    } catch (error) {
+      console.error('ML service unavailable, spawning Python:', error.message);
+    }
+  }
+  
   const python = spawn('python', [
     'lifetime_predict.py',
     vendor_id || '100',
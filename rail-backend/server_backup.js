@@ -188,73 +188,7 @@ app.post("/ai/analyze", (req, res) => {
 
 // Get all vendor recommendations
 app.get("/vendor/all", (req, res) => {
-  const pythonScript = `
-import pandas as pd
-import json
-import sys
-
-try:
-    import os
-    csv_path = os.path.join(os.path.dirname(__file__), 'part-data.csv')
-    df = pd.read_csv(csv_path)
-    
-    # Calculate vendor performance for all parts
-    vendor_stats = (
-        df.groupby('Vendor ID')['Defect']
-        .agg(['count', 'sum'])
-        .rename(columns={'count': 'Total', 'sum': 'Defects'})
-    )
-    vendor_stats['Defect_Rate'] = (vendor_stats['Defects'] / vendor_stats['Total']) * 100
-    vendor_stats = vendor_stats.sort_values('Defect_Rate')
-    
-    # Get top 5 vendors for chart
-    top_vendors = vendor_stats.head(5).reset_index()
-    total_inspections = top_vendors['Total'].sum()
-    
-    chart_data = []
-    for _, row in top_vendors.iterrows():
-        chart_data.append({
-            'vendor_id': str(row['Vendor ID']),
-            'percentage': (row['Total'] / total_inspections) * 100,
-            'defect_rate': round(row['Defect_Rate'], 2)
-        })
-    
-    # Get best vendor for each part type
-    part_recommendations = []
-    for part_type in [1, 2, 3, 4]:
-        part_name = {1: 'Rail Clips', 2: 'Rubber Pad', 3: 'Sleeper', 4: 'Liner'}[part_type]
-        part_df = df[df['Part type'] == part_type]
-        if not part_df.empty:
-            part_vendor_stats = (
-                part_df.groupby('Vendor ID')['Defect']
-                .agg(['count', 'sum'])
-                .rename(columns={'count': 'Total', 'sum': 'Defects'})
-            )
-            part_vendor_stats['Defect_Rate'] = (part_vendor_stats['Defects'] / part_vendor_stats['Total']) * 100
-            best_vendor = part_vendor_stats.sort_values('Defect_Rate').index[0]
-            
-            part_recommendations.append({
-                'part_type': part_name,
-                'best_vendor': str(best_vendor),
-                'defect_rate': round(part_vendor_stats.loc[best_vendor, 'Defect_Rate'], 2),
-                'quality_score': round(10 - (part_vendor_stats.loc[best_vendor, 'Defect_Rate'] / 10), 1)
-            })
-    
-    result = {
-        'chart_data': chart_data,
-        'recommendations': part_recommendations
-    }
-    
-except Exception as e:
-    result = {'error': str(e)}
-
-print(json.dumps(result))
-`;
-
-  const scriptPath = 'temp_all_vendors.py';
-  fs.writeFileSync(scriptPath, pythonScript);
-  
-  const python = spawn('python', [scriptPath]);
+  const python = spawn('python', ['failure_analysis.py', '--vendors']);
   let result = '';
   
   python.stdout.on('data', (data) => {
@@ -262,11 +196,8 @@ print(json.dumps(result))
   });
   
   python.on('close', (code) => {
-    fs.unlinkSync(scriptPath);
-    
     try {
-      const vendorData = JSON.parse(result);
-      res.json(vendorData);
+      res.json(JSON.parse(result));
     } catch (error) {
       res.status(500).json({ error: 'Vendor analysis failed' });
     }
@@ -301,74 +232,7 @@ app.post("/ml/predict", (req, res) => {
 
 // ML Failure Analysis endpoint
 app.get("/ml/failure-analysis", (req, res) => {
-  const pythonScript = `
-import pandas as pd
-import json
-import sys
-
-try:
-    df = pd.read_csv('part-data.csv')
-    
-    # Overall statistics
-    total_parts = len(df)
-    total_defects = df['Defect'].sum()
-    overall_defect_rate = round((total_defects / total_parts) * 100, 2)
-    
-    # Part type analysis
-    part_type_analysis = []
-    part_names = {1: 'Rail Clips', 2: 'Rubber Pad', 3: 'Sleeper', 4: 'Liner'}
-    
-    for part_type in [1, 2, 3, 4]:
-        part_df = df[df['Part type'] == part_type]
-        if not part_df.empty:
-            defects = part_df['Defect'].sum()
-            total = len(part_df)
-            defect_rate = round((defects / total) * 100, 2)
-            
-            part_type_analysis.append({
-                'part_type': part_names[part_type],
-                'total_parts': total,
-                'defects': defects,
-                'defect_rate': defect_rate
-            })
-    
-    # Vendor analysis
-    vendor_analysis = []
-    top_vendors = df['Vendor ID'].value_counts().head(5)
-    
-    for vendor_id in top_vendors.index:
-        vendor_df = df[df['Vendor ID'] == vendor_id]
-        defects = vendor_df['Defect'].sum()
-        total = len(vendor_df)
-        defect_rate = round((defects / total) * 100, 2)
-        
-        vendor_analysis.append({
-            'vendor_id': vendor_id,
-            'total_parts': total,
-            'defects': defects,
-            'defect_rate': defect_rate
-        })
-    
-    result = {
-        'overall_stats': {
-            'total_parts': total_parts,
-            'total_defects': total_defects,
-            'overall_defect_rate': overall_defect_rate
-        },
-        'part_type_analysis': part_type_analysis,
-        'vendor_analysis': vendor_analysis
-    }
-    
-except Exception as e:
-    result = {'error': str(e)}
-
-print(json.dumps(result))
-`;
-
-  const scriptPath = 'temp_failure_analysis.py';
-  fs.writeFileSync(scriptPath, pythonScript);
-  
-  const python = spawn('python', [scriptPath]);
+  const python = spawn('python', ['failure_analysis.py']);
   let result = '';
   
   python.stdout.on('data', (data) => {
@@ -376,13 +240,10 @@ print(json.dumps(result))
   });
   
   python.on('close', (code) => {
-    fs.unlinkSync(scriptPath);
-    
     try {
-      const analysisData = JSON.parse(result);
-      res.json(analysisData);
+      res.json(JSON.parse(result));
     } catch (error) {
-      res.status(500).json({ error: 'Analysis failed' });
+      res.status(500).json({ error: 'Failure analysis failed' });
     }
   });
 });
@@ -413,94 +274,6 @@ app.post("/ml/predict", (req, res) => {
   });
 });
 
-// ML Failure Analysis endpoint
-app.get("/ml/failure-analysis", (req, res) => {
-  const pythonScript = `
-import pandas as pd
-import json
-import sys
-
-try:
-    df = pd.read_csv('part-data.csv')
-    
-    # Overall statistics
-    total_parts = len(df)
-    total_defects = df['Defect'].sum()
-    overall_defect_rate = round((total_defects / total_parts) * 100, 2)
-    
-    # Part type analysis
-    part_type_analysis = []
-    part_names = {1: 'Rail Clips', 2: 'Rubber Pad', 3: 'Sleeper', 4: 'Liner'}
-    
-    for part_type in [1, 2, 3, 4]:
-        part_df = df[df['Part type'] == part_type]
-        if not part_df.empty:
-            defects = part_df['Defect'].sum()
-            total = len(part_df)
-            defect_rate = round((defects / total) * 100, 2)
-            
-            part_type_analysis.append({
-                'part_type': part_names[part_type],
-                'total_parts': total,
-                'defects': defects,
-                'defect_rate': defect_rate
-            })
-    
-    # Vendor analysis
-    vendor_analysis = []
-    top_vendors = df['Vendor ID'].value_counts().head(5)
-    
-    for vendor_id in top_vendors.index:
-        vendor_df = df[df['Vendor ID'] == vendor_id]
-        defects = vendor_df['Defect'].sum()
-        total = len(vendor_df)
-        defect_rate = round((defects / total) * 100, 2)
-        
-        vendor_analysis.append({
-            'vendor_id': vendor_id,
-            'total_parts': total,
-            'defects': defects,
-            'defect_rate': defect_rate
-        })
-    
-    result = {
-        'overall_stats': {
-            'total_parts': total_parts,
-            'total_defects': total_defects,
-            'overall_defect_rate': overall_defect_rate
-        },
-        'part_type_analysis': part_type_analysis,
-        'vendor_analysis': vendor_analysis
-    }
-    
-except Exception as e:
-    result = {'error': str(e)}
-
-print(json.dumps(result))
-`;
-
-  const scriptPath = 'temp_failure_analysis.py';
-  fs.writeFileSync(scriptPath, pythonScript);
-  
-  const python = spawn('python', [scriptPath]);
-  let result = '';
-  
-  python.stdout.on('data', (data) => {
-    result += data.toString();
-  });
-  
-  python.on('close', (code) => {
-    fs.unlinkSync(scriptPath);
-    
-    try {
-      const analysisData = JSON.parse(result);
-      res.json(analysisData);
-    } catch (error) {
-      res.status(500).json({ error: 'Analysis failed' });
-    }
-  });
-});
-
 // Vendor Recommendation endpoint
 app.post("/vendor/recommend", (req, res) => {
   const { part_type, material } = req.body;
@@ -595,93 +368,6 @@ print(json.dumps(result))
   });
 });
 
-// Get all vendor recommendations
-app.get("/vendor/all", (req, res) => {
-  const pythonScript = `
-import pandas as pd
-import json
-import sys
-
-try:
-    import os
-    csv_path = os.path.join(os.path.dirname(__file__), 'part-data.csv')
-    df = pd.read_csv(csv_path)
-    
-    # Calculate vendor performance for all parts
-    vendor_stats = (
-        df.groupby('Vendor ID')['Defect']
-        .agg(['count', 'sum'])
-        .rename(columns={'count': 'Total', 'sum': 'Defects'})
-    )
-    vendor_stats['Defect_Rate'] = (vendor_stats['Defects'] / vendor_stats['Total']) * 100
-    vendor_stats = vendor_stats.sort_values('Defect_Rate')
-    
-    # Get top 5 vendors for chart
-    top_vendors = vendor_stats.head(5).reset_index()
-    total_inspections = top_vendors['Total'].sum()
-    
-    chart_data = []
-    for _, row in top_vendors.iterrows():
-        chart_data.append({
-            'vendor_id': str(row['Vendor ID']),
-            'percentage': (row['Total'] / total_inspections) * 100,
-            'defect_rate': round(row['Defect_Rate'], 2)
-        })
-    
-    # Get best vendor for each part type
-    part_recommendations = []
-    for part_type in [1, 2, 3, 4]:
-        part_name = {1: 'Rail Clips', 2: 'Rubber Pad', 3: 'Sleeper', 4: 'Liner'}[part_type]
-        part_df = df[df['Part type'] == part_type]
-        if not part_df.empty:
-            part_vendor_stats = (
-                part_df.groupby('Vendor ID')['Defect']
-                .agg(['count', 'sum'])
-                .rename(columns={'count': 'Total', 'sum': 'Defects'})
-            )
-            part_vendor_stats['Defect_Rate'] = (part_vendor_stats['Defects'] / part_vendor_stats['Total']) * 100
-            best_vendor = part_vendor_stats.sort_values('Defect_Rate').index[0]
-            
-            part_recommendations.append({
-                'part_type': part_name,
-                'best_vendor': str(best_vendor),
-                'defect_rate': round(part_vendor_stats.loc[best_vendor, 'Defect_Rate'], 2),
-                'quality_score': round(10 - (part_vendor_stats.loc[best_vendor, 'Defect_Rate'] / 10), 1)
-            })
-    
-    result = {
-        'chart_data': chart_data,
-        'recommendations': part_recommendations
-    }
-    
-except Exception as e:
-    result = {'error': str(e)}
-
-print(json.dumps(result))
-`;
-
-  const scriptPath = 'temp_all_vendors.py';
-  fs.writeFileSync(scriptPath, pythonScript);
-  
-  const python = spawn('python', [scriptPath]);
-  let result = '';
-  
-  python.stdout.on('data', (data) => {
-    result += data.toString();
-  });
-  
-  python.on('close', (code) => {
-    fs.unlinkSync(scriptPath);
-    
-    try {
-      const vendorData = JSON.parse(result);
-      res.json(vendorData);
-    } catch (error) {
-      res.status(500).json({ error: 'Vendor analysis failed' });
-    }
-  });
-});
-
 // ML Prediction endpoint using part-data.csv
 app.post("/ml/predict", (req, res) => {
   const { vendor_id, part_type, material, lifetime, region, route_type } = req.body;
@@ -782,115 +468,6 @@ app.post("/send-alert", async (req, res) => {
   }
 });
 
-// Get detailed failure analysis from part-data.csv
-app.get("/ml/failure-analysis", (req, res) => {
-  const pythonScript = `
-import pandas as pd
-import json
-import numpy as np
-from datetime import datetime, timedelta
-
-try:
-    df = pd.read_csv('part-data.csv')
-    
-    # Overall failure statistics
-    total_parts = len(df)
-    total_defects = df['Defect'].sum()
-    overall_defect_rate = (total_defects / total_parts) * 100
-    
-    # Failure by part type
-    part_failure = df.groupby('Part type')['Defect'].agg(['count', 'sum']).reset_index()
-    part_failure['defect_rate'] = (part_failure['sum'] / part_failure['count']) * 100
-    part_names = {1: 'Rail Clips', 2: 'Rubber Pad', 3: 'Sleeper', 4: 'Liner'}
-    part_failure['part_name'] = part_failure['Part type'].map(part_names)
-    
-    # Failure by region
-    region_failure = df.groupby('Region')['Defect'].agg(['count', 'sum']).reset_index()
-    region_failure['defect_rate'] = (region_failure['sum'] / region_failure['count']) * 100
-    region_names = {1: 'North', 2: 'South', 3: 'East', 4: 'West', 5: 'Central', 6: 'Northeast', 7: 'Northwest', 8: 'Southeast'}
-    region_failure['region_name'] = region_failure['Region'].map(region_names)
-    
-    # Failure by route type
-    route_failure = df.groupby('Route Type')['Defect'].agg(['count', 'sum']).reset_index()
-    route_failure['defect_rate'] = (route_failure['sum'] / route_failure['count']) * 100
-    route_names = {1: 'High Speed', 2: 'Passenger', 3: 'Freight'}
-    route_failure['route_name'] = route_failure['Route Type'].map(route_names)
-    
-    # High-risk combinations
-    risk_analysis = df.groupby(['Vendor ID', 'Part type'])['Defect'].agg(['count', 'sum']).reset_index()
-    risk_analysis['defect_rate'] = (risk_analysis['sum'] / risk_analysis['count']) * 100
-    high_risk = risk_analysis[risk_analysis['defect_rate'] > 15].sort_values('defect_rate', ascending=False)
-    
-    result = {
-        'overall_stats': {
-            'total_parts': int(total_parts),
-            'total_defects': int(total_defects),
-            'overall_defect_rate': round(overall_defect_rate, 2)
-        },
-        'part_type_analysis': [
-            {
-                'part_type': row['part_name'],
-                'total_parts': int(row['count']),
-                'defects': int(row['sum']),
-                'defect_rate': round(row['defect_rate'], 2)
-            } for _, row in part_failure.iterrows()
-        ],
-        'region_analysis': [
-            {
-                'region': row['region_name'],
-                'total_parts': int(row['count']),
-                'defects': int(row['sum']),
-                'defect_rate': round(row['defect_rate'], 2)
-            } for _, row in region_failure.iterrows() if pd.notna(row['region_name'])
-        ],
-        'route_analysis': [
-            {
-                'route_type': row['route_name'],
-                'total_parts': int(row['count']),
-                'defects': int(row['sum']),
-                'defect_rate': round(row['defect_rate'], 2)
-            } for _, row in route_failure.iterrows() if pd.notna(row['route_name'])
-        ],
-        'high_risk_combinations': [
-            {
-                'vendor_id': int(row['Vendor ID']),
-                'part_type': int(row['Part type']),
-                'defect_rate': round(row['defect_rate'], 2),
-                'total_parts': int(row['count'])
-            } for _, row in high_risk.head(10).iterrows()
-        ]
-    }
-    
-except Exception as e:
-    result = {'error': str(e)}
-
-print(json.dumps(result))
-`;
-
-  const scriptPath = 'temp_failure_analysis.py';
-  fs.writeFileSync(scriptPath, pythonScript);
-  
-  const python = spawn('python', [scriptPath]);
-  let result = '';
-  
-  python.stdout.on('data', (data) => {
-    result += data.toString();
-  });
-  
-  python.on('close', (code) => {
-    fs.unlinkSync(scriptPath);
-    
-    try {
-      const analysisData = JSON.parse(result);
-      res.json(analysisData);
-    } catch (error) {
-      res.status(500).json({ error: 'Failure analysis failed' });
-    }
-  });
-});
-
-
-
 // Lifetime Prediction endpoint
 app.post("/ml/lifetime-predict", (req, res) => {
   const { 
@@ -0,0 +1,212 @@
+"""
+Nearest-neighbour lookup of similar historical components.
+
+Each (vendor, part type, material) combination seen in the part history is a
+point in a small attribute space, kept per part type:
+
+    material grade     x MATERIAL_WEIGHT
+    vendor defect rate x VENDOR_WEIGHT    (vendors are compared by track record, not by ID)
+
+The k combinations of the query's part type closest to it are found with a
+vectorized distance pass, or with a KD-tree per part type for large batches;
+neighbours further than MAX_DISTANCE are dropped and the rest are summed into
+lifetime and defect statistics. This is how lifetime_predict.py estimates new
+vendor/material combinations that have no exact history. query() takes whole
+arrays, so a lot is matched in one call:
+
+    python similar_components.py 101 "Rail Clips" 7
+
+The index is built from the PartStats counters in a few milliseconds, only
+when a request reaches that tier, and kept per process. It is not persisted:
+a spawned lifetime_predict.py pays for the numpy import plus that build on
+its tier-3 requests. scipy (about 0.3 s to import) is only loaded for batches
+above BRUTE_FORCE_CELLS, where the KD-trees are worth it. Both paths pick the
+same neighbours, ties at the k-th distance included.
+"""
+import json
+import sys
+
+from encoding import PART_TYPE
+from part_stats import load_stats
+
+MATERIAL_WEIGHT = 1.0
+# Per percentage point: a 10-point defect rate gap weighs as much as one material grade
+VENDOR_WEIGHT = 0.1
+# Neighbours further away than this (in material grades) are not similar
+MAX_DISTANCE = 3.0
+
+K_NEIGHBOURS = 5
+
+# Query rows x part type groups up to which distances are computed directly
+BRUTE_FORCE_CELLS = 1 << 20
+
+def closest(X, points, k):
+    """(distances, positions) of the k nearest points to every row of X, ties in position order"""
+    import numpy as np
+
+    distances = np.sqrt(((X[:, np.newaxis, :] - points[np.newaxis, :, :]) ** 2).sum(axis=2))
+    local = np.argsort(distances, axis=1, kind='stable')[:, :k]
+    return np.take_along_axis(distances, local, axis=1), local
+
+class SimilarIndex:
+    """Nearest-group search over the (vendor, part type, material) groups of a PartStats index, per part type"""
+
+    def __init__(self, stats):
+        import numpy as np
+
+        table = stats.groups[('Vendor ID', 'Part type', 'material')]
+        self.keys = np.array(list(table), dtype=np.int64).reshape(-1, 3)
+        self.sums = np.array(list(table.values()), dtype=np.float64).reshape(-1, 3)
+
+        # Vendor defect rates (%); vendors without history get the overall rate
+        vendors = stats.groups[('Vendor ID',)]
+        self.vendor_rates = {key[0]: entry[1] * 100 / entry[0] for key, entry in vendors.items() if entry[0]}
+        self.default_rate = 100 * sum(entry[1] for entry in vendors.values()) / stats.total if stats.total else 0.0
+
+        self.points = self.encode(self.keys[:, 0], self.keys[:, 2])
+        # Part type code -> positions in self.keys; KD-trees over their points are built on first use
+        self.positions = {int(part): np.flatnonzero(self.keys[:, 1] == part) for part in np.unique(self.keys[:, 1])}
+        self.trees = {}
+
+    def encode(self, vendor_ids, materials):
+        """Attribute-space coordinates for arrays of vendor IDs and materials"""
+        import numpy as np
+
+        rates = np.fromiter(
+            (self.vendor_rates.get(int(vendor), self.default_rate) for vendor in vendor_ids),
+            dtype=np.float64, count=len(vendor_ids)
+        )
+        return np.column_stack([
+            np.asarray(materials, dtype=np.float64) * MATERIAL_WEIGHT,
+            rates * VENDOR_WEIGHT
+        ])
+
+    def tree(self, part_type):
+        """KD-tree over one part type's points, or None without scipy"""
+        if part_type not in self.trees:
+            try:
+                from scipy.spatial import cKDTree
+                self.trees[part_type] = cKDTree(self.points[self.positions[part_type]])
+            except ImportError:
+                self.trees[part_type] = None
+        return self.trees[part_type]
+
+    def nearest(self, part_type, X, k, max_distance=MAX_DISTANCE):
+        """
+        (distances, group indices) of the k nearest groups of one part type,
+        each (len(X), k); missing or too distant neighbours have distance inf
+        and index -1.
+        """
+        import numpy as np
+
+        positions = self.positions.get(part_type)
+        if positions is None:
+            return np.full((len(X), k), np.inf), np.full((len(X), k), -1, dtype=np.int64)
+        found = min(k, len(positions))
+
+        points = self.points[positions]
+        tree = self.tree(part_type) if len(X) * len(positions) > BRUTE_FORCE_CELLS else None
+        if tree is None:
+            # Small batches (or no scipy): brute force, still one vectorized pass per query batch
+            distances, local = closest(X, points, found)
+        else:
+            # The tree proposes the neighbours (one extra, to spot ties at the k-th distance)
+            proposed, local = tree.query(X, min(found + 1, len(positions)))
+            proposed, local = proposed.reshape(len(X), -1), local.reshape(len(X), -1)
+            tied = np.zeros(len(X), dtype=bool)
+            if proposed.shape[1] > found:
+                tied = np.isclose(proposed[:, found - 1], proposed[:, found], rtol=1e-9, atol=1e-12)
+            local = local[:, :found]
+
+            # Same arithmetic and (distance, position) order as the brute force, so
+            # a row gets the same neighbours whichever path scores it
+            distances = np.sqrt(((X[:, np.newaxis, :] - points[local]) ** 2).sum(axis=2))
+            order = np.lexsort((local, distances))
+            distances, local = np.take_along_axis(distances, order, axis=1), np.take_along_axis(local, order, axis=1)
+            if tied.any():
+                distances[tied], local[tied] = closest(X[tied], points, found)
+
+        near = distances <= max_distance
+        distances = np.pad(np.where(near, distances, np.inf), ((0, 0), (0, k - found)), constant_values=np.inf)
+        indices = np.pad(np.where(near, positions[local], -1), ((0, 0), (0, k - found)), constant_values=-1)
+        return distances, indices
+
+    def query(self, vendor_ids, part_types, materials, k=K_NEIGHBOURS, max_distance=MAX_DISTANCE):
+        """
+        Statistics of the k most similar historical groups of the same part
+        type, within max_distance, for every query row.
+
+        Returns arrays of length len(vendor_ids): count, defects and lifetime
+        (summed over the neighbours, all zero when none qualify),
+        mean_distance (nan when none qualify), and indices, the (rows x k)
+        neighbour positions in self.keys with -1 for no neighbour.
+        """
+        import numpy as np
+
+        rows = len(vendor_ids)
+        part_types = np.asarray(part_types, dtype=np.int64).reshape(rows)
+        X = self.encode(vendor_ids, materials)
+        distances = np.full((rows, k), np.inf)
+        indices = np.full((rows, k), -1, dtype=np.int64)
+        for part_type in np.unique(part_types).tolist():
+            selected = part_types == part_type
+            distances[selected], indices[selected] = self.nearest(part_type, X[selected], k, max_distance)
+
+        near = indices >= 0
+        totals = np.where(near[:, :, np.newaxis], self.sums[indices], 0.0).sum(axis=1) if k and len(self.keys) else np.zeros((rows, 3))
+        found = near.sum(axis=1)
+        with np.errstate(invalid='ignore'):
+            mean_distance = np.where(near, distances, 0.0).sum(axis=1) / found
+        return {
+            'count': totals[:, 0],
+            'defects': totals[:, 1],
+            'lifetime': totals[:, 2],
+            'mean_distance': mean_distance,
+            'indices': indices
+        }
+
+# One index per PartStats version (new CSV or ingested records)
+_index = None
+
+def index_for(stats):
+    """SimilarIndex for a stats index, rebuilt only when the data changed"""
+    global _index
+    if _index is None or _index[0] is not stats or _index[1] != stats.total:
+        _index = (stats, stats.total, SimilarIndex(stats))
+    return _index[2]
+
+def main():
+    try:
+        vendor_id = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+        part_type = sys.argv[2] if len(sys.argv) > 2 else 'Rail Clips'
+        material = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+        k = int(sys.argv[4]) if len(sys.argv) > 4 else K_NEIGHBOURS
+
+        index = index_for(load_stats())
+        part_type_num = PART_TYPE.code(part_type)
+        found = index.query([vendor_id], [part_type_num], [material], k)
+
+        neighbours = []
+        for position in found['indices'][0].tolist():
+            if position < 0:
+                continue
+            count, defects, lifetime = index.sums[position].tolist()
+            vendor, part, grade = index.keys[position].tolist()
+            neighbours.append({
+                'vendor_id': vendor, 'part_type': part, 'material': grade, 'components': int(count),
+                'avg_lifetime_days': round(lifetime / count, 1), 'defect_rate': round(defects * 100 / count, 2)
+            })
+        count = float(found['count'][0])
+        result = {
+            'neighbours': neighbours,
+            'components': int(count),
+            'avg_lifetime_days': round(float(found['lifetime'][0]) / count, 1) if count else None,
+            'defect_rate': round(float(found['defects'][0]) * 100 / count, 2) if count else None
+        }
+    except Exception as e:
+        result = {'error': str(e)}
+
+    print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
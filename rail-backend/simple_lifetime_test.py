@@ -1,24 +1,24 @@
-import pickle
 import numpy as np
 
+import model_registry
+from model_manifest import load_manifest
+
 try:
-    # Load the lifetime model
-    with open('lifetime_model.pkl', 'rb') as f:
-        lifetime_model = pickle.load(f)
+    # Expected input width comes from the manifest (built once per model version)
+    manifest = load_manifest('lifetime_model.pkl')
+    
+    # Load the lifetime model (already loaded if the manifest was just built)
+    lifetime_model = model_registry.load('lifetime_model.pkl')
     
     print("Model Type:", type(lifetime_model))
     
-    # Test with sample data - try different feature counts
-    for n_features in range(1, 10):
-        try:
-            sample_input = np.array([[1] * n_features])
-            prediction = lifetime_model.predict(sample_input)
-            print(f"SUCCESS: Model accepts {n_features} features")
-            print(f"Sample prediction: {prediction[0]}")
-            print(f"Prediction type: {type(prediction[0])}")
-            break
-        except Exception as e:
-            continue
+    # Test with sample data sized from the manifest
+    n_features = manifest['n_features_in']
+    sample_input = np.array([[1] * n_features])
+    prediction = lifetime_model.predict(sample_input)
+    print(f"SUCCESS: Model accepts {n_features} features")
+    print(f"Sample prediction: {prediction[0]}")
+    print(f"Prediction type: {type(prediction[0])}")
     
     # Check if it has feature names
     if hasattr(lifetime_model, 'feature_names_in_'):
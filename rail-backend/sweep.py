@@ -0,0 +1,134 @@
+"""
+What-if sensitivity sweeps over component attributes.
+
+A sweep takes a base component and a list of attributes to vary, builds the
+full cartesian grid as one feature matrix and scores it with a single model
+call:
+
+  failure    the Random Forest of enhanced_ml_prediction.py (PASS probability, %)
+  lifetime   the VotingRegressor of lifetime_prediction.py (predicted hours,
+             plus std/p5/p95 with --intervals)
+
+Each varied value is encoded once with the script's own build_features(); the
+grid is then filled in by broadcasting, so a few hundred cells cost about as
+much as one prediction. Results are tensors with one axis per varied attribute,
+in the order given.
+
+    python sweep.py failure --base '{"vendor_id": 101, "part_type": "Liner"}' --vary material=1..10 --vary "route_type=High Speed,Passenger,Freight"
+    python sweep.py lifetime --vary warranty_years=1..5 --vary region=North,South --intervals
+"""
+import argparse
+import json
+
+# Largest grid scored in one call
+MAX_CELLS = 100_000
+
+def failure_model(intervals=False):
+    """(defaults, build_features, column offset, score) for the failure model"""
+    import enhanced_ml_prediction
+
+    if intervals:
+        raise ValueError('--intervals applies to the lifetime model only')
+
+    def score(X):
+        model = enhanced_ml_prediction.load_rf_model()
+        probabilities = model.predict_proba(X)
+        passed = list(model.classes_).index(1)
+        return {'pass_probability': probabilities[:, passed] * 100}
+
+    return enhanced_ml_prediction.QUERY_DEFAULTS, enhanced_ml_prediction.build_features, 0, score
+
+def lifetime_model(intervals=False):
+    """(defaults, build_features, column offset, score) for the lifetime model"""
+    import lifetime_prediction
+    import model_store
+
+    def score(X):
+        model = lifetime_prediction.load_lifetime_model()
+        if not intervals:
+            return {'predicted_lifetime_hours': model.predict(X)}
+        distribution = model_store.predict_distribution(model, X)
+        tensors = {'predicted_lifetime_hours': distribution['mean'], 'std_hours': distribution['std']}
+        for q, values in distribution['percentiles'].items():
+            tensors[f'p{q}_hours'] = values
+        return tensors
+
+    # build_features() puts an index placeholder before the request fields
+    return lifetime_prediction.BATCH_DEFAULTS, lifetime_prediction.build_features, 1, score
+
+MODELS = {'failure': failure_model, 'lifetime': lifetime_model}
+
+def sweep_grid(defaults, build_features, offset, base, dimensions):
+    """
+    Feature matrix of the cartesian grid, in C order over `dimensions`
+    ([(field, values)]); rows are the base component with each varied field
+    replaced.
+    """
+    import numpy as np
+
+    fields = list(defaults)
+    component = {**defaults, **base}
+    shape = [len(values) for _, values in dimensions]
+    row = np.asarray(build_features(**component), dtype=np.float64)
+
+    X = np.tile(row, (int(np.prod(shape)), 1))
+    positions = np.indices(shape).reshape(len(shape), -1)
+    for axis, (field, values) in enumerate(dimensions):
+        column = offset + fields.index(field)
+        encoded = np.array([build_features(**{**component, field: value})[column] for value in values], dtype=np.float64)
+        X[:, column] = encoded[positions[axis]]
+    return X
+
+def sweep(model_name, base, dimensions, intervals=False):
+    """Score every combination of `dimensions` ([(field, values)]) around `base`; returns the result tensors"""
+    import numpy as np
+
+    defaults, build_features, offset, score = MODELS[model_name](intervals)
+    unknown = [field for field in list(base) + [field for field, _ in dimensions] if field not in defaults]
+    if unknown:
+        raise ValueError(f"Unknown {model_name} fields: {', '.join(unknown)}")
+
+    shape = [len(values) for _, values in dimensions]
+    cells = int(np.prod(shape))
+    if cells > MAX_CELLS:
+        raise ValueError(f'Grid has {cells} cells, more than {MAX_CELLS}')
+
+    X = sweep_grid(defaults, build_features, offset, base, dimensions)
+    result = {
+        'model': model_name,
+        'base': {**defaults, **base},
+        'dimensions': [{'field': field, 'values': values} for field, values in dimensions],
+        'shape': shape
+    }
+    for name, values in score(X).items():
+        result[name] = np.round(values, 2).reshape(shape).tolist()
+    return result
+
+def parse_values(text):
+    """'1..10' (inclusive integer range) or a comma-separated list; numeric items become ints"""
+    if '..' in text and ',' not in text:
+        low, high = text.split('..')
+        return list(range(int(low), int(high) + 1))
+    return [int(item) if item.strip().lstrip('-').isdigit() else item.strip() for item in text.split(',')]
+
+def main():
+    parser = argparse.ArgumentParser(description='Score a cartesian grid of component variants in one model call')
+    parser.add_argument('model', choices=sorted(MODELS))
+    parser.add_argument('--base', default='{}', help='JSON object of base component fields')
+    parser.add_argument('--vary', action='append', default=[], metavar='FIELD=VALUES', help="e.g. material=1..10 or region=North,South")
+    parser.add_argument('--intervals', action='store_true', help='lifetime only: add std and percentile tensors')
+    args = parser.parse_args()
+
+    try:
+        dimensions = []
+        for spec in args.vary:
+            field, _, values = spec.partition('=')
+            dimensions.append((field.strip(), parse_values(values)))
+        result = sweep(args.model, json.loads(args.base), dimensions, args.intervals)
+    except Exception as e:
+        result = {'error': str(e)}
+
+    print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+FlatForest must score exactly like the sklearn forest it was exported from.
+
+Run with: python -m pytest test_flat_forest.py
+"""
+import pickle
+
+import pytest
+
+np = pytest.importorskip('numpy')
+ensemble = pytest.importorskip('sklearn.ensemble')
+
+import flat_forest
+
+def fitted_forest(seed=0):
+    """Small forest on rows shaped like the model's: [vendor_id, part_type, material, lifetime, region, route_type]"""
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([
+        rng.integers(100, 140, 600),
+        rng.integers(1, 5, 600),
+        rng.integers(1, 10, 600),
+        rng.uniform(0, 3000, 600),
+        rng.integers(1, 6, 600),
+        rng.integers(1, 4, 600)
+    ])
+    y = (X[:, 3] / 3000 + rng.uniform(0, 0.6, 600) > 0.7).astype(int)
+    model = ensemble.RandomForestClassifier(n_estimators=15, max_depth=8, random_state=seed).fit(X, y)
+    return model, X
+
+def probe_rows(model, X):
+    """Training rows, float64 values just either side of every split threshold, and values float32 cannot hold"""
+    rows = [X]
+    for tree in model.estimators_:
+        inner = tree.tree_.feature >= 0
+        for feature, threshold in zip(tree.tree_.feature[inner], tree.tree_.threshold[inner]):
+            for value in (threshold, np.nextafter(threshold, -np.inf), np.nextafter(threshold, np.inf)):
+                row = X[:1].copy()
+                row[0, feature] = value
+                rows.append(row)
+    large = X[:4].copy()
+    large[:, 0] = [2 ** 24 + 1, 2 ** 31 + 7, -2 ** 24 - 1, 1e12 + 0.5]
+    rows.append(large)
+    return np.vstack(rows)
+
+def test_predict_proba_matches_sklearn():
+    model, X = fitted_forest()
+    forest = flat_forest.FlatForest(flat_forest.export_forest(model))
+    rows = probe_rows(model, X)
+
+    assert np.array_equal(forest.predict_proba(rows), model.predict_proba(rows))
+    assert np.array_equal(forest.predict(rows), model.predict(rows))
+    assert np.array_equal(forest.classes_, model.classes_)
+
+def test_float32_input_matches_sklearn():
+    model, X = fitted_forest(seed=1)
+    forest = flat_forest.FlatForest(flat_forest.export_forest(model))
+    rows = probe_rows(model, X).astype(np.float32)
+
+    assert np.array_equal(forest.predict_proba(rows), model.predict_proba(rows))
+
+def test_memory_mapped_store_matches_sklearn(tmp_path):
+    model, X = fitted_forest(seed=2)
+    model_path = str(tmp_path / 'model.pkl')
+    with open(model_path, 'wb') as f:
+        pickle.dump(model, f)
+
+    forest = flat_forest.open_forest(model_path)
+    rows = probe_rows(model, X)
+
+    assert isinstance(forest, flat_forest.FlatForest)
+    assert np.array_equal(forest.predict_proba(rows), model.predict_proba(rows))
@@ -0,0 +1,60 @@
+"""
+vendor_recommender.py must score a vendor exactly as enhanced_ml_prediction.py
+scores the same component.
+
+Run with: python -m pytest test_vendor_recommender.py
+"""
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+ensemble = pytest.importorskip('sklearn.ensemble')
+
+import enhanced_ml_prediction
+import vendor_recommender
+from part_stats import COLUMNS, build_stats
+
+def history(seed=0, rows=2000):
+    """Part history records over every region and route code part-data.csv uses"""
+    rng = np.random.default_rng(seed)
+    columns = {
+        'Vendor ID': rng.integers(100, 130, rows),
+        'Part type': rng.integers(1, 5, rows),
+        'material': rng.integers(1, 10, rows),
+        'Defect': (rng.uniform(0, 1, rows) < 0.12).astype(int),
+        'Lifetime (Days)': rng.integers(100, 3000, rows),
+        'Region': rng.integers(1, 9, rows),
+        'Route Type': rng.integers(1, 5, rows),
+        'Warranty (Years)': rng.integers(1, 6, rows)
+    }
+    return [dict(zip(COLUMNS, values)) for values in zip(*(columns[name].tolist() for name in COLUMNS))]
+
+@pytest.fixture(scope='module')
+def fitted():
+    records = history()
+    df = pd.DataFrame(records)
+    X = df[['Vendor ID', 'Part type', 'material', 'Lifetime (Days)', 'Region', 'Route Type']].to_numpy()
+    model = ensemble.RandomForestClassifier(n_estimators=15, max_depth=8, random_state=0).fit(X, 1 - df['Defect'])
+    # With a 'Lifetime' column enhanced reports the same vendor history the recommender reads from the stats
+    tables = enhanced_ml_prediction.build_history_tables(df.assign(Lifetime=df['Lifetime (Days)']))
+    return build_stats(records), model, tables
+
+@pytest.mark.parametrize('region, route_type', [
+    ('South', 'Freight'),
+    ('Northeast', 'Mixed'),
+    ('Nowhere', 'Monorail')
+])
+def test_recommendation_matches_enhanced(fitted, region, route_type):
+    stats, model, tables = fitted
+    query = {'part_type': 'Rubber Pad', 'material': 4, 'lifetime': 2, 'region': region, 'route_type': route_type}
+    result = vendor_recommender.recommend(stats, model, k=3, **query)
+
+    for recommendation in result['recommendations']:
+        row = enhanced_ml_prediction.build_features(recommendation['vendor_id'], **query)
+        expected = enhanced_ml_prediction.predict_batch(model, tables, [row])[0]
+        pass_probability = model.predict_proba(np.array([row]))[0, list(model.classes_).index(1)] * 100
+
+        assert recommendation['pass_probability'] == round(pass_probability, 1)
+        assert recommendation['historical_defect_rate'] == expected['historical_performance']['historical_defect_rate']
+        assert recommendation['risk_score'] == expected['risk_score']
+        assert recommendation['risk_factors'] == expected['risk_factors']
@@ -0,0 +1,115 @@
+"""
+Opt-in per-stage timing for the prediction scripts.
+
+Enable with ML_TIMINGS=1 or the --timings flag. Each response's model_info
+then gets a `timings` block:
+
+    "timings": {
+        "stages_ms": {"startup": 41.2, "load_stats": 3.1, "predict": 0.2, "json_encode": 0.1},
+        "total_ms": 44.6,
+        "peak_rss_mb": 38.4
+    }
+
+`startup` is the time from process launch to the script's imports (Linux
+only, starting from the process start tick). The other stages use time.perf_counter().
+
+ML_PROFILE=path or --profile path additionally writes cProfile stats for the
+call, readable with `python -m pstats path`.
+"""
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+
+def _process_age():
+    """Seconds since this process started, from /proc (None elsewhere)"""
+    try:
+        with open('/proc/self/stat') as f:
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        # starttime is in clock ticks since boot, the same origin as CLOCK_BOOTTIME
+        return max(0.0, time.clock_gettime(time.CLOCK_BOOTTIME) - start_ticks / os.sysconf('SC_CLK_TCK'))
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+_startup = _process_age()
+_started = time.perf_counter()
+
+enabled = os.environ.get('ML_TIMINGS', '') not in ('', '0')
+profile_path = os.environ.get('ML_PROFILE') or None
+
+_stages = {}
+
+def configure(argv):
+    """Strip --timings / --profile PATH from argv (in place) and apply them"""
+    global enabled, profile_path
+    if '--timings' in argv:
+        argv.remove('--timings')
+        enabled = True
+    if '--profile' in argv:
+        index = argv.index('--profile')
+        if index + 1 < len(argv):
+            profile_path = argv[index + 1]
+            del argv[index:index + 2]
+
+@contextmanager
+def _timed(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _stages[name] = _stages.get(name, 0.0) + (time.perf_counter() - start)
+
+def stage(name):
+    """Context manager timing one stage; repeated stages add up. A no-op unless enabled."""
+    return _timed(name) if enabled else nullcontext()
+
+def reset():
+    """Start a new measurement (long-lived callers: once per request)"""
+    global _startup, _started
+    _stages.clear()
+    _startup = None
+    _started = time.perf_counter()
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None where unavailable"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KB on Linux and in bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def report():
+    stages = {}
+    if _startup is not None:
+        stages['startup'] = round(_startup * 1000, 2)
+    stages.update((name, round(seconds * 1000, 3)) for name, seconds in _stages.items())
+    return {
+        'stages_ms': stages,
+        'total_ms': round(((_startup or 0.0) + time.perf_counter() - _started) * 1000, 2),
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+def dumps(result):
+    """json.dumps(result), first adding model_info.timings (with the encode itself timed) when enabled"""
+    if not enabled or not isinstance(result, dict):
+        return json.dumps(result)
+    with stage('json_encode'):
+        json.dumps(result)
+    model_info = dict(result.get('model_info') or {})
+    model_info['timings'] = report()
+    return json.dumps({**result, 'model_info': model_info})
+
+def run(main):
+    """Run a script's main(), under cProfile when a profile path is configured"""
+    if not profile_path:
+        return main()
+
+    import cProfile
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(main)
+    finally:
+        profiler.dump_stats(profile_path)
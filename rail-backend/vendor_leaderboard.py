@@ -0,0 +1,149 @@
+"""
+Vendor leaderboards kept in order as inspection records arrive.
+
+For every scope (all parts, each part type, each region and each route
+type) the vendors are held in a list sorted by (defect rate, vendor ID),
+built from the PartStats counters. Once built, a leaderboard follows its
+PartStats index: every record folded in (ingest.py's delta log) moves only
+the affected vendors, found with a binary search. Best and worst vendors are
+then a slice off either end of the list, with no re-sort per request.
+
+    python vendor_leaderboard.py                            # all parts
+    python vendor_leaderboard.py --part-type Sleeper --k 10
+    python vendor_leaderboard.py --region North
+"""
+import argparse
+import json
+from bisect import bisect_left, insort
+
+from encoding import PART_TYPE, REGION, ROUTE_TYPE
+from part_stats import load_stats
+
+# Scope name -> (PartStats group, vocabulary of the scope value)
+SCOPES = {
+    'all': (('Vendor ID',), None),
+    'part_type': (('Vendor ID', 'Part type'), PART_TYPE),
+    'region': (('Vendor ID', 'Region'), REGION),
+    'route_type': (('Vendor ID', 'Route Type'), ROUTE_TYPE),
+}
+
+TOP_K = 5
+
+def defect_rate(count, defects):
+    return (defects / count) * 100
+
+class Ranking:
+    """Vendors of one scope in (defect rate, vendor ID) order"""
+
+    def __init__(self, entries=()):
+        self.order = sorted(entries)
+        self.entries = {entry[1]: entry for entry in self.order}
+
+    def update(self, vendor_id, count, defects):
+        """Move a vendor to the position of its new counters"""
+        entry = (defect_rate(count, defects), vendor_id)
+        old = self.entries.get(vendor_id)
+        if old == entry:
+            return
+        if old is not None:
+            del self.order[bisect_left(self.order, old)]
+        insort(self.order, entry)
+        self.entries[vendor_id] = entry
+
+    def best(self, k):
+        return self.order[:k]
+
+    def worst(self, k):
+        return self.order[:-k - 1:-1] if k > 0 else []
+
+class Leaderboard:
+    """Rankings of every scope for one PartStats index, kept current as records are added to it"""
+
+    def __init__(self, stats):
+        self.stats = stats
+        entries = {}
+        for scope, (dims, _) in SCOPES.items():
+            for key, (count, defects, _) in stats.groups[dims].items():
+                entries.setdefault((scope,) + key[1:], []).append((defect_rate(count, defects), key[0]))
+        self.rankings = {ranking: Ranking(vendors) for ranking, vendors in entries.items()}
+        stats.watchers.append(self.add)
+
+    def add(self, record):
+        """Reposition the record's vendor in each scope (called after stats.add)"""
+        for scope, (dims, _) in SCOPES.items():
+            key = tuple(record[d] for d in dims)
+            count, defects, _ = self.stats.groups[dims][key]
+            ranking = self.rankings.get((scope,) + key[1:])
+            if ranking is None:
+                ranking = self.rankings[(scope,) + key[1:]] = Ranking()
+            ranking.update(key[0], count, defects)
+
+    def ranking(self, scope='all', value=None):
+        """The Ranking of one scope; value is the part type, region or route code"""
+        return self.rankings.get((scope,) if scope == 'all' else (scope, value)) or Ranking()
+
+    def best(self, scope='all', value=None, k=TOP_K):
+        """Up to k (defect rate, vendor ID) pairs, lowest defect rate first"""
+        return self.ranking(scope, value).best(k)
+
+    def worst(self, scope='all', value=None, k=TOP_K):
+        """Up to k (defect rate, vendor ID) pairs, highest defect rate first"""
+        return self.ranking(scope, value).worst(k)
+
+# One leaderboard per PartStats index; it follows that index's updates itself
+_leaderboard = None
+
+def leaderboard_for(stats):
+    """Leaderboard for a stats index, rebuilt only when the index was reloaded"""
+    global _leaderboard
+    if _leaderboard is None or _leaderboard.stats is not stats:
+        _leaderboard = Leaderboard(stats)
+    return _leaderboard
+
+def main():
+    parser = argparse.ArgumentParser(description='Best and worst vendors by defect rate')
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--part-type', help='part type name or code')
+    group.add_argument('--region', help='region name or code')
+    group.add_argument('--route-type', help='route type name or code')
+    parser.add_argument('--k', type=int, default=TOP_K, help='vendors at each end')
+    args = parser.parse_args()
+
+    try:
+        scope, value = 'all', None
+        for name in ('part_type', 'region', 'route_type'):
+            raw = getattr(args, name)
+            if raw is None:
+                continue
+            vocabulary = SCOPES[name][1]
+            if not raw.isdigit() and raw not in vocabulary.codes:
+                raise ValueError(f'Unknown {name}: {raw}')
+            scope, value = name, int(raw) if raw.isdigit() else vocabulary.code(raw)
+
+        stats = load_stats()
+        board = leaderboard_for(stats)
+        dims = SCOPES[scope][0]
+
+        def listed(entries):
+            return [
+                {
+                    'vendor_id': vendor_id,
+                    'defect_rate': round(rate, 2),
+                    'total_parts': stats.lookup(dims, vendor_id, *([] if value is None else [value]))[0]
+                }
+                for rate, vendor_id in entries
+            ]
+
+        result = {
+            'scope': scope,
+            'value': None if value is None else SCOPES[scope][1].label(value) or value,
+            'best': listed(board.best(scope, value, args.k)),
+            'worst': listed(board.worst(scope, value, args.k))
+        }
+    except Exception as e:
+        result = {'error': str(e)}
+
+    print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
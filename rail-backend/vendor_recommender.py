@@ -0,0 +1,117 @@
+"""
+Vendor recommendation for a part type, material, region and route.
+
+Every vendor in the aggregate index gets one feature row; the Random Forest
+of enhanced_ml_prediction.py scores them all in one predict_proba call. The
+PASS probability is then blended with the vendor's historical defect rate
+for the part type (smoothed toward the part type's overall rate, so a vendor
+with three clean parts does not outrank one with three hundred):
+
+    score = MODEL_WEIGHT * pass probability + (1 - MODEL_WEIGHT) * (100 - smoothed defect rate)
+
+The top-k vendors are returned with their risk scores and their history in
+the requested region and route type. The model and risk factors see the
+region and route codes enhanced_ml_prediction.py uses; the history lookups
+use the part-data.csv codes.
+
+    python vendor_recommender.py "Rubber Pad" --region South --route-type Freight --k 10
+"""
+import argparse
+import json
+
+import enhanced_ml_prediction
+from encoding import PART_TYPE, REGION, ROUTE_TYPE
+from part_stats import load_stats
+from vendor_leaderboard import defect_rate
+
+# Share of the score taken by the model's PASS probability
+MODEL_WEIGHT = 0.5
+# Pseudo-parts at the part type's overall rate added to each vendor's history
+PRIOR_PARTS = 10
+
+TOP_K = 5
+
+def rate_or_none(stats, dims, *key):
+    """Defect rate (%) for a key, None when it has no history"""
+    count, defects, _ = stats.lookup(dims, *key)
+    return round(defect_rate(count, defects), 2) if count else None
+
+def recommend(stats, model, part_type, material=1, lifetime=1000, region='North', route_type='Passenger', k=TOP_K, min_parts=0):
+    """{'vendors_scored': n, 'recommendations': top-k vendors for one component, best first}"""
+    import numpy as np
+
+    part_type_num, region_num, route_type_num = PART_TYPE.code(part_type), REGION.code(region), ROUTE_TYPE.code(route_type)
+    vendor_ids = sorted(vendor_id for (vendor_id,) in stats.groups[('Vendor ID',)])
+    supplied = np.array([stats.lookup(('Vendor ID', 'Part type'), vendor_id, part_type_num)[:2] for vendor_id in vendor_ids], dtype=np.float64).reshape(-1, 2)
+    keep = supplied[:, 0] >= min_parts
+    vendor_ids = [vendor_id for vendor_id, kept in zip(vendor_ids, keep.tolist()) if kept]
+    supplied = supplied[keep]
+    if not vendor_ids:
+        return {'vendors_scored': 0, 'recommendations': []}
+
+    # One row per vendor, encoded exactly as enhanced_ml_prediction.py encodes it, scored in a single call
+    X = np.tile(np.array(enhanced_ml_prediction.build_features(0, part_type, material, lifetime, region, route_type)), (len(vendor_ids), 1))
+    X[:, 0] = vendor_ids
+    probabilities = model.predict_proba(X)
+    pass_probability = probabilities[:, list(model.classes_).index(1)] * 100
+
+    part_count, part_defects, _ = stats.lookup(('Part type',), part_type_num)
+    base_rate = part_defects / part_count if part_count else 0.0
+    smoothed = (supplied[:, 1] + PRIOR_PARTS * base_rate) * 100 / (supplied[:, 0] + PRIOR_PARTS)
+    scores = MODEL_WEIGHT * pass_probability + (1 - MODEL_WEIGHT) * (100 - smoothed)
+
+    material_rate = rate_or_none(stats, ('Part type', 'material'), part_type_num, int(material))
+    order = sorted(range(len(vendor_ids)), key=lambda i: (-scores[i], vendor_ids[i]))[:k]
+
+    recommendations = []
+    for rank, i in enumerate(order, 1):
+        vendor_id = vendor_ids[i]
+        count, defects = int(supplied[i, 0]), int(supplied[i, 1])
+        history = {
+            'historical_defect_rate': round(defect_rate(count, defects), 2) if count else 0,
+            'total_parts_supplied': count
+        }
+        risk_factors, risk_score = enhanced_ml_prediction.calculate_risk_factors(X[i].tolist(), history, material_rate)
+        recommendations.append({
+            'rank': rank,
+            'vendor_id': vendor_id,
+            'score': round(float(scores[i]), 2),
+            'pass_probability': round(float(pass_probability[i]), 1),
+            **history,
+            'region_defect_rate': rate_or_none(stats, ('Vendor ID', 'Region'), vendor_id, region_num),
+            'route_defect_rate': rate_or_none(stats, ('Vendor ID', 'Route Type'), vendor_id, route_type_num),
+            'risk_score': risk_score,
+            'risk_factors': risk_factors
+        })
+    return {'vendors_scored': len(vendor_ids), 'recommendations': recommendations}
+
+def main():
+    parser = argparse.ArgumentParser(description='Rank every known vendor for one component')
+    parser.add_argument('part_type')
+    parser.add_argument('--material', type=int, default=1)
+    parser.add_argument('--lifetime', type=int, default=1000, help='expected lifetime, as in /ml/predict')
+    parser.add_argument('--region', default='North')
+    parser.add_argument('--route-type', default='Passenger')
+    parser.add_argument('--k', type=int, default=TOP_K, help='vendors returned')
+    parser.add_argument('--min-parts', type=int, default=0, help='skip vendors that supplied fewer of this part type')
+    args = parser.parse_args()
+
+    try:
+        stats = load_stats()
+        result = {
+            'query': {
+                'part_type': args.part_type, 'material': args.material, 'lifetime': args.lifetime,
+                'region': args.region, 'route_type': args.route_type
+            },
+            **recommend(
+                stats, enhanced_ml_prediction.load_rf_model(), args.part_type, args.material, args.lifetime,
+                args.region, args.route_type, args.k, args.min_parts
+            )
+        }
+    except Exception as e:
+        result = {'error': str(e)}
+
+    print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()